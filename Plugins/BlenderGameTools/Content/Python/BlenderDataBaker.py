@@ -1,15 +1,49 @@
 import unreal
 import xml.etree.ElementTree as ET
 import os
+import copy
+import json
+import concurrent.futures
 from pathlib import Path
 
+import BlenderDataBakerCache as baked_data_cache
+import BlenderDataBakerDescriptor as baked_data_descriptor
+import BlenderDataBakerTextures as baked_data_textures
+import BlenderDataBakerProfiler as baked_data_profiler
+import BlenderDataBakerResolver as baked_data_resolver
+import BlenderDataBakerClips as baked_data_clips
+import BlenderDataBakerAtlas as baked_data_atlas
+import BlenderDataBakerSDF as baked_data_sdf
+import BlenderDataBakerHierarchy as baked_data_hierarchy
+
+# @NOTE bump whenever the importer output changes, this invalidates the import manifest
+IMPORTER_VERSION = "10"
+
+# where parent materials shared by VAT material instances live
+PARENT_MATERIAL_PATH = "/Game/BlenderGameTools/VAT/Materials"
+
+# material function sampling the volume textures SDF bakes are imported as
+SDF_FUNCTION_PATH = "/Game/BlenderGameTools/SDF/Functions/MF_SDF_Volume"
+
+# material function fetching the ancestor lookups generated for ObjectAttributes hierarchies
+ANCESTORS_FUNCTION_PATH = "/Game/BlenderGameTools/ObjectAttributes/Functions/MF_OA_Ancestors"
+
+# max reconstruction error, in the descriptor's units, a texture format may introduce to be picked over TC_HDR_F32
+COMPRESSION_TOLERANCE = 0.001
+
+# max angle, in degrees, interpolated normals may deviate by for a frame to be decimated
+DECIMATION_NORMAL_TOLERANCE = 1.0
+
 def get_valid_bake_types():
-    return ['VAT', 'BAT', 'OAT', 'DATA']
+    return ['VAT', 'BAT', 'OAT', 'DATA', 'OA', 'SDF']
+
+def get_supported_bake_types():
+    return ['VAT', 'SDF', 'OA', 'OAT']
 
 def is_bake_type_valid(type):
     if type:
         if isinstance(type, str):
-            return type in get_valid_bake_types()
+            return baked_data_descriptor.get_bake_type(type) in get_valid_bake_types()
     
     return False
 
@@ -45,430 +79,2001 @@ def get_converted_scale(system, unit, length, scale):
     length = scale / length_unit
     return length
 
-def import_baked_data(file_path, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, create_material_subfolder, create_material_name, obj_name = ""):
-    """ """
-    if destination == "":
-        return (False, "Invalid destination")
-
+def load_baked_data(file_path, resolver = None):
+    """ Files the descriptor references are relocated by resolver, defaulting to the one of the descriptor's own folder """
     if not os.path.exists(file_path):
-        return (False, "File does not exist")
+        return (None, "File does not exist")
 
     if Path(file_path).suffix != ".xml":
-        return (False, "File doesn't seem to be an xml file")
+        return (None, "File doesn't seem to be an xml file")
+
+    try:
+        with baked_data_profiler.phase("parse", file_path):
+            baked_data = baked_data_descriptor.parse_baked_data(file_path)
+    except ET.ParseError as e:
+        return (None, "Couldn't parse xml file: " + str(e))
+
+    if resolver is None:
+        resolver = baked_data_resolver.get_file_resolver(baked_data_resolver.get_baked_data_root_dir(file_path))
+
+    with baked_data_profiler.phase("resolve", file_path):
+        resolver.resolve_baked_data(baked_data)
+
+    return (baked_data, "")
+
+# overrides the manifest path, workers importing in parallel each write their own (see BlenderDataBakerRunner)
+import_manifest_path = None
+
+def get_shared_import_manifest_path():
+    """ """
+    return os.path.join(unreal.Paths.project_saved_dir(), "BlenderGameTools", "ImportManifest.json")
+
+def get_import_manifest_path():
+    """ """
+    return import_manifest_path if import_manifest_path else get_shared_import_manifest_path()
+
+def clear_import_manifest():
+    """ """
+    baked_data_cache.clear_import_manifest(get_import_manifest_path())
+
+def get_import_options(*options):
+    """ """
+    return "|".join(str(option) for option in options)
+
+def get_baked_data_fingerprints(manifest, baked_data):
+    """ Fingerprints of the descriptor and of the files it references, unchanged files reuse the hash of their manifest entry """
+    with baked_data_profiler.phase("fingerprints", baked_data.file_path):
+        return baked_data_cache.get_baked_data_fingerprints([baked_data.file_path] + baked_data.get_files(), manifest.get(baked_data.ID))
+
+def load_baked_data_fingerprints(file_path, resolver, manifest):
+    """ Returns (baked_data, msg, fingerprints), parsing and hashing are done together on the worker threads of import_baked_directory_steps() """
+    baked_data, msg = load_baked_data(file_path, resolver)
+    if baked_data is None:
+        return (None, msg, None)
+
+    return (baked_data, msg, get_baked_data_fingerprints(manifest, baked_data))
+
+def check_baked_data_cache(manifest, baked_data, fingerprints, destination, options, force):
+    """ Returns True if the descriptor doesn't have to be imported again, fingerprints being get_baked_data_fingerprints()' """
+    if force or not baked_data.ID:
+        return False
+
+    entry = manifest.get(baked_data.ID)
+    if not baked_data_cache.is_baked_data_up_to_date(entry, fingerprints, destination, options):
+        return False
+
+    # assets might have been deleted since the last import
+    return all(unreal.EditorAssetLibrary.does_asset_exist(asset_path) for asset_path in entry.get("assets", ()))
+
+def get_baked_data_index_path():
+    """ """
+    return os.path.join(unreal.Paths.project_saved_dir(), "BlenderGameTools", "BakedDataIndex.json")
+
+def update_baked_data_index(root_dir):
+    """ Returns the index of every BakedData under root_dir, only re-parsing the ones that changed since the last call """
+    return baked_data_descriptor.build_baked_data_index(root_dir, get_baked_data_index_path())
+
+def get_converted_textures_dir(baked_data):
+    """ Where textures converted by the importer (e.g. 16-bit PNGs, encoded normals) are written before being imported """
+    return os.path.join(unreal.Paths.project_saved_dir(), "BlenderGameTools", "Converted", baked_data.ID if baked_data.ID else Path(baked_data.file_path).stem)
+
+def decimate_frames(baked_data, decimation_tolerance, converted_dir):
+    """ Decimates the VAT frames in converted_dir, returns a FrameDecimation or None if nothing was decimated """
+    if decimation_tolerance <= 0.0 or not converted_dir or not baked_data_textures.is_numpy_available():
+        return None
+
+    unit = baked_data.unit
+    offset_scale = get_converted_scale(unit.system, unit.unit, unit.length, unit.scale)
+
+    decimation = baked_data_clips.decimate_vat_textures(baked_data, converted_dir, decimation_tolerance, DECIMATION_NORMAL_TOLERANCE, offset_scale)
+    if not decimation.frame_remap_path:
+        return None
+
+    return decimation
+
+def get_bounds_limit(baked_data):
+    """ Returns the (negative, positive) bounds extension of the descriptor, None if it has none """
+    mesh = baked_data.mesh
+    if mesh is None or not any(mesh.bounds_offset_min + mesh.bounds_offset_max):
+        return None
+
+    return (mesh.bounds_offset_min, mesh.bounds_offset_max)
+
+def get_clip_bounds_format(baked_data, converted_dir):
+    """ Writes the bounds of every clip in converted_dir, returns the TextureFormat of their lookup texture or None """
+    offset_texture = baked_data.get_texture("Offset")
+    if not converted_dir or not baked_data_textures.is_numpy_available() or offset_texture is None or not offset_texture.path:
+        return None
+
+    offset_scale = get_offset_scale_vat(baked_data)
+    bounds, clip_bounds, msg = baked_data_clips.get_clip_bounds(baked_data, offset_scale if offset_scale is not None else (1.0, 1.0, 1.0), get_bounds_limit(baked_data))
+    if bounds is None:
+        return None
+
+    # clips can't be told apart when frames don't map to rows, the lookup then only holds the whole bake
+    if not clip_bounds:
+        clip_bounds = [bounds]
+
+    file_path = baked_data_clips.get_generated_texture_path(offset_texture, converted_dir, "ClipBounds")
+    baked_data_clips.write_clip_bounds(file_path, bounds, clip_bounds)
+
+    texture_format = baked_data_textures.TextureFormat(baked_data_textures.TEXTURE_FORMAT_LOSSLESS, len(clip_bounds), 2, msg=msg, path=file_path)
+    texture_format.type = "ClipBounds"
+    return texture_format
+
+def get_clip_table_format(baked_data, converted_dir):
+    """ Writes the clip table in converted_dir, returns the TextureFormat of its lookup texture or None if the descriptor has no animation """
+    offset_texture = baked_data.get_texture("Offset")
+    if not converted_dir or not baked_data_textures.is_numpy_available() or offset_texture is None or not offset_texture.path:
+        return None
+
+    file_path = baked_data_clips.get_generated_texture_path(offset_texture, converted_dir, "ClipTable")
+    names = baked_data_clips.write_clip_table(file_path, baked_data)
+    if names is None:
+        return None
+
+    texture_format = baked_data_textures.TextureFormat(baked_data_textures.TEXTURE_FORMAT_LOSSLESS, len(names), 1, path=file_path)
+    texture_format.type = "ClipTable"
+    return texture_format
+
+def get_clip_formats(baked_data, converted_dir):
+    """ Returns the TextureFormat of the per clip lookups generated for the descriptor, keyed by file """
+    texture_formats = {}
+    with baked_data_profiler.phase("clip_bounds", baked_data.file_path):
+        texture_format = get_clip_bounds_format(baked_data, converted_dir)
+    if texture_format is not None:
+        texture_formats[texture_format.path] = texture_format
+
+    with baked_data_profiler.phase("clip_table", baked_data.file_path):
+        texture_format = get_clip_table_format(baked_data, converted_dir)
+    if texture_format is not None:
+        texture_formats[texture_format.path] = texture_format
+
+    return texture_formats
+
+def get_texture_formats(baked_data, compression_tolerance, normal_encoding = 0, converted_dir = None, decimation_tolerance = 0.0):
+    """ Returns the TextureFormat to use for each texture of the descriptor, keyed by source file
+
+    Textures generated by the importer (e.g. the frame remap lookup) are keyed by their own file.
+    Safe to call from worker threads, converted_dir has to be resolved beforehand with get_converted_textures_dir().
+    """
+    if baked_data.type == 'SDF':
+        return get_texture_formats_sdf(baked_data, converted_dir)
+
+    if baked_data.type in ('OA', 'OAT'):
+        return get_texture_formats_oa(baked_data, compression_tolerance, converted_dir)
+
+    with baked_data_profiler.phase("decimation", baked_data.file_path):
+        decimation = decimate_frames(baked_data, decimation_tolerance, converted_dir)
+
+    texture_formats = {}
+    for texture in baked_data.textures:
+        if texture.path and os.path.exists(texture.path):
+            # decimated textures are analyzed (and encoded) instead of their source
+            source_texture = texture
+            if decimation is not None and texture.type in decimation.paths:
+                source_texture = copy.copy(texture)
+                source_texture.path = decimation.paths[texture.type]
 
-    tree = ET.parse(file_path)
-    root = tree.getroot()
+            if normal_encoding and texture.type == "Normal" and converted_dir:
+                with baked_data_profiler.phase("encode_normals", baked_data.file_path):
+                    texture_format = baked_data_textures.encode_normal_texture(source_texture, converted_dir, normal_encoding, compression_tolerance)
+            else:
+                with baked_data_profiler.phase("analyze_texture", baked_data.file_path):
+                    texture_format = baked_data_textures.analyze_texture(source_texture, compression_tolerance, converted_dir)
 
-    baked_data_version = root.get("version")
-    baked_data_type = root.get("type")
+            texture_format.type = texture.type
+            if source_texture is not texture:
+                texture_format.source_height = decimation.num_frames * decimation.rows_per_frame
+                texture_format.frames = (len(decimation.kept_frames), decimation.num_frames)
+
+            texture_formats[texture.path] = texture_format
+
+    if decimation is not None:
+        texture_format = baked_data_textures.TextureFormat(baked_data_textures.TEXTURE_FORMAT_LOSSLESS, decimation.num_frames, 1, path=decimation.frame_remap_path)
+        texture_format.type = "FrameRemap"
+        texture_format.max_error = decimation.max_error
+        texture_formats[decimation.frame_remap_path] = texture_format
+
+    texture_formats.update(get_clip_formats(baked_data, converted_dir))
+
+    return texture_formats
+
+def get_default_material_name(file_path):
+    """ """
+    return "M_" + Path(file_path).stem.replace(".", "_")
+
+def import_baked_data(file_path, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, create_material_subfolder, create_material_name, obj_name = "", force = False, use_parent_material = False, compression_tolerance = COMPRESSION_TOLERANCE, normal_encoding = 0, decimation_tolerance = 0.0):
+    """ """
+    if destination == "":
+        return (False, "Invalid destination")
+
+    baked_data, msg = load_baked_data(file_path)
+    if baked_data is None:
+        return (False, msg)
+
+    baked_data_type = baked_data.type
 
     if is_bake_type_valid(baked_data_type):
+        manifest_path = get_import_manifest_path()
+        manifest = baked_data_cache.load_import_manifest(manifest_path, IMPORTER_VERSION)
+        options = get_import_options(import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, create_material_subfolder, create_material_name, obj_name, use_parent_material, compression_tolerance, normal_encoding, decimation_tolerance)
+        fingerprints = get_baked_data_fingerprints(manifest, baked_data)
+        if check_baked_data_cache(manifest, baked_data, fingerprints, destination, options, force):
+            return (True, "Up to date, skipped")
+
         asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
+        asset_paths = []
         if baked_data_type == 'VAT':
-            success, msg = import_baked_data_vat(root, baked_data_version, asset_tools, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, create_material_subfolder, create_material_name, obj_name)
-            return(success, msg)
+            success, msg = import_baked_data_vat(baked_data, asset_tools, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, create_material_subfolder, create_material_name, obj_name, use_parent_material, compression_tolerance, normal_encoding, decimation_tolerance, asset_paths=asset_paths)
+        elif baked_data_type == 'SDF':
+            success, msg = import_baked_data_sdf(baked_data, asset_tools, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, asset_paths=asset_paths)
+        elif baked_data_type in ('OA', 'OAT'):
+            success, msg = import_baked_data_oa(baked_data, asset_tools, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, compression_tolerance, asset_paths=asset_paths)
         else:
             return (False, "Unsupported importer for now: " + baked_data_type)
+
+        if success and baked_data.ID:
+            manifest[baked_data.ID] = baked_data_cache.create_manifest_entry(fingerprints, destination, options, asset_paths)
+            with baked_data_profiler.phase("manifest"):
+                baked_data_cache.save_import_manifest(manifest_path, IMPORTER_VERSION, manifest)
+        return(success, msg)
     else:
         return (False, "Couldn't deduce data type")
         
     return (True, "")
 
-def import_baked_data_vat(root, version, asset_tools, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, create_material_subfolder, create_material_name, obj_name = ""):
+def get_baked_data_destination(root_dir, file_path, destination, import_mesh_subfolder):
     """ """
+    if destination[-1] != "/":
+        destination += "/"
 
-    import_tasks = []
+    # descriptors are exported next to the mesh, don't nest the mesh subfolder twice
+    relative_dir = Path(file_path).parent.relative_to(root_dir)
+    if import_mesh_subfolder and relative_dir.name == import_mesh_subfolder:
+        relative_dir = relative_dir.parent
+
+    parts = [part.replace(" ", "_").replace(".", "_") for part in relative_dir.parts]
+    if parts:
+        destination += "/".join(parts) + "/"
 
-    baked_data_ID = root.get("ID")
+    return destination
+
+def get_baked_data_files(root_dir):
+    """ BakedData xml found under root_dir, sorted so imports are deterministic """
+    return sorted(str(file_path) for file_path in Path(root_dir).rglob("*.xml"))
+
+def log_import_report(report):
+    """ """
+    for file_path, success, msg in report:
+        if success:
+            unreal.log("Imported baked data: {}".format(file_path))
+        else:
+            unreal.log_warning("Failed to import baked data: {} ({})".format(file_path, msg))
+
+################
+# IMPORT TASKS #
+
+def create_mesh_import_task(mesh_path, destination_path):
+    """ Imports a baked FBX as a single static mesh, settings depending on the bake type are applied once it's imported """
+    asset_import_task = unreal.AssetImportTask()
+    asset_import_task.destination_path = destination_path
+    asset_import_task.filename = mesh_path
+    asset_import_task.replace_existing = True
+    asset_import_task.automated = True
+    asset_import_task.save = False
+
+    asset_import_task.options = unreal.FbxImportUI()
+
+    asset_import_task.options.import_as_skeletal = False
+    asset_import_task.options.import_animations = False
+    asset_import_task.options.import_mesh = True
+    asset_import_task.options.import_rigid_mesh = True
+    asset_import_task.options.import_materials = False
+    asset_import_task.options.import_textures = False
+    asset_import_task.options.create_physics_asset = False
+
+    asset_import_task.options.mesh_type_to_import = unreal.FBXImportType.FBXIT_STATIC_MESH
+
+    asset_import_task.options.static_mesh_import_data.combine_meshes = True
+    asset_import_task.options.static_mesh_import_data.auto_generate_collision = False
+    asset_import_task.options.static_mesh_import_data.build_nanite = False
+    asset_import_task.options.static_mesh_import_data.generate_lightmap_u_vs = False
+    asset_import_task.options.static_mesh_import_data.distance_field_resolution_scale = 0.0
+
+    return asset_import_task
+
+def create_texture_import_task(texture_path, destination_path):
+    """ """
+    asset_import_task = unreal.AssetImportTask()
+    asset_import_task.destination_path = destination_path
+    asset_import_task.filename = texture_path
+    asset_import_task.replace_existing = True
+    asset_import_task.automated = True
+    asset_import_task.save = False
+
+    return asset_import_task
+
+def create_import_tasks(baked_data, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, texture_formats = None):
+    """ Tasks importing the mesh and textures of a BakedData of any type
+
+    texture_formats redirects textures converted by the importer to their converted file and adds the ones it generated.
+    """
+    import_tasks = []
 
     if destination[-1] != "/":
         destination += "/"
 
-    ###############
-    # IMPORT MESH #
-    
-    mesh = root.find("Mesh")
+    mesh = baked_data.mesh
     if mesh is not None and import_mesh:
-        mesh_path = mesh.get("path")
-        if mesh_path and os.path.exists(mesh_path):
-            asset_import_task = unreal.AssetImportTask()
-            asset_import_task.destination_path = destination + import_mesh_subfolder
-            asset_import_task.filename = mesh_path # @TODO
-            asset_import_task.replace_existing = True
-            asset_import_task.automated = True
-            asset_import_task.save = False
-
-            asset_import_task.options = unreal.FbxImportUI()
-
-            asset_import_task.options.import_as_skeletal = False
-            asset_import_task.options.import_animations = False
-            asset_import_task.options.import_mesh = True
-            asset_import_task.options.import_rigid_mesh = True
-            asset_import_task.options.import_materials = False
-            asset_import_task.options.import_textures = False
-            asset_import_task.options.create_physics_asset = False
-
-            asset_import_task.options.mesh_type_to_import = unreal.FBXImportType.FBXIT_STATIC_MESH
-            
-            asset_import_task.options.static_mesh_import_data.combine_meshes = True
-            asset_import_task.options.static_mesh_import_data.auto_generate_collision = False
-            asset_import_task.options.static_mesh_import_data.build_nanite = False
-            asset_import_task.options.static_mesh_import_data.generate_lightmap_u_vs = False
-            asset_import_task.options.static_mesh_import_data.distance_field_resolution_scale = 0.0
-
-            import_tasks.append(asset_import_task)
+        if mesh.path and os.path.exists(mesh.path):
+            import_tasks.append(create_mesh_import_task(mesh.path, destination + import_mesh_subfolder))
+
+    if import_textures:
+        for texture in baked_data.textures:
+            texture_path = texture.path
+            if texture_path is not None and os.path.exists(texture_path):
+                texture_format = texture_formats.get(texture_path) if texture_formats else None
+                if texture_format is not None and texture_format.path:
+                    texture_path = texture_format.path
+
+                import_tasks.append(create_texture_import_task(texture_path, destination + import_textures_subfolder))
+
+        # textures generated by the importer have no source texture
+        source_paths = set(texture.path for texture in baked_data.textures)
+        for texture_path, texture_format in (texture_formats.items() if texture_formats else ()):
+            if texture_path not in source_paths and texture_format.path and os.path.exists(texture_format.path):
+                import_tasks.append(create_texture_import_task(texture_format.path, destination + import_textures_subfolder))
+
+    return import_tasks
+
+def share_import_tasks(import_tasks, fingerprints, texture_formats, shared_tasks):
+    """ Swaps the tasks importing a file already imported by another BakedData of the batch for that BakedData's task
+
+    Files are matched by content hash, textures also by the format they're imported with, files converted by the
+    importer are never shared. shared_tasks maps matched files to their task. Returns (new_tasks, source_tasks), the
+    tasks left to import and the task importing each file of the BakedData keyed by its own path.
+    """
+    new_tasks = []
+    source_tasks = {}
+    for index, import_task in enumerate(import_tasks):
+        source_tasks[import_task.filename] = import_task
+
+        fingerprint = fingerprints.get(import_task.filename)
+        if not fingerprint or not fingerprint.get("hash"):
+            new_tasks.append(import_task)
+            continue
+
+        texture_format = texture_formats.get(import_task.filename) if texture_formats else None
+        key = (fingerprint["hash"], texture_format.name if texture_format is not None else "")
+
+        shared_task = shared_tasks.get(key)
+        if shared_task is None:
+            shared_tasks[key] = import_task
+            new_tasks.append(import_task)
+        else:
+            # a shared task's filename is the path of the BakedData that imported it
+            import_tasks[index] = shared_task
+            source_tasks[import_task.filename] = shared_task
+
+    return (new_tasks, source_tasks)
+
+def get_source_tasks(import_tasks):
+    """ Tasks keyed by the file they import, see share_import_tasks() """
+    return {import_task.filename: import_task for import_task in import_tasks}
+
+################
+# IMPORT STEPS #
+
+# stages every descriptor goes through in import_baked_directory_steps(), each completes a unit of work
+IMPORT_STAGES = ("parse", "analyze", "import", "post_process")
+
+# @NOTE import steps are generators yielding either (work, msg) once they did some work, work being the number of stages
+# completed, or a concurrent.futures.Future they're waiting on. They're run to completion by run_import_steps() or
+# time-sliced over editor ticks by BlenderDataBakerJob.ImportJob
+
+def run_import_steps(steps):
+    """ Runs import steps to completion, blocking on the worker threads they wait on, returns their result """
+    try:
+        while True:
+            step = next(steps)
+            if isinstance(step, concurrent.futures.Future):
+                concurrent.futures.wait((step,))
+    except StopIteration as stop:
+        return stop.value
+
+def wait_for_future(future):
+    """ Import steps waiting on future, returns its result """
+    while not future.done():
+        yield future
+
+    return future.result()
+
+def get_created_asset_paths(import_tasks, create_material, material_path, material_name):
+    """ Assets importing a single BakedData creates, shared parent materials aside """
+    asset_paths = [object_path for import_task in import_tasks for object_path in import_task.imported_object_paths]
+    if create_material:
+        asset_paths.append(material_path.rstrip("/") + "/" + material_name)
+
+    return asset_paths
+
+def delete_assets(asset_paths):
+    """ Deletes the assets of asset_paths that exist """
+    for asset_path in asset_paths:
+        if unreal.EditorAssetLibrary.does_asset_exist(asset_path):
+            unreal.EditorAssetLibrary.delete_asset(asset_path)
+            unreal.log("Deleted partially imported asset: {}".format(asset_path))
+
+def get_baked_data_asset_paths(baked_data, import_tasks, create_material, material_path, material_name):
+    """ Assets of a BakedData of any supported type, shared materials and material functions aside """
+    if baked_data.type == 'SDF':
+        return get_created_asset_paths_sdf(import_tasks)
+
+    # ObjectAttributes/OAT bakes only create the shared ancestors function
+    if baked_data.type in ('OA', 'OAT'):
+        return get_created_asset_paths(import_tasks, False, "", "")
+
+    return get_created_asset_paths(import_tasks, create_material, material_path, material_name)
+
+def import_baked_directory(root_dir, destination, import_mesh = True, import_mesh_subfolder = "Meshes", import_textures = True, import_textures_subfolder = "Textures", create_material = True, create_material_subfolder = "Materials", create_material_name = "", max_workers = None, force = False, use_parent_material = False, compression_tolerance = COMPRESSION_TOLERANCE, normal_encoding = 0, decimation_tolerance = 0.0):
+    """ Imports every BakedData xml found under root_dir with a single batched import, returns a list of (file_path, success, msg) """
+    report = []
+
+    if destination == "":
+        return report
+
+    if not os.path.isdir(root_dir):
+        return report
+
+    run_import_steps(import_baked_directory_steps(report, get_baked_data_files(root_dir), root_dir, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, create_material_subfolder, create_material_name, max_workers, force, use_parent_material, compression_tolerance, normal_encoding, decimation_tolerance))
+
+    log_import_report(report)
+    return report
+
+def import_baked_directory_steps(report, file_paths, root_dir, destination, import_mesh = True, import_mesh_subfolder = "Meshes", import_textures = True, import_textures_subfolder = "Textures", create_material = True, create_material_subfolder = "Materials", create_material_name = "", max_workers = None, force = False, use_parent_material = False, compression_tolerance = COMPRESSION_TOLERANCE, normal_encoding = 0, decimation_tolerance = 0.0, batch_import = True, in_flight_assets = None):
+    """ Import steps of import_baked_directory(), (file_path, success, msg) are appended to report as descriptors complete
+
+    Without batch_import every BakedData is imported on its own so a step never imports more than one. in_flight_assets,
+    if given, is kept filled with the assets of the BakedData being post processed, the ones to delete if the steps are
+    stopped before it completes. They're also deleted if its post processing raises, the BakedData is then reported as
+    failed and the steps go on. Manifest entries of completed descriptors are saved even if the steps are stopped.
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    manifest_path = get_import_manifest_path()
+    manifest = baked_data_cache.load_import_manifest(manifest_path, IMPORTER_VERSION)
+    pending = []
+
+    try:
+        #########
+        # PARSE #
+
+        # the tree is indexed once for the whole batch, descriptors are then relocated without touching the disk
+        resolver = yield from wait_for_future(executor.submit(baked_data_resolver.get_file_resolver, root_dir, True))
+
+        # @NOTE workers only read the manifest, it's not written before every parse future is done
+        parse_futures = [executor.submit(load_baked_data_fingerprints, file_path, resolver, manifest) for file_path in file_paths]
+
+        ###############
+        # GATHER TASK #
+
+        asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
+
+        skipped_work = len(IMPORT_STAGES) - 1
+        for file_path, parse_future in zip(file_paths, parse_futures):
+            baked_data, msg, fingerprints = yield from wait_for_future(parse_future)
+            yield (1, "Parsed " + file_path)
+
+            if baked_data is None:
+                report.append((file_path, False, msg))
+                yield (skipped_work, msg)
+                continue
+
+            baked_data_type = baked_data.type
+            if not is_bake_type_valid(baked_data_type):
+                report.append((file_path, False, "Couldn't deduce data type"))
+                yield (skipped_work, "Couldn't deduce data type")
+                continue
+
+            if baked_data_type not in get_supported_bake_types():
+                report.append((file_path, False, "Unsupported importer for now: " + baked_data_type))
+                yield (skipped_work, "Unsupported importer for now: " + baked_data_type)
+                continue
+
+            baked_data_destination = get_baked_data_destination(root_dir, file_path, destination, import_mesh_subfolder)
+            material_name = create_material_name if create_material_name else get_default_material_name(file_path)
+
+            options = get_import_options(import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, create_material_subfolder, material_name, use_parent_material, compression_tolerance, normal_encoding, decimation_tolerance)
+            if check_baked_data_cache(manifest, baked_data, fingerprints, baked_data_destination, options, force):
+                report.append((file_path, True, "Up to date, skipped"))
+                yield (skipped_work, "Up to date, skipped " + file_path)
+                continue
+
+            pending.append((file_path, baked_data, baked_data_destination, material_name, options, fingerprints, get_converted_textures_dir(baked_data)))
+
+        ###################
+        # TEXTURE FORMATS #
+
+        # numpy releases the GIL, textures are analyzed and converted while others are being read
+        texture_formats = [{} for _ in pending]
+        if import_textures:
+            format_futures = [executor.submit(get_texture_formats, baked_data, compression_tolerance, normal_encoding, converted_dir, decimation_tolerance) for (file_path, baked_data, baked_data_destination, material_name, options, fingerprints, converted_dir) in pending]
+            for index, format_future in enumerate(format_futures):
+                texture_formats[index] = yield from wait_for_future(format_future)
+                yield (1, "Analyzed textures of " + pending[index][0])
+        elif pending:
+            yield (len(pending), "Skipped textures")
+
+        ##########
+        # IMPORT #
+
+        # identical files referenced by several descriptors are imported once, see share_import_tasks()
+        shared_tasks = {}
+        shared_assets = {}
+
+        pending_tasks = [[] for _ in pending]
+        new_tasks = [[] for _ in pending]
+        source_tasks = [{} for _ in pending]
+        if batch_import:
+            import_tasks = []
+            for index, ((file_path, baked_data, baked_data_destination, material_name, options, fingerprints, converted_dir), baked_data_texture_formats) in enumerate(zip(pending, texture_formats)):
+                with baked_data_profiler.phase("create_tasks", baked_data.file_path):
+                    pending_tasks[index] = create_import_tasks(baked_data, baked_data_destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, baked_data_texture_formats)
+                    new_tasks[index], source_tasks[index] = share_import_tasks(pending_tasks[index], fingerprints, baked_data_texture_formats, shared_tasks)
+
+                import_tasks.extend(new_tasks[index])
+
+            if import_tasks:
+                with baked_data_profiler.phase("import_asset_tasks"):
+                    asset_tools.import_asset_tasks(import_tasks)
+
+            if pending:
+                yield (len(pending), "Imported {} baked data".format(len(pending)))
+
+        ###################
+        # POST PROCESSING #
+
+        # parent materials are created with the displacement clamp of the whole batch, each one compiles once
+        parent_displacements = None
+        if create_material and use_parent_material:
+            parent_displacements = get_parent_displacements_vat([baked_data for file_path, baked_data, baked_data_destination, material_name, options, fingerprints, converted_dir in pending], texture_formats)
+
+        for index, ((file_path, baked_data, baked_data_destination, material_name, options, fingerprints, converted_dir), baked_data_texture_formats) in enumerate(zip(pending, texture_formats)):
+            if not batch_import:
+                with baked_data_profiler.phase("create_tasks", baked_data.file_path):
+                    pending_tasks[index] = create_import_tasks(baked_data, baked_data_destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, baked_data_texture_formats)
+                    new_tasks[index], source_tasks[index] = share_import_tasks(pending_tasks[index], fingerprints, baked_data_texture_formats, shared_tasks)
+
+                if new_tasks[index]:
+                    with baked_data_profiler.phase("import_asset_tasks", baked_data.file_path):
+                        asset_tools.import_asset_tasks(new_tasks[index])
+
+            baked_data_tasks = pending_tasks[index]
+            if in_flight_assets is not None:
+                # shared assets belong to the descriptor that imported them
+                in_flight_assets[:] = get_baked_data_asset_paths(baked_data, new_tasks[index], create_material, baked_data_destination + create_material_subfolder, material_name)
+
+            if not batch_import:
+                yield (1, "Imported " + file_path)
+
+            missing = [import_task.filename for import_task in baked_data_tasks if not import_task.imported_object_paths]
+            if missing:
+                report.append((file_path, False, "Failed to import: " + ", ".join(missing)))
+                yield (1, "Failed to import " + file_path)
+                continue
+
+            try:
+                with baked_data_profiler.phase("post_process", file_path):
+                    if baked_data.type == 'SDF':
+                        success, msg = yield from process_imported_assets_sdf_steps(baked_data, asset_tools, baked_data_tasks, create_material, baked_data_texture_formats, source_tasks[index])
+                    elif baked_data.type in ('OA', 'OAT'):
+                        success, msg = yield from process_imported_assets_oa_steps(baked_data, asset_tools, baked_data_tasks, create_material, baked_data_texture_formats, source_tasks[index])
+                    else:
+                        success, msg = yield from process_imported_assets_vat_steps(baked_data, asset_tools, baked_data_destination, baked_data_tasks, create_material, create_material_subfolder, material_name, use_parent_material=use_parent_material, texture_formats=baked_data_texture_formats, shared_assets=shared_assets, source_tasks=source_tasks[index], parent_displacements=parent_displacements)
+            except Exception as e:
+                success, msg = (False, "Post processing failed: " + str(e))
+
+                # jobs delete the assets of the failed descriptor and go on, the next descriptor sharing its files imports them again
+                if in_flight_assets is not None:
+                    delete_assets(in_flight_assets)
+                    for key, import_task in list(shared_tasks.items()):
+                        if import_task in new_tasks[index]:
+                            del shared_tasks[key]
+                    for asset_path in in_flight_assets:
+                        shared_assets.pop(asset_path, None)
+
+            if success and baked_data.ID:
+                # shared assets are recorded too, deleting them has to re-import every descriptor using them
+                asset_paths = get_baked_data_asset_paths(baked_data, baked_data_tasks, create_material, baked_data_destination + create_material_subfolder, material_name)
+                manifest[baked_data.ID] = baked_data_cache.create_manifest_entry(fingerprints, baked_data_destination, options, asset_paths)
+
+            # failed imports keep their assets, as when importing in one go
+            if in_flight_assets is not None:
+                in_flight_assets.clear()
+
+            report.append((file_path, success, msg))
+            yield (1, "Post processed " + file_path)
+
+    finally:
+        # stopped steps don't wait for the descriptors still being parsed or analyzed
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        if pending:
+            with baked_data_profiler.phase("manifest"):
+                baked_data_cache.save_import_manifest(manifest_path, IMPORTER_VERSION, manifest)
+
+def get_atlas_dir(atlas_name):
+    """ Where atlases built by the importer are written before being imported """
+    return os.path.join(unreal.Paths.project_saved_dir(), "BlenderGameTools", "Atlas", atlas_name)
+
+def import_baked_atlas(root_dir, destination, atlas_name = "", file_paths = None, import_mesh = True, import_mesh_subfolder = "Meshes", import_textures_subfolder = "Textures", create_material = True, create_material_subfolder = "Materials", use_parent_material = False, max_atlas_size = None, force = False, compression_tolerance = COMPRESSION_TOLERANCE, normal_encoding = 0, decimation_tolerance = 0.0):
+    """ Imports several VAT BakedData whose Offset/Normal textures are packed in shared atlases, returns a list of (file_path, success, msg)
+
+    file_paths defaults to every BakedData xml found under root_dir, atlases are imported in destination.
+    Bakes that can't be packed (e.g. continuous frames) are imported with their own textures, compression_tolerance,
+    normal_encoding and decimation_tolerance only apply to them as atlases stay lossless.
+
+    Packing depends on every bake, the manifest entry of each one records the files of them all. The atlases are only
+    skipped, unless force is set, if every bake is up to date.
+    """
+    report = []
+
+    if destination == "":
+        return report
+
+    if not os.path.isdir(root_dir):
+        return report
+
+    if not baked_data_textures.is_numpy_available():
+        report.append((root_dir, False, "numpy isn't available"))
+        return report
+
+    if destination[-1] != "/":
+        destination += "/"
+
+    if not atlas_name:
+        atlas_name = Path(root_dir).name.replace(" ", "_").replace(".", "_")
+
+    if file_paths is None:
+        file_paths = get_baked_data_files(root_dir)
+
+    #########
+    # PARSE #
+
+    asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
+    manifest_path = get_import_manifest_path()
+    manifest = baked_data_cache.load_import_manifest(manifest_path, IMPORTER_VERSION)
+
+    baked_datas = []
+    atlas_fingerprints = {}
+    for file_path in file_paths:
+        baked_data, msg = load_baked_data(file_path)
+        if baked_data is None:
+            report.append((file_path, False, msg))
+        elif baked_data.type != 'VAT':
+            report.append((file_path, False, "Unsupported importer for atlases: " + baked_data.type))
+        else:
+            baked_datas.append((file_path, baked_data))
+            atlas_fingerprints.update(get_baked_data_fingerprints(manifest, baked_data))
+
+    # the atlas name and size change the packing as much as the options of a single import
+    atlas_options = {}
+    for file_path, baked_data in baked_datas:
+        atlas_options[file_path] = get_import_options(import_mesh, import_mesh_subfolder, import_textures_subfolder, create_material, create_material_subfolder, get_default_material_name(file_path), use_parent_material, compression_tolerance, normal_encoding, decimation_tolerance, atlas_name, max_atlas_size)
+
+    up_to_date = [check_baked_data_cache(manifest, baked_data, atlas_fingerprints, get_baked_data_destination(root_dir, file_path, destination, import_mesh_subfolder), atlas_options[file_path], force) for file_path, baked_data in baked_datas]
+    if baked_datas and all(up_to_date):
+        for file_path, baked_data in baked_datas:
+            report.append((file_path, True, "Up to date, skipped"))
+
+        log_import_report(report)
+        return report
+
+    #########
+    # ATLAS #
+
+    atlases, regions, msgs = baked_data_atlas.build_vat_atlases([baked_data for _, baked_data in baked_datas], get_atlas_dir(atlas_name), atlas_name, max_atlas_size if max_atlas_size else baked_data_atlas.ATLAS_MAX_SIZE)
+
+    atlas_tasks = []
+    atlas_formats = []
+    for atlas in atlases:
+        tasks = []
+        texture_formats = {}
+        for texture_type, texture_path in atlas.paths.items():
+            tasks.append(create_texture_import_task(texture_path, destination + import_textures_subfolder))
+
+            # regions of remapped and not remapped bakes can't share one error measure, atlases stay lossless
+            texture_format = baked_data_textures.TextureFormat(baked_data_textures.TEXTURE_FORMAT_LOSSLESS, atlas.width, atlas.height, msg="atlas of {} bakes".format(atlas.count), path=texture_path)
+            texture_format.type = texture_type
+            texture_formats[texture_path] = texture_format
+
+        atlas_tasks.append(tasks)
+        atlas_formats.append(texture_formats)
+
+    import_tasks = [asset_import_task for tasks in atlas_tasks for asset_import_task in tasks]
+    pending = []
+    unpacked_paths = []
+    for (file_path, baked_data), region, msg in zip(baked_datas, regions, msgs):
+        baked_data_destination = get_baked_data_destination(root_dir, file_path, destination, import_mesh_subfolder)
+        material_name = get_default_material_name(file_path)
+
+        if region is None:
+            unreal.log("Not packing {} in an atlas: {}".format(file_path, msg))
+            unpacked_paths.append(file_path)
+            continue
+
+        # clips aren't shared, each bake imports its own lookups
+        texture_formats = dict(atlas_formats[region.atlas])
+        clip_formats = get_clip_formats(baked_data, get_converted_textures_dir(baked_data))
+
+        with baked_data_profiler.phase("create_tasks", baked_data.file_path):
+            baked_data_tasks = create_import_tasks(baked_data, baked_data_destination, import_mesh, import_mesh_subfolder, False, import_textures_subfolder)
+            for texture_format in clip_formats.values():
+                texture_formats[texture_format.path] = texture_format
+                baked_data_tasks.append(create_texture_import_task(texture_format.path, baked_data_destination + import_textures_subfolder))
+
+        import_tasks.extend(baked_data_tasks)
+        pending.append((file_path, baked_data, baked_data_destination, material_name, region, texture_formats, baked_data_tasks))
+
+    ##########
+    # IMPORT #
+
+    if import_tasks:
+        with baked_data_profiler.phase("import_asset_tasks"):
+            asset_tools.import_asset_tasks(import_tasks)
 
     ###################
-    # IMPORT TEXTURES #
+    # POST PROCESSING #
+
+    entries = {}
+    for file_path, baked_data, baked_data_destination, material_name, region, texture_formats, baked_data_tasks in pending:
+        missing = [import_task.filename for import_task in baked_data_tasks + atlas_tasks[region.atlas] if not import_task.imported_object_paths]
+        if missing:
+            report.append((file_path, False, "Failed to import: " + ", ".join(missing)))
+            continue
+
+        try:
+            with baked_data_profiler.phase("post_process", file_path):
+                success, msg = process_imported_assets_vat(baked_data, asset_tools, baked_data_destination, baked_data_tasks + atlas_tasks[region.atlas], create_material, create_material_subfolder, material_name, use_parent_material=use_parent_material, texture_formats=texture_formats, atlas_region=region)
+        except Exception as e:
+            success, msg = (False, "Post processing failed: " + str(e))
+
+        if success and baked_data.ID:
+            # the atlases are recorded too, deleting them has to rebuild every bake packed in them
+            asset_paths = get_baked_data_asset_paths(baked_data, baked_data_tasks + atlas_tasks[region.atlas], create_material, baked_data_destination + create_material_subfolder, material_name)
+            entries[baked_data.ID] = baked_data_cache.create_manifest_entry(atlas_fingerprints, baked_data_destination, atlas_options[file_path], asset_paths)
+
+        report.append((file_path, success, msg))
+
+    # bakes left out of the atlases import like any other
+    if unpacked_paths:
+        unpacked_report = []
+        run_import_steps(import_baked_directory_steps(unpacked_report, unpacked_paths, root_dir, destination, import_mesh, import_mesh_subfolder, True, import_textures_subfolder, create_material, create_material_subfolder, force=force, use_parent_material=use_parent_material, compression_tolerance=compression_tolerance, normal_encoding=normal_encoding, decimation_tolerance=decimation_tolerance))
+        report.extend(unpacked_report)
+
+        # their entries are the ones the steps saved, recorded against every bake of the atlases like the packed ones
+        manifest = baked_data_cache.load_import_manifest(manifest_path, IMPORTER_VERSION)
+        baked_data_ids = {file_path: baked_data.ID for file_path, baked_data in baked_datas}
+        for file_path, success, msg in unpacked_report:
+            entry = manifest.get(baked_data_ids[file_path])
+            if success and entry:
+                entries[baked_data_ids[file_path]] = baked_data_cache.create_manifest_entry(atlas_fingerprints, entry["destination"], atlas_options[file_path], entry.get("assets", ()))
+
+    if entries:
+        manifest.update(entries)
+        with baked_data_profiler.phase("manifest"):
+            baked_data_cache.save_import_manifest(manifest_path, IMPORTER_VERSION, manifest)
+
+    for atlas in atlases:
+        unreal.log("Packed {} bakes in atlas {} ({}x{})".format(atlas.count, atlas.index, atlas.width, atlas.height))
+
+    log_import_report(report)
+    return report
+
+def import_baked_data_vat(baked_data, asset_tools, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, create_material_subfolder, create_material_name, obj_name = "", use_parent_material = False, compression_tolerance = COMPRESSION_TOLERANCE, normal_encoding = 0, decimation_tolerance = 0.0, asset_paths = None):
+    """ asset_paths, if given, is filled with the assets the import created """
+    if destination[-1] != "/":
+        destination += "/"
+
+    texture_formats = get_texture_formats(baked_data, compression_tolerance, normal_encoding, get_converted_textures_dir(baked_data), decimation_tolerance) if import_textures else {}
+
+    with baked_data_profiler.phase("create_tasks", baked_data.file_path):
+        import_tasks = create_import_tasks(baked_data, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, texture_formats)
 
-    textures = root.find("Textures")
-    if textures is not None and import_textures:
-        for texture in textures.findall("Texture"):
-            texture_path = texture.get("path")
-            if texture_path is not None and os.path.exists(texture_path):
-                asset_import_task = unreal.AssetImportTask()
-                asset_import_task.destination_path = destination + import_textures_subfolder
-                asset_import_task.filename = texture_path # @TODO
-                asset_import_task.replace_existing = True
-                asset_import_task.automated = True
-                asset_import_task.save = False
-
-                import_tasks.append(asset_import_task)
-    
     ##########
     # IMPORT #
     
-    asset_tools.import_asset_tasks(import_tasks)
+    with baked_data_profiler.phase("import_asset_tasks", baked_data.file_path):
+        asset_tools.import_asset_tasks(import_tasks)
 
-    #######
-    # XML #
+    if asset_paths is not None:
+        asset_paths.extend(get_baked_data_asset_paths(baked_data, import_tasks, create_material, destination + create_material_subfolder, create_material_name))
+
+    with baked_data_profiler.phase("post_process", baked_data.file_path):
+        return process_imported_assets_vat(baked_data, asset_tools, destination, import_tasks, create_material, create_material_subfolder, create_material_name, obj_name, use_parent_material, texture_formats=texture_formats)
+
+def get_offset_scale_vat(baked_data):
+    """ Returns the per axis scale the material applies to offsets, None if they're used as-is """
+    unit = baked_data.unit
+
+    # see if offset VAT is in centimeters
+    converted_scale = get_converted_scale(unit.system, unit.unit, unit.length, unit.scale) # @TODO apply scale to material > (scale / length) ?
+    converted = abs(converted_scale - 1.0) < 0.001
+
+    # see if offset VAT is inverted
+    inverted = (not unit.invert_x) and (unit.invert_y) and (not unit.invert_z) # @TODO do smthing if not x/Y/z
+    offset_scale = None
+    if not inverted and converted: # @TODO fix
+        pass
+    else:
+        offset_scale = (-converted_scale if unit.invert_x else converted_scale,
+                        converted_scale if unit.invert_y else -converted_scale,
+                        -converted_scale if unit.invert_z else converted_scale)
+
+    return offset_scale
+
+def get_material_settings_vat(baked_data, normal_encoding = 0, frame_remap = False, atlas_region = None, bounds = None, clip_table = False):
+    """ Gathers everything the VAT material needs from the descriptor
+
+    normal_encoding is the bits of octahedral encoded normals, frame_remap is set when frames were decimated.
+    atlas_region is the AtlasRegion of the bake when its textures were packed in an atlas.
+    bounds is the OffsetBounds scanned from the offset texture, the descriptor's bounds are used otherwise.
+    clip_table is set when the Frame/PrevFrame dynamic parameters are frames of the Anim/PrevAnim clips of the clip table.
+    """
+    settings = {}
 
-    frames = root.find("Frames")
+    frames_width = 1.0
+    frames_height = 1.0
+    frames = baked_data.frames
     if frames is not None:
-        frames_sampling = frames.get("sampling") # @TODO do things differently depending on this
-        frames_count = frames.get("count")
-        frames_padded = frames.get("padded")
-        frames_padding = frames.get("padding")
-        frames_width = frames.get("width")
-        frames_height = frames.get("height")
-
-    uv = root.find("UV")
-    if uv is not None:
-        uv_index = uv.get("index")
-        uv_index_v = uv.get("invert_v") # @TODO update material with this
-
-    mesh = root.find("Mesh")
+        frames_sampling = frames.sampling # @TODO do things differently depending on this
+        frames_width = frames.width
+        frames_height = frames.height
+
+    uv_index = 0
+    mesh_bounds_offset = [0.0] * 6
+    mesh = baked_data.mesh
     if mesh is not None:
-        mesh_bounds_offset_min_x = mesh.get("bounds_offset_min_x")
-        mesh_bounds_offset_min_y = mesh.get("bounds_offset_min_y")
-        mesh_bounds_offset_min_z = mesh.get("bounds_offset_min_z")
-        mesh_bounds_offset_max_x = mesh.get("bounds_offset_max_x")
-        mesh_bounds_offset_max_y = mesh.get("bounds_offset_max_y")
-        mesh_bounds_offset_max_z = mesh.get("bounds_offset_max_z")
-
-    StateMachine = []
-    animations = root.find("Animations")
-    if animations:
-        for animation in animations.findall("Animation"):
-            animation_name = animation.get("name")
-            animation_start_frame = animation.get("start_frame")
-            animation_end_frame = animation.get("end_frame")
-            animation_frames = animation.get("frames")
-
-            StateMachine.append((animation_name, animation_start_frame, animation_end_frame, animation_frames))
+        uv_index = mesh.uv_index # @TODO update material with unit.invert_v
+        mesh_bounds_offset = list(mesh.bounds_offset_min) + list(mesh.bounds_offset_max)
+
+    normal_remap = False
+    normal_texture = baked_data.get_texture("Normal")
+    if normal_texture is not None and not normal_encoding:
+        normal_remap = normal_texture.remapped
+
+    offset_remap = False
+    offset_remapping = (0.0, 0.0, 0.0)
+    offset_texture = baked_data.get_texture("Offset")
+    if offset_texture is not None:
+        offset_remap = offset_texture.remapped
+        if offset_texture.range is not None:
+            offset_remapping = offset_texture.range
+
+    offset_scale = get_offset_scale_vat(baked_data)
+
+    # WPO is clamped to max_displacement, it has to cover the largest offset and not only the bounds extension
+    max_displacement = max(mesh_bounds_offset)
+    if bounds is not None:
+        mesh_bounds_offset = list(bounds.negative) + list(bounds.positive)
+        max_displacement = bounds.max_displacement
+
+    settings["uv_index"] = uv_index
+    settings["frames_width"] = frames_width
+    settings["frames_height"] = frames_height
+    settings["bounds_offset"] = mesh_bounds_offset
+    settings["max_displacement"] = max_displacement
+    settings["normal_remapped"] = normal_remap
+    settings["normal_remapping"] = (1.0, 1.0, 1.0)
+    settings["offset_remapped"] = offset_remap
+    settings["offset_remapping"] = offset_remapping
+    settings["offset_scale"] = offset_scale
+    settings["normal_encoding"] = normal_encoding
+    settings["frame_remap"] = frame_remap
+    settings["atlas_scale"] = atlas_region.get_uv_scale() if atlas_region is not None else None
+    settings["atlas_offset"] = atlas_region.get_uv_offset() if atlas_region is not None else None
+    settings["clip_table"] = clip_table
+    settings["interpolation_auto"] = False # @TODO set
+    settings["interpolation_nearest"] = True # @TODO set, encoded normals can't be interpolated
+    settings["continuous"] = True # @TODO set
+
+    return settings
+
+def get_analyzed_material_settings_vat(baked_data, texture_formats, atlas_region = None):
+    """ Returns (settings, bounds, clip_bounds), the material settings of a VAT BakedData whose textures were analyzed into texture_formats
+
+    bounds and clip_bounds are the ones scanned from the offset texture, None and [] if it wasn't scanned.
+    """
+    # normals are only encoded if their conversion succeeded
+    normal_encoding = 0
+    normal_texture = baked_data.get_texture("Normal")
+    if normal_texture is not None and normal_texture.path in texture_formats:
+        normal_encoding = texture_formats[normal_texture.path].get_normal_encoding()
+
+    # frames are only remapped if their decimation succeeded
+    frame_remap = any(texture_format.type == "FrameRemap" for texture_format in texture_formats.values())
+
+    # per clip bounds are kept as metadata
+    bounds = None
+    clip_bounds = []
+    for texture_format in texture_formats.values():
+        if texture_format.type == "ClipBounds":
+            bounds, clip_bounds = baked_data_clips.load_clip_bounds(texture_format.path)
+
+    # clips are only selected through the clip table if it was written
+    clip_table = any(texture_format.type == "ClipTable" for texture_format in texture_formats.values())
+
+    return (get_material_settings_vat(baked_data, normal_encoding, frame_remap, atlas_region, bounds, clip_table), bounds, clip_bounds)
+
+def get_parent_displacements_vat(baked_datas, texture_formats):
+    """ Returns the largest max_displacement of the BakedData sharing each parent material, keyed by material signature """
+    parent_displacements = {}
+    for baked_data, baked_data_texture_formats in zip(baked_datas, texture_formats):
+        if baked_data.type == 'VAT':
+            settings, _, _ = get_analyzed_material_settings_vat(baked_data, baked_data_texture_formats)
+            signature = get_material_signature_vat(settings)
+            parent_displacements[signature] = max(parent_displacements.get(signature, 0.0), settings["max_displacement"])
+
+    return parent_displacements
+
+def get_material_signature_vat(settings):
+    """ Identifies the static permutation of a VAT material, materials sharing it only differ by parameter values """
+    return "UV{}_NR{:d}_OR{:d}_IA{:d}_IN{:d}_C{:d}_S{:d}_NE{}_FR{:d}_A{:d}_CT{:d}".format(settings["uv_index"],
+                                                                                  settings["normal_remapped"],
+                                                                                  settings["offset_remapped"],
+                                                                                  settings["interpolation_auto"],
+                                                                                  settings["interpolation_nearest"],
+                                                                                  settings["continuous"],
+                                                                                  settings["offset_scale"] is not None,
+                                                                                  settings["normal_encoding"],
+                                                                                  settings["frame_remap"],
+                                                                                  settings["atlas_scale"] is not None,
+                                                                                  settings["clip_table"])
+
+def create_scalar_expression(material, name, value, node_pos_x, node_pos_y, use_parameters):
+    """ """
+    material_editing = unreal.MaterialEditingLibrary
+    if use_parameters:
+        material_expression = material_editing.create_material_expression(material, unreal.MaterialExpressionScalarParameter, node_pos_x=node_pos_x, node_pos_y=node_pos_y)
+        material_expression.set_editor_property("parameter_name", name)
+        material_expression.set_editor_property("default_value", value)
+    else:
+        material_expression = material_editing.create_material_expression(material, unreal.MaterialExpressionConstant, node_pos_x=node_pos_x, node_pos_y=node_pos_y)
+        material_expression.set_editor_property("R", value)
+
+    return material_expression
+
+def create_vector_expression(material, name, value, node_pos_x, node_pos_y, use_parameters):
+    """ """
+    material_editing = unreal.MaterialEditingLibrary
+    material_prop = unreal.LinearColor(value[0], value[1], value[2], 1.0)
+    if use_parameters:
+        material_expression = material_editing.create_material_expression(material, unreal.MaterialExpressionVectorParameter, node_pos_x=node_pos_x, node_pos_y=node_pos_y)
+        material_expression.set_editor_property("parameter_name", name)
+        material_expression.set_editor_property("default_value", material_prop)
+    else:
+        material_expression = material_editing.create_material_expression(material, unreal.MaterialExpressionConstant3Vector, node_pos_x=node_pos_x, node_pos_y=node_pos_y)
+        material_expression.set_editor_property("Constant", material_prop)
+
+    return material_expression
+
+def create_texture_expression(material, name, texture, node_pos_x, node_pos_y, use_parameters):
+    """ """
+    material_editing = unreal.MaterialEditingLibrary
+    if use_parameters:
+        material_expression = material_editing.create_material_expression(material, unreal.MaterialExpressionTextureObjectParameter, node_pos_x=node_pos_x, node_pos_y=node_pos_y)
+        material_expression.set_editor_property("parameter_name", name)
+    else:
+        material_expression = material_editing.create_material_expression(material, unreal.MaterialExpressionTextureObject, node_pos_x=node_pos_x, node_pos_y=node_pos_y)
+
+    if texture:
+        material_expression.set_editor_property("texture", texture)
+
+    return material_expression
+
+# octahedral decode of the texel fetched by MF_VAT, see BlenderDataBakerCodecs.decode_octahedral()
+NORMAL_DECODE_HLSL = {
+    # float_16_15 layout
+    16: """uint Packed = asuint(Encoded.x);
+uint X = Packed >> 15;
+X = ((X >> 9) << 8) | (X & 0xff);
+float2 F = float2(X / 65535.0, (Packed & 0x7fff) / 32767.0) * 2.0 - 1.0;
+float3 N = float3(F.x, F.y, 1.0 - abs(F.x) - abs(F.y));
+float T = saturate(-N.z);
+N.xy += float2(N.x >= 0.0 ? -T : T, N.y >= 0.0 ? -T : T);
+return normalize(N);""",
+    # 8 + 8 bits in a G16 texture
+    8: """uint Packed = uint(round(Encoded.x * 65535.0));
+float2 F = float2(Packed >> 8, Packed & 0xff) / 255.0 * 2.0 - 1.0;
+float3 N = float3(F.x, F.y, 1.0 - abs(F.x) - abs(F.y));
+float T = saturate(-N.z);
+N.xy += float2(N.x >= 0.0 ? -T : T, N.y >= 0.0 ? -T : T);
+return normalize(N);""",
+}
+
+def create_normal_decode_expression(material, normal_encoding, node_pos_x, node_pos_y):
+    """ """
+    material_expression = unreal.MaterialEditingLibrary.create_material_expression(material, unreal.MaterialExpressionCustom, node_pos_x=node_pos_x, node_pos_y=node_pos_y)
+    material_expression.set_editor_property("description", "DecodeOctahedralNormal")
+    material_expression.set_editor_property("code", NORMAL_DECODE_HLSL[normal_encoding])
+    material_expression.set_editor_property("output_type", unreal.CustomMaterialOutputType.CMOT_FLOAT3)
+
+    custom_input = unreal.CustomInput()
+    custom_input.set_editor_property("input_name", "Encoded")
+    material_expression.set_editor_property("inputs", [custom_input])
+
+    return material_expression
+
+# frame of the textures of a clip's frame in the lookup written by BlenderDataBakerClips.write_clip_table(), clips loop
+CLIP_FRAME_HLSL = """float4 Clip = ClipTable.Load(int3(floor(Anim), 0, 0));
+return Clip.x + fmod(max(Frame, 0.0), max(Clip.z, 1.0));"""
+
+def create_clip_frame_expression(material, clip_table_texture_expression, frame_expression, frame_output, anim_output, node_pos_x, node_pos_y):
+    """ Returns the frame of the textures matching the frame_output frame of the anim_output clip """
+    material_editing = unreal.MaterialEditingLibrary
+
+    material_expression = material_editing.create_material_expression(material, unreal.MaterialExpressionCustom, node_pos_x=node_pos_x, node_pos_y=node_pos_y)
+    material_expression.set_editor_property("description", "ClipFrame")
+    material_expression.set_editor_property("code", CLIP_FRAME_HLSL)
+    material_expression.set_editor_property("output_type", unreal.CustomMaterialOutputType.CMOT_FLOAT1)
+
+    custom_inputs = []
+    for input_name in ("Frame", "Anim", "ClipTable"):
+        custom_input = unreal.CustomInput()
+        custom_input.set_editor_property("input_name", input_name)
+        custom_inputs.append(custom_input)
+    material_expression.set_editor_property("inputs", custom_inputs)
+
+    material_editing.connect_material_expressions(frame_expression, frame_output, material_expression, "Frame")
+    material_editing.connect_material_expressions(frame_expression, anim_output, material_expression, "Anim")
+    material_editing.connect_material_expressions(clip_table_texture_expression, "", material_expression, "ClipTable")
+
+    return material_expression
+
+# (row A, row B, alpha) of a frame in the lookup written by BlenderDataBakerClips.decimate_vat_textures()
+FRAME_REMAP_HLSL = "return FrameRemap.Load(int3(floor(Frame), 0, 0)).rgb;"
+
+def create_frame_remap_expressions(material, frame_remap_texture_expression, frame_expression, frame_output, node_pos_x, node_pos_y):
+    """ Returns the row A, row B and alpha masks of the frame remap lookup at the given frame """
+    material_editing = unreal.MaterialEditingLibrary
+
+    material_expression = material_editing.create_material_expression(material, unreal.MaterialExpressionCustom, node_pos_x=node_pos_x, node_pos_y=node_pos_y)
+    material_expression.set_editor_property("description", "FrameRemap")
+    material_expression.set_editor_property("code", FRAME_REMAP_HLSL)
+    material_expression.set_editor_property("output_type", unreal.CustomMaterialOutputType.CMOT_FLOAT3)
+
+    custom_inputs = []
+    for input_name in ("Frame", "FrameRemap"):
+        custom_input = unreal.CustomInput()
+        custom_input.set_editor_property("input_name", input_name)
+        custom_inputs.append(custom_input)
+    material_expression.set_editor_property("inputs", custom_inputs)
+
+    material_editing.connect_material_expressions(frame_expression, frame_output, material_expression, "Frame")
+    material_editing.connect_material_expressions(frame_remap_texture_expression, "", material_expression, "FrameRemap")
+
+    material_expression_masks = []
+    for index, component in enumerate(("R", "G", "B")):
+        material_expression_mask = material_editing.create_material_expression(material, unreal.MaterialExpressionComponentMask, node_pos_x=node_pos_x + 250, node_pos_y=node_pos_y + index * 75)
+        for mask_component in ("R", "G", "B", "A"):
+            material_expression_mask.set_editor_property(mask_component, mask_component == component)
+        material_editing.connect_material_expressions(material_expression, "", material_expression_mask, "")
+        material_expression_masks.append(material_expression_mask)
+
+    return material_expression_masks
+
+def create_atlas_uv_expression(material, uv_expression, atlas_scale, atlas_offset, node_pos_x, node_pos_y, use_parameters):
+    """ Remaps texture coordinates to the bake's region of an atlas """
+    material_editing = unreal.MaterialEditingLibrary
+
+    material_expression_multiply = material_editing.create_material_expression(material, unreal.MaterialExpressionMultiply, node_pos_x=node_pos_x + 250, node_pos_y=node_pos_y)
+    material_expression_add = material_editing.create_material_expression(material, unreal.MaterialExpressionAdd, node_pos_x=node_pos_x + 400, node_pos_y=node_pos_y)
+    material_editing.connect_material_expressions(uv_expression, "", material_expression_multiply, "A")
+    material_editing.connect_material_expressions(material_expression_multiply, "", material_expression_add, "A")
+
+    for index, (name, value, material_expression, input_name) in enumerate((("AtlasScale", atlas_scale, material_expression_multiply, "B"), ("AtlasOffset", atlas_offset, material_expression_add, "B"))):
+        material_expression_vector = create_vector_expression(material, name, (value[0], value[1], 0.0), node_pos_x - 200, node_pos_y + 100 + index * 150, use_parameters)
+
+        # vectors are float3, texture coordinates float2
+        material_expression_mask = material_editing.create_material_expression(material, unreal.MaterialExpressionComponentMask, node_pos_x=node_pos_x, node_pos_y=node_pos_y + 100 + index * 150)
+        for mask_component in ("R", "G", "B", "A"):
+            material_expression_mask.set_editor_property(mask_component, mask_component in ("R", "G"))
+
+        material_editing.connect_material_expressions(material_expression_vector, "", material_expression_mask, "")
+        material_editing.connect_material_expressions(material_expression_mask, "", material_expression, input_name)
+
+    return material_expression_add
+
+def create_vat_function_expression(material, material_vat_function_asset, inputs, node_pos_x, node_pos_y):
+    """ Calls MF_VAT, inputs being (expression, output name, input name) """
+    material_editing = unreal.MaterialEditingLibrary
+
+    material_expression = material_editing.create_material_expression(material, unreal.MaterialExpressionMaterialFunctionCall, node_pos_x=node_pos_x, node_pos_y=node_pos_y)
+    material_expression.set_material_function(material_vat_function_asset)
+    for input_expression, output_name, input_name in inputs:
+        material_editing.connect_material_expressions(input_expression, output_name, material_expression, input_name)
+
+    return material_expression
+
+def create_frame_remapped_vat_function_expression(material, material_vat_function_asset, inputs, frame_remap_masks, node_pos_x, node_pos_y, normal_encoding = 0):
+    """ Calls MF_VAT on both kept frames surrounding a decimated one and blends them, encoded normals are decoded before the blend """
+    material_editing = unreal.MaterialEditingLibrary
+    material_expression_row_a, material_expression_row_b, material_expression_alpha = frame_remap_masks
+
+    material_expression_lerp = material_editing.create_material_expression(material, unreal.MaterialExpressionLinearInterpolate, node_pos_x=node_pos_x + 600, node_pos_y=node_pos_y)
+    for index, (material_expression_row, lerp_input) in enumerate(((material_expression_row_a, "A"), (material_expression_row_b, "B"))):
+        material_expression = create_vat_function_expression(material, material_vat_function_asset, inputs + [(material_expression_row, "", "Frame")], node_pos_x, node_pos_y + index * 250)
+        if normal_encoding:
+            material_expression_normaldecode = create_normal_decode_expression(material, normal_encoding, node_pos_x + 300, node_pos_y + index * 250)
+            material_editing.connect_material_expressions(material_expression, "", material_expression_normaldecode, "Encoded")
+            material_expression = material_expression_normaldecode
+
+        material_editing.connect_material_expressions(material_expression, "", material_expression_lerp, lerp_input)
+
+    material_editing.connect_material_expressions(material_expression_alpha, "", material_expression_lerp, "Alpha")
+    return material_expression_lerp
+
+def load_material_functions_vat():
+    """ """
+    material_function_path = "/BlenderDataBaker/VAT/Materials/Functions/MF_VAT"
+    material_vat_function_asset = unreal.EditorAssetLibrary.load_asset(material_function_path)
+
+    material_function_path = "/BlenderDataBaker/_Shared/Materials/Functions/MF_SelectTexCoords"
+    material_texcoords_function_asset = unreal.EditorAssetLibrary.load_asset(material_function_path)
+
+    return (material_vat_function_asset, material_texcoords_function_asset)
+
+def build_material_graph_vat(material, settings, textures, use_parameters):
+    """ Builds the VAT material graph, values are exposed as parameters when use_parameters is set so instances can override them """
+    material_vat_function_asset, material_texcoords_function_asset = load_material_functions_vat()
+    if not material_vat_function_asset or not material_texcoords_function_asset:
+        return False
+
+    #unreal.EditorAssetLibrary.sync_browser_to_objects([material])
+
+    material.set_editor_property("used_with_niagara_mesh_particles", True)
+    material.set_editor_property("max_world_position_offset_displacement", settings["max_displacement"]) # @TODO check
+
+    material_editing = unreal.MaterialEditingLibrary
+
+    # particle color
+    material_expression_pcol = material_editing.create_material_expression(material, unreal.MaterialExpressionParticleColor, node_pos_x=-500, node_pos_y=-350)
+    material_prop = unreal.MaterialProperty.MP_BASE_COLOR
+    material_editing.connect_material_property(material_expression_pcol, "", material_prop)
+
+    # dynamic parameter
+    material_expression_dynparam = material_editing.create_material_expression(material, unreal.MaterialExpressionDynamicParameter, node_pos_x=-2000, node_pos_y=0)
+    param_names = ["Frame", "PrevFrame", "Anim", "PrevAnim"]
+    material_expression_dynparam.set_editor_property("param_names", param_names)
+
+    # frames width/height
+    material_expression_frames_width = create_scalar_expression(material, "FrameWidth", settings["frames_width"], -2000, 250, use_parameters)
+    material_expression_frames_height = create_scalar_expression(material, "FrameHeight", settings["frames_height"], -2000, 300, use_parameters)
+
+    # interpolation & modes
+    material_expression_interpolation_auto = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2000, node_pos_y=400)
+    material_expression_interpolation_auto.set_editor_property("Value", settings["interpolation_auto"])
+
+    material_expression_interpolation_nearest = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2000, node_pos_y=475)
+    material_expression_interpolation_nearest.set_editor_property("Value", settings["interpolation_nearest"])
+
+    material_expression_continuous = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2000, node_pos_y=550)
+    material_expression_continuous.set_editor_property("Value", settings["continuous"])
+
+    # clips, Frame/PrevFrame are frames of the Anim/PrevAnim clips, their range is fetched from the clip table
+    frame_input = (material_expression_dynparam, "Frame")
+    prev_frame_input = (material_expression_dynparam, "PrevFrame")
+    if settings["clip_table"]:
+        material_expression_clip_table_texture = create_texture_expression(material, "ClipTableTexture", textures.get("ClipTable"), -2700, 300, use_parameters)
+        frame_input = (create_clip_frame_expression(material, material_expression_clip_table_texture, material_expression_dynparam, "Frame", "Anim", -2400, -800), "")
+        prev_frame_input = (create_clip_frame_expression(material, material_expression_clip_table_texture, material_expression_dynparam, "PrevFrame", "PrevAnim", -2400, 1150), "")
+
+    # decimated frames, MF_VAT samples the kept frames surrounding the current one from the remap lookup
+    if settings["frame_remap"]:
+        material_expression_frame_remap_texture = create_texture_expression(material, "FrameRemapTexture", textures.get("FrameRemap"), -2400, 300, use_parameters)
+        frame_remap_masks = create_frame_remap_expressions(material, material_expression_frame_remap_texture, frame_input[0], frame_input[1], -2000, -800)
+        prev_frame_remap_masks = create_frame_remap_expressions(material, material_expression_frame_remap_texture, prev_frame_input[0], prev_frame_input[1], -2000, 1150)
+
+    # vertex interpolator
+    material_expression_vertexinterpolator = material_editing.create_material_expression(material, unreal.MaterialExpressionVertexInterpolator, node_pos_x=-500, node_pos_y=-150)
+    material_prop = unreal.MaterialProperty.MP_NORMAL
+    material_editing.connect_material_property(material_expression_vertexinterpolator, "", material_prop)
+
+    # tex coords
+    material_expression_vat_function_texcoords = material_editing.create_material_expression(material, unreal.MaterialExpressionMaterialFunctionCall, node_pos_x=-2400, node_pos_y=-30)
+    material_expression_vat_function_texcoords.set_material_function(material_texcoords_function_asset)
+
+    for texcoords_index in range(7):
+        material_expression_texcoords = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2600, node_pos_y=-100 + texcoords_index * 75)
+        material_expression_texcoords.set_editor_property("Value", settings["uv_index"] == texcoords_index)
+        material_editing.connect_material_expressions(material_expression_texcoords, "", material_expression_vat_function_texcoords, str(texcoords_index))
+
+    # atlased textures, MF_VAT samples the bake's region
+    # @NOTE frames are stepped in texels of the bound texture so they don't need remapping
+    material_expression_uv = material_expression_vat_function_texcoords
+    if settings["atlas_scale"] is not None:
+        material_expression_uv = create_atlas_uv_expression(material, material_expression_vat_function_texcoords, settings["atlas_scale"], settings["atlas_offset"], -2400, 650, use_parameters)
+
+    # normal transform
+    material_expression_normaltransform = material_editing.create_material_expression(material, unreal.MaterialExpressionTransform, node_pos_x=-800, node_pos_y=-160)
+    material_expression_normaltransform.set_editor_property("transform_source_type", unreal.MaterialVectorCoordTransformSource.TRANSFORMSOURCE_INSTANCE)
+    material_expression_normaltransform.set_editor_property("transform_type", unreal.MaterialVectorCoordTransform.TRANSFORM_TANGENT)
+    material_editing.connect_material_expressions(material_expression_normaltransform, "", material_expression_vertexinterpolator, "")
+
+    # normal VAT texture
+    material_expression_vat_texture_normal = create_texture_expression(material, "NormalTexture", textures.get("Normal"), -2000, -550, use_parameters)
+
+    # normal remapping
+    material_expression_vat_normalremapped = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2000, node_pos_y=-300)
+    material_expression_vat_normalremapped.set_editor_property("Value", settings["normal_remapped"])
+
+    material_expression_vat_normalremapping = create_vector_expression(material, "NormalRemapping", settings["normal_remapping"], -2000, -200, use_parameters)
+
+    # normal VAT function
+    normal_inputs = [(material_expression_vat_texture_normal, "", "Tex"),
+                     (material_expression_vat_normalremapped, "", "Remapped"),
+                     (material_expression_vat_normalremapping, "", "Remapping"),
+                     (material_expression_uv, "", "UV"),
+                     (material_expression_frames_width, "", "FrameHeight"),
+                     (material_expression_frames_height, "", "FrameWidth"),
+                     (material_expression_interpolation_auto, "", "Interpolation_Auto"),
+                     (material_expression_interpolation_nearest, "", "Interpolation_Nearest"),
+                     (material_expression_continuous, "", "Continuous")]
+
+    if settings["frame_remap"]:
+        material_expression_vat_function_normal = create_frame_remapped_vat_function_expression(material, material_vat_function_asset, normal_inputs, frame_remap_masks, -1700, -400, settings["normal_encoding"])
+        material_editing.connect_material_expressions(material_expression_vat_function_normal, "", material_expression_normaltransform, "")
+    else:
+        material_expression_vat_function_normal = create_vat_function_expression(material, material_vat_function_asset, normal_inputs, -1400, -150)
+        if settings["normal_encoding"]:
+            # MF_VAT fetches the encoded texel as-is, it's decoded before the transform
+            material_expression_normaldecode = create_normal_decode_expression(material, settings["normal_encoding"], -1100, -150)
+            material_editing.connect_material_expressions(material_expression_vat_function_normal, "", material_expression_normaldecode, "Encoded")
+            material_editing.connect_material_expressions(material_expression_normaldecode, "", material_expression_normaltransform, "")
+        else:
+            material_editing.connect_material_expressions(material_expression_vat_function_normal, "", material_expression_normaltransform, "")
+
+        if settings["clip_table"]:
+            material_editing.connect_material_expressions(frame_input[0], frame_input[1], material_expression_vat_function_normal, "Frame")
+        else:
+            unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "0", material_expression_vat_function_normal, "Frame"))
+            unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "Input0", material_expression_vat_function_normal, "Frame"))
+            unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "Param0", material_expression_vat_function_normal, "Frame"))
+            unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "Parameter0", material_expression_vat_function_normal, "Frame"))
+            unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "Parameter", material_expression_vat_function_normal, "Frame"))
+            unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "DynamicParameter0", material_expression_vat_function_normal, "Frame"))
+            unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "DynamicParameter", material_expression_vat_function_normal, "Frame"))
+
+    # offset transform
+    material_expression_offsettransform = material_editing.create_material_expression(material, unreal.MaterialExpressionTransform, node_pos_x=-800, node_pos_y=490)
+    material_expression_offsettransform.set_editor_property("transform_source_type", unreal.MaterialVectorCoordTransformSource.TRANSFORMSOURCE_INSTANCE)
+    material_expression_offsettransform.set_editor_property("transform_type", unreal.MaterialVectorCoordTransform.TRANSFORM_WORLD)
+    #material_prop = unreal.MaterialProperty.MP_WorldPositionOffset # (12), doesn't exist in Python!?
+    #material_editing.connect_material_property(material_expression_offsettransform, "", material_prop)
+
+    # offset scale, only needed when offset VAT isn't in centimeters or isn't inverted
+    if settings["offset_scale"] is not None:
+        material_expression_offsetscale_multiply = material_editing.create_material_expression(material, unreal.MaterialExpressionMultiply, node_pos_x=-450, node_pos_y=500)
+        material_expression_offsetscale = create_vector_expression(material, "OffsetScale", settings["offset_scale"], -800, 600, use_parameters)
+
+        material_editing.connect_material_expressions(material_expression_offsettransform, "", material_expression_offsetscale_multiply, "A")
+        material_editing.connect_material_expressions(material_expression_offsetscale, "", material_expression_offsetscale_multiply, "B")
+
+    # offset VAT texture
+    material_expression_vat_texture_offset = create_texture_expression(material, "OffsetTexture", textures.get("Offset"), -2000, 700, use_parameters)
+
+    # previous frame switch
+    material_expression_vat_function_prevframeswitch = material_editing.create_material_expression(material, unreal.MaterialExpressionPreviousFrameSwitch, node_pos_x=-1050, node_pos_y=500)
+
+    # offset remapping
+    material_expression_vat_offsetremapped = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2000, node_pos_y=850)
+    material_expression_vat_offsetremapped.set_editor_property("Value", settings["offset_remapped"])
+
+    material_expression_vat_offsetremapping = create_vector_expression(material, "OffsetRemapping", settings["offset_remapping"], -2000, 1000, use_parameters)
+
+    offset_inputs = [(material_expression_vat_texture_offset, "", "Tex"),
+                     (material_expression_vat_offsetremapped, "", "Remapped"),
+                     (material_expression_vat_offsetremapping, "", "Remapping"),
+                     (material_expression_uv, "", "UV"),
+                     (material_expression_frames_width, "", "FrameHeight"),
+                     (material_expression_frames_height, "", "FrameWidth"),
+                     (material_expression_interpolation_auto, "", "Interpolation_Auto"),
+                     (material_expression_interpolation_nearest, "", "Interpolation_Nearest"),
+                     (material_expression_continuous, "", "Continuous")]
+
+    if settings["frame_remap"]:
+        # offset and previous offset VAT functions
+        material_expression_vat_function_offset = create_frame_remapped_vat_function_expression(material, material_vat_function_asset, offset_inputs, frame_remap_masks, -1700, 300)
+        material_expression_vat_function_prevoffset = create_frame_remapped_vat_function_expression(material, material_vat_function_asset, offset_inputs, prev_frame_remap_masks, -1700, 800)
+    elif settings["clip_table"]:
+        material_expression_vat_function_offset = create_vat_function_expression(material, material_vat_function_asset, offset_inputs + [frame_input + ("Frame",)], -1700, 500)
+        material_expression_vat_function_prevoffset = create_vat_function_expression(material, material_vat_function_asset, offset_inputs + [prev_frame_input + ("Frame",)], -1400, 700)
+    else:
+        # offset VAT function
+        material_expression_vat_function_offset = create_vat_function_expression(material, material_vat_function_asset, offset_inputs + [(material_expression_dynparam, "Param1", "Frame")], -1700, 500)
+
+        # previous offset VAT function
+        material_expression_vat_function_prevoffset = create_vat_function_expression(material, material_vat_function_asset, offset_inputs + [(material_expression_dynparam, "Param1", "0")], -1400, 700)
+
+    material_editing.connect_material_expressions(material_expression_vat_function_offset, "", material_expression_vat_function_prevframeswitch, "Current Frame")
+    material_editing.connect_material_expressions(material_expression_vat_function_prevoffset, "", material_expression_vat_function_prevframeswitch, "Previous Frame")
+
+    material_editing.connect_material_expressions(material_expression_vat_function_prevframeswitch, "", material_expression_offsettransform, "")
+
+    return True
+
+def create_material_vat(asset_tools, settings, textures, material_name, material_path):
+    """ """
+    material = asset_tools.create_asset(material_name, material_path, unreal.Material, unreal.MaterialFactoryNew())
+    if material:
+        with baked_data_profiler.phase("material_graph"):
+            build_material_graph_vat(material, settings, textures, False)
+
+    return material
+
+# parent materials already resolved in this editor session, keyed by asset path
+parent_materials_vat = {}
+
+# set when parent materials are shared with other editor processes, they're then only loaded and missing ones fall back to a material per import
+parent_materials_read_only = False
+
+# displacement clamp each read only parent material needs, keyed by asset path. Grown afterwards by the process owning them
+parent_material_displacements = {}
+
+def get_parent_material_vat(asset_tools, settings, textures, parent_material_path, max_displacement = None):
+    """ Returns the parent material matching the settings' static permutation, creating it if needed
+
+    max_displacement, if given, is the displacement clamp of every import sharing the parent, so it's compiled once.
+    """
+    if max_displacement is not None and max_displacement > settings["max_displacement"]:
+        settings = dict(settings, max_displacement=max_displacement)
+
+    parent_material_name = "M_VAT_" + get_material_signature_vat(settings)
+    parent_material_asset_path = parent_material_path.rstrip("/") + "/" + parent_material_name
+
+    parent_material = parent_materials_vat.get(parent_material_asset_path)
+    if parent_material is None and unreal.EditorAssetLibrary.does_asset_exist(parent_material_asset_path):
+        parent_material = unreal.EditorAssetLibrary.load_asset(parent_material_asset_path)
+
+    if parent_material is None and parent_materials_read_only:
+        unreal.log_warning("Parent material {} doesn't exist and parent materials are read only".format(parent_material_asset_path))
+        return None
+
+    if parent_material is None:
+        # textures of the first instance act as the parameters' defaults
+        parent_material = asset_tools.create_asset(parent_material_name, parent_material_path, unreal.Material, unreal.MaterialFactoryNew())
+        if not parent_material:
+            return None
+
+        with baked_data_profiler.phase("material_graph"):
+            if not build_material_graph_vat(parent_material, settings, textures, True):
+                return None
+
+        with baked_data_profiler.phase("recompile_material"):
+            unreal.MaterialEditingLibrary.recompile_material(parent_material)
+    elif parent_materials_read_only:
+        parent_material_displacements[parent_material_asset_path] = max(parent_material_displacements.get(parent_material_asset_path, 0.0), settings["max_displacement"])
+    elif parent_material.get_editor_property("max_world_position_offset_displacement") < settings["max_displacement"]:
+        # @NOTE the displacement clamp can't be overridden per instance, grow the parent's instead
+        parent_material.set_editor_property("max_world_position_offset_displacement", settings["max_displacement"])
+
+    parent_materials_vat[parent_material_asset_path] = parent_material
+    return parent_material
+
+def create_material_instance_vat(asset_tools, settings, textures, material_name, material_path, parent_material_path, max_displacement = None):
+    """ max_displacement is the one of get_parent_material_vat() """
+    parent_material = get_parent_material_vat(asset_tools, settings, textures, parent_material_path, max_displacement)
+    if not parent_material:
+        return None
+
+    material_instance = asset_tools.create_asset(material_name, material_path, unreal.MaterialInstanceConstant, unreal.MaterialInstanceConstantFactoryNew())
+    if not material_instance:
+        return None
+
+    material_editing = unreal.MaterialEditingLibrary
+    material_editing.set_material_instance_parent(material_instance, parent_material)
+
+    material_editing.set_material_instance_scalar_parameter_value(material_instance, "FrameWidth", settings["frames_width"])
+    material_editing.set_material_instance_scalar_parameter_value(material_instance, "FrameHeight", settings["frames_height"])
+
+    vector_parameters = [("NormalRemapping", settings["normal_remapping"]), ("OffsetRemapping", settings["offset_remapping"])]
+    if settings["offset_scale"] is not None:
+        vector_parameters.append(("OffsetScale", settings["offset_scale"]))
+    if settings["atlas_scale"] is not None:
+        vector_parameters.append(("AtlasScale", settings["atlas_scale"] + (0.0,)))
+        vector_parameters.append(("AtlasOffset", settings["atlas_offset"] + (0.0,)))
+
+    for parameter_name, value in vector_parameters:
+        material_editing.set_material_instance_vector_parameter_value(material_instance, parameter_name, unreal.LinearColor(value[0], value[1], value[2], 1.0))
+
+    for parameter_name, texture_type in (("NormalTexture", "Normal"), ("OffsetTexture", "Offset"), ("FrameRemapTexture", "FrameRemap"), ("ClipTableTexture", "ClipTable")):
+        if textures.get(texture_type):
+            material_editing.set_material_instance_texture_parameter_value(material_instance, parameter_name, textures[texture_type])
+
+    material_editing.update_material_instance(material_instance)
+    return material_instance
+
+def apply_mesh_settings_vat(asset, mesh_bounds_offset, static_mesh_editor_subsystem, descriptor = ""):
+    """ Applies the VAT settings the import options can't set, the mesh build it triggers is recorded as the mesh_build phase
+
+    Properties are edited without notifications and Nanite without applying changes, so the LOD build settings are the only edit rebuilding the mesh.
+    Nanite, lightmap UVs and collision generation are already disabled by the import options.
+    """
+    never = unreal.PropertyAccessChangeNotifyMode.NEVER
+
+    with unreal.ScopedEditorTransaction("BakedData VAT mesh settings"):
+        asset.set_editor_property("negative_bounds_extension", unreal.Vector(x=mesh_bounds_offset[0], y=mesh_bounds_offset[1], z=mesh_bounds_offset[2]), never) # @TODO check
+        asset.set_editor_property("positive_bounds_extension", unreal.Vector(x=mesh_bounds_offset[3], y=mesh_bounds_offset[4], z=mesh_bounds_offset[5]), never) # @TODO check
+        asset.set_editor_property("generate_mesh_distance_field", False, never)
+
+        body_setup = asset.get_editor_property('body_setup')
+        if body_setup:
+            # no simple collision used as complex, no section gets cooked
+            body_setup.set_editor_property('collision_trace_flag', unreal.CollisionTraceFlag.CTF_USE_SIMPLE_AS_COMPLEX, never)
+
+            default_body_instance = body_setup.get_editor_property('default_instance')
+            if default_body_instance:
+                default_body_instance.set_editor_property('collision_profile_name', 'Custom')
+                default_body_instance.set_editor_property('collision_enabled', unreal.CollisionEnabled.NO_COLLISION)
+                default_body_instance.set_editor_property('object_type', unreal.CollisionChannel.ECC_WORLD_DYNAMIC)
+                #collision_responses = default_body_instance.get_editor_property('collision_responses')
+                #collision_array = collision_responses.get_editor_property('response_array')
+                #then what?
+
+                # default_instance is a copy
+                body_setup.set_editor_property('default_instance', default_body_instance, never)
+
+        # only UCX meshes of the fbx can still bring simple collision
+        if static_mesh_editor_subsystem.get_simple_collision_count(asset) > 0:
+            static_mesh_editor_subsystem.remove_collisions(asset)
+
+        mesh_nanite_settings = static_mesh_editor_subsystem.get_nanite_settings(asset)
+        if mesh_nanite_settings.enabled or mesh_nanite_settings.lerp_u_vs: # @TODO double check this, lerp_u_vs might be the only thing that need to be turned off
+            mesh_nanite_settings.enabled = False
+            mesh_nanite_settings.lerp_u_vs = False
+            static_mesh_editor_subsystem.set_nanite_settings(asset, mesh_nanite_settings, False)
+
+        # rebuilds the mesh once with everything above
+        mesh_set = static_mesh_editor_subsystem.get_lod_build_settings(asset, 0)
+        mesh_set.use_full_precision_u_vs = True # @TODO enable if needed
+        mesh_set.generate_lightmap_u_vs = False
+        mesh_set.distance_field_resolution_scale = 0.0
+
+        with baked_data_profiler.phase("mesh_build", descriptor):
+            static_mesh_editor_subsystem.set_lod_build_settings(asset, 0, mesh_set)
+
+def process_imported_assets_vat(baked_data, asset_tools, destination, import_tasks, create_material, create_material_subfolder, create_material_name, obj_name = "", use_parent_material = False, parent_material_path = PARENT_MATERIAL_PATH, texture_formats = None, atlas_region = None):
+    """ atlas_region is set when the imported textures are atlases shared with other bakes """
+    return run_import_steps(process_imported_assets_vat_steps(baked_data, asset_tools, destination, import_tasks, create_material, create_material_subfolder, create_material_name, obj_name, use_parent_material, parent_material_path, texture_formats, atlas_region))
+
+def process_imported_assets_vat_steps(baked_data, asset_tools, destination, import_tasks, create_material, create_material_subfolder, create_material_name, obj_name = "", use_parent_material = False, parent_material_path = PARENT_MATERIAL_PATH, texture_formats = None, atlas_region = None, shared_assets = None, source_tasks = None, parent_displacements = None):
+    """ Import steps of process_imported_assets_vat(), a step per loaded asset, texture, mesh and material
+
+    shared_assets holds the assets of the batch already processed for another BakedData by object path, with the bounds extension given to meshes.
+    source_tasks maps the files of the BakedData to the task that imported them, see share_import_tasks().
+    parent_displacements is get_parent_displacements_vat() of the batch.
+    """
+
+    if destination[-1] != "/":
+        destination += "/"
+
+    if texture_formats is None:
+        texture_formats = get_texture_formats(baked_data, COMPRESSION_TOLERANCE)
+
+    settings, bounds, clip_bounds = get_analyzed_material_settings_vat(baked_data, texture_formats, atlas_region)
+    mesh_bounds_offset = settings["bounds_offset"]
+
+    clip_table = settings["clip_table"]
+    clip_indices = json.dumps({animation.name: index for index, animation in enumerate(baked_data.animations)})
+
+    # parents are created with the displacement clamp of every BakedData of the batch sharing them
+    max_displacement = parent_displacements.get(get_material_signature_vat(settings)) if parent_displacements is not None else None
+
+    # texture types and formats by imported file, used to bind the imported textures to the material
+    texture_types = {}
+    texture_formats_by_file = {}
+    for texture in baked_data.textures:
+        if texture.path:
+            texture_types[texture.path] = texture.type
+
+    for texture_format in texture_formats.values():
+        if texture_format.path:
+            texture_types[texture_format.path] = texture_format.type
+            texture_formats_by_file[texture_format.path] = texture_format
 
     ###################
     # IMPORTED ASSETS #
 
+    if source_tasks is None:
+        source_tasks = get_source_tasks(import_tasks)
+
+    # assets are matched to the BakedData's own files, shared tasks import the file of another BakedData
+    imported_assets = []
+    for filename, import_task in source_tasks.items():
+        unreal.log("Import Task for: {}".format(filename))
+        for object_path in import_task.imported_object_paths:
+            unreal.log("Imported object: {}".format(object_path))
+
+            with baked_data_profiler.phase("load_asset", baked_data.file_path):
+                imported_assets.append((filename, object_path, unreal.EditorAssetLibrary.load_asset(object_path)))
+
+            yield (0, "Loaded " + object_path)
+
+    # textures first so the material can reference them
+    imported_textures = {}
+    for filename, object_path, asset in imported_assets:
+        if isinstance(asset, unreal.Texture2D):
+            texture_type = texture_types.get(filename)
+            if texture_type:
+                imported_textures[texture_type] = asset
+
+            # shared textures got their settings from the BakedData that imported them
+            if shared_assets is not None:
+                if object_path in shared_assets:
+                    continue
+                shared_assets[object_path] = None
+
+            with baked_data_profiler.phase("texture_settings", baked_data.file_path):
+                texture_format = texture_formats_by_file.get(filename)
+                if texture_format is None:
+                    texture_format = baked_data_textures.TextureFormat(baked_data_textures.TEXTURE_FORMAT_LOSSLESS, msg="not analyzed")
+                if texture_format.msg:
+                    unreal.log("Keeping {} lossless: {}".format(filename, texture_format.msg))
+
+                asset.set_editor_property("sRGB", False)
+                asset.set_editor_property("compression_settings", getattr(unreal.TextureCompressionSettings, texture_format.compression))
+                asset.set_editor_property("compression_none", texture_format.is_uncompressed())
+                asset.set_editor_property("filter", unreal.TextureFilter.TF_NEAREST)
+                asset.set_editor_property("lod_group", unreal.TextureGroup.TEXTUREGROUP_EFFECTS_NOT_FILTERED)
+
+                unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedData", baked_data.type)
+                unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataFormat", texture_format.name)
+                unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataMaxError", "{:g}".format(texture_format.max_error))
+                unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataMemorySaved", str(texture_format.get_memory_saved()))
+
+                if texture_format.get_normal_encoding():
+                    # encoded texels can't be filtered
+                    asset.set_editor_property("mip_gen_settings", unreal.TextureMipGenSettings.TMGS_NO_MIPMAPS)
+
+                    max_angular_error, mean_angular_error = texture_format.angular_error
+                    unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataMaxAngularError", "{:g}".format(max_angular_error))
+                    unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataMeanAngularError", "{:g}".format(mean_angular_error))
+                    unreal.log("Encoded normals {} as {}: max angular error {:.4f} deg, mean {:.4f} deg".format(filename, texture_format.name, max_angular_error, mean_angular_error))
+
+                if texture_format.frames is not None:
+                    kept_frames, num_frames = texture_format.frames
+                    unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataFrames", "{}/{}".format(kept_frames, num_frames))
+                    unreal.log("Decimated frames of {}: kept {} of {}".format(filename, kept_frames, num_frames))
+
+                if texture_format.type == "FrameRemap":
+                    # rows are fetched by index, max error is the decimation's in world units
+                    asset.set_editor_property("mip_gen_settings", unreal.TextureMipGenSettings.TMGS_NO_MIPMAPS)
+
+                if texture_format.type == "ClipBounds":
+                    # a column per clip, fetched by clip index
+                    asset.set_editor_property("mip_gen_settings", unreal.TextureMipGenSettings.TMGS_NO_MIPMAPS)
+                    unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataClips", ",".join(clip.name for clip in clip_bounds))
+
+                if texture_format.type == "ClipTable":
+                    # a (start, end, count, rate) texel per clip, fetched by the Anim dynamic parameter
+                    asset.set_editor_property("mip_gen_settings", unreal.TextureMipGenSettings.TMGS_NO_MIPMAPS)
+                    unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataClipIndices", clip_indices)
+
+            yield (0, "Applied texture settings to " + filename)
+
     static_mesh_editor_subsystem = unreal.get_editor_subsystem(unreal.StaticMeshEditorSubsystem)
 
+    for filename, object_path, asset in imported_assets:
+        if isinstance(asset, unreal.StaticMesh):
+            #unreal.EditorAssetLibrary.sync_browser_to_objects([object_path])
+
+            applied_bounds_offset = shared_assets.get(object_path) if shared_assets is not None else None
+            if applied_bounds_offset is not None:
+                # @NOTE a mesh shared with other BakedData keeps the metadata of the first one, its bounds extension grows to fit them all
+                grown_bounds_offset = [max(applied, needed) for applied, needed in zip(applied_bounds_offset, mesh_bounds_offset)]
+                if grown_bounds_offset != applied_bounds_offset:
+                    with baked_data_profiler.phase("mesh_settings", baked_data.file_path):
+                        apply_mesh_settings_vat(asset, grown_bounds_offset, static_mesh_editor_subsystem, baked_data.file_path)
+                    shared_assets[object_path] = grown_bounds_offset
+            else:
+                with baked_data_profiler.phase("mesh_settings", baked_data.file_path):
+                    apply_mesh_settings_vat(asset, mesh_bounds_offset, static_mesh_editor_subsystem, baked_data.file_path)
+
+                    unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedData", "VAT")
+
+                    if clip_table:
+                        unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataClipIndices", clip_indices)
+
+                    if bounds is not None:
+                        unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataClipBounds", json.dumps([clip.to_dict() for clip in clip_bounds]))
+                        unreal.log("Bounds extension of {}: -({:g}, {:g}, {:g}) +({:g}, {:g}, {:g}), max displacement {:g}".format(filename, *bounds.negative, *bounds.positive, bounds.max_displacement))
+
+                if shared_assets is not None:
+                    shared_assets[object_path] = list(mesh_bounds_offset)
+
+            yield (0, "Applied mesh settings to " + filename)
+
+            if create_material:
+                with baked_data_profiler.phase("material", baked_data.file_path):
+                    if use_parent_material:
+                        material = create_material_instance_vat(asset_tools, settings, imported_textures, create_material_name, destination + create_material_subfolder, parent_material_path, max_displacement)
+                        if not material and parent_materials_read_only:
+                            material = create_material_vat(asset_tools, settings, imported_textures, create_material_name, destination + create_material_subfolder)
+                    else:
+                        material = create_material_vat(asset_tools, settings, imported_textures, create_material_name, destination + create_material_subfolder)
+
+                    if not material:
+                        return (False, "Couldn't create material: " + create_material_name)
+
+                yield (0, "Created material " + create_material_name)
+
+    return (True, "")
+
+#######
+# SDF #
+
+def get_texture_formats_sdf(baked_data, converted_dir):
+    """ Returns the TextureFormat of each SDF texture keyed by source file, their path is the re-tiled copy written in converted_dir
+
+    Formats without path couldn't be converted, their msg tells why.
+    """
+    texture_formats = {}
+    for texture in baked_data.textures:
+        if not texture.path:
+            continue
+
+        if not os.path.exists(texture.path):
+            texture_format = baked_data_textures.TextureFormat(baked_data_textures.TEXTURE_FORMAT_LOSSLESS, msg="missing texture " + texture.path)
+        elif not baked_data_textures.is_numpy_available():
+            texture_format = baked_data_textures.TextureFormat(baked_data_textures.TEXTURE_FORMAT_LOSSLESS, msg="numpy isn't available")
+        else:
+            with baked_data_profiler.phase("retile_volume", baked_data.file_path):
+                texture_format = baked_data_sdf.convert_sdf_texture(texture, converted_dir)
+
+        texture_format.type = "SDF"
+        texture_formats[texture.path] = texture_format
+
+    return texture_formats
+
+def check_texture_formats_sdf(texture_formats):
+    """ Returns (success, msg), an SDF import fails if any of its textures couldn't be re-tiled """
+    for texture_format in texture_formats.values():
+        if not texture_format.path:
+            return (False, "Couldn't re-tile SDF texture: " + texture_format.msg)
+
+    return (True, "")
+
+def get_volume_texture_path_sdf(source_object_path):
+    """ Returns the (package path, asset name) of the volume texture built from an imported SDF texture """
+    package_path, source_name = source_object_path.rsplit(".", 1)[0].rsplit("/", 1)
+    return (package_path, source_name + "_Volume")
+
+def get_created_asset_paths_sdf(import_tasks):
+    """ Assets importing a single SDF BakedData creates, the shared material function aside """
+    asset_paths = []
     for import_task in import_tasks:
-        unreal.log("Import Task for: {}".format(import_task.filename))
         for object_path in import_task.imported_object_paths:
-            unreal.log("Imported object: {}".format(object_path))
+            asset_paths.append(object_path)
+            if Path(import_task.filename).suffix.lower() == ".exr":
+                asset_paths.append("/".join(get_volume_texture_path_sdf(object_path)))
+
+    return asset_paths
+
+def create_volume_texture_sdf(asset_tools, source, source_object_path, texture_format):
+    """ Builds the volume texture of an imported SDF texture, whose slices were re-tiled as VolumeTexture expects them """
+    package_path, volume_name = get_volume_texture_path_sdf(source_object_path)
+    volume_path = package_path + "/" + volume_name
+
+    if unreal.EditorAssetLibrary.does_asset_exist(volume_path):
+        volume = unreal.EditorAssetLibrary.load_asset(volume_path)
+    else:
+        volume = asset_tools.create_asset(volume_name, package_path, unreal.VolumeTexture, unreal.VolumeTextureFactory())
+    if not volume:
+        return None
+
+    # the 2D texture is only the volume's editor source, it's never sampled
+    source.set_editor_property("sRGB", False)
+    source.set_editor_property("mip_gen_settings", unreal.TextureMipGenSettings.TMGS_NO_MIPMAPS)
+    unreal.EditorAssetLibrary.set_metadata_tag(source, "BakedData", "SDF")
+
+    # setting the source texture last rebuilds the volume from its tiles
+    tile_x, tile_y, size_z = texture_format.tile_size
+    volume.set_editor_property("source2d_tile_size_x", tile_x)
+    volume.set_editor_property("source2d_tile_size_y", tile_y)
+    volume.set_editor_property("source2d_texture", source)
+
+    # linear filtering of a volume texture interpolates between slices too, a single fetch replaces the tiled lookups' two
+    volume.set_editor_property("sRGB", False)
+    volume.set_editor_property("compression_settings", getattr(unreal.TextureCompressionSettings, texture_format.compression))
+    volume.set_editor_property("filter", unreal.TextureFilter.TF_BILINEAR)
+    volume.set_editor_property("mip_gen_settings", unreal.TextureMipGenSettings.TMGS_NO_MIPMAPS)
+    volume.set_editor_property("address_mode", unreal.TextureAddress.TA_CLAMP)
+
+    distance_scale, distance_bias = texture_format.distance_remap
+    unreal.EditorAssetLibrary.set_metadata_tag(volume, "BakedData", "SDF")
+    unreal.EditorAssetLibrary.set_metadata_tag(volume, "BakedDataFormat", texture_format.name)
+    unreal.EditorAssetLibrary.set_metadata_tag(volume, "BakedDataMaxError", "{:g}".format(texture_format.max_error))
+    unreal.EditorAssetLibrary.set_metadata_tag(volume, "BakedDataMemorySaved", str(texture_format.get_memory_saved()))
+    unreal.EditorAssetLibrary.set_metadata_tag(volume, "BakedDataDistanceRemap", "{:g},{:g}".format(distance_scale, distance_bias))
+    unreal.log("Built {}x{}x{} volume {} as {}: max error {:g}, DistanceRemap ({:g}, {:g})".format(tile_x, tile_y, size_z, volume_path, texture_format.name, texture_format.max_error, distance_scale, distance_bias))
+
+    return volume
+
+# distance at UVW of a volume re-tiled by BlenderDataBakerSDF, SampleLevel so it can be used in raymarching loops
+SDF_SAMPLE_HLSL = "return Volume.SampleLevel(VolumeSampler, saturate(UVW), 0.0).r * DistanceRemap.x + DistanceRemap.y;"
+
+def build_custom_function(material_function, function_inputs, code, output_type, output_name, description):
+    """ Wires the (name, unreal.FunctionInputType, default or None) inputs of a material function to a Custom node computing its output """
+    material_editing = unreal.MaterialEditingLibrary
+
+    input_expressions = []
+    for sort_priority, (input_name, input_type, default_value) in enumerate(function_inputs):
+        function_input = material_editing.create_material_expression_in_function(material_function, unreal.MaterialExpressionFunctionInput, -600, sort_priority * 150)
+        function_input.set_editor_property("input_name", input_name)
+        function_input.set_editor_property("input_type", input_type)
+        function_input.set_editor_property("sort_priority", sort_priority)
+        if default_value is not None:
+            function_input.set_editor_property("preview_value", default_value)
+            function_input.set_editor_property("use_preview_value_as_default", True)
+        input_expressions.append((input_name, function_input))
+
+    material_expression = material_editing.create_material_expression_in_function(material_function, unreal.MaterialExpressionCustom, -300, 0)
+    material_expression.set_editor_property("description", description)
+    material_expression.set_editor_property("code", code)
+    material_expression.set_editor_property("output_type", output_type)
+
+    custom_inputs = []
+    for input_name, _ in input_expressions:
+        custom_input = unreal.CustomInput()
+        custom_input.set_editor_property("input_name", input_name)
+        custom_inputs.append(custom_input)
+    material_expression.set_editor_property("inputs", custom_inputs)
+
+    for input_name, function_input in input_expressions:
+        material_editing.connect_material_expressions(function_input, "", material_expression, input_name)
+
+    function_output = material_editing.create_material_expression_in_function(material_function, unreal.MaterialExpressionFunctionOutput, 0, 0)
+    function_output.set_editor_property("output_name", output_name)
+    material_editing.connect_material_expressions(material_expression, "", function_output, "")
+
+    material_editing.update_material_function(material_function)
+
+# material functions already resolved in this editor session, keyed by asset path
+material_functions = {}
+
+def get_material_function(asset_tools, function_path, build_function):
+    """ Returns the material function at function_path, creating it with build_function(material_function) if needed """
+    material_function = material_functions.get(function_path)
+    if material_function is None and unreal.EditorAssetLibrary.does_asset_exist(function_path):
+        material_function = unreal.EditorAssetLibrary.load_asset(function_path)
+
+    if material_function is None:
+        package_path, function_name = function_path.rsplit("/", 1)
+        material_function = asset_tools.create_asset(function_name, package_path, unreal.MaterialFunction, unreal.MaterialFunctionFactoryNew())
+        if not material_function:
+            return None
+
+        with baked_data_profiler.phase("material_function"):
+            build_function(material_function)
+
+    material_functions[function_path] = material_function
+    return material_function
+
+def build_sdf_function(material_function):
+    """ Volume, UVW (0-1 across the baked bounds) and DistanceRemap (the volume's BakedDataDistanceRemap) in, Distance out """
+    # distances are stored as-is unless remapped
+    build_custom_function(material_function, (("Volume", unreal.FunctionInputType.FUNCTION_INPUT_VOLUME_TEXTURE, None),
+                                              ("UVW", unreal.FunctionInputType.FUNCTION_INPUT_VECTOR3, None),
+                                              ("DistanceRemap", unreal.FunctionInputType.FUNCTION_INPUT_VECTOR2, unreal.Vector4(1.0, 0.0, 0.0, 0.0))),
+                          SDF_SAMPLE_HLSL, unreal.CustomMaterialOutputType.CMOT_FLOAT1, "Distance", "SampleSDF")
+
+def get_sdf_function(asset_tools, function_path = SDF_FUNCTION_PATH):
+    """ Returns the material function sampling SDF volumes, creating it if needed """
+    return get_material_function(asset_tools, function_path, build_sdf_function)
+
+def import_baked_data_sdf(baked_data, asset_tools, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, asset_paths = None):
+    """ asset_paths, if given, is filled with the assets the import created """
+    if destination[-1] != "/":
+        destination += "/"
+
+    texture_formats = get_texture_formats_sdf(baked_data, get_converted_textures_dir(baked_data)) if import_textures else {}
+
+    # nothing is imported for a volume that can't be built
+    success, msg = check_texture_formats_sdf(texture_formats)
+    if not success:
+        return (success, msg)
+
+    # the texture is redirected to its re-tiled copy
+    with baked_data_profiler.phase("create_tasks", baked_data.file_path):
+        import_tasks = create_import_tasks(baked_data, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, texture_formats)
+
+    with baked_data_profiler.phase("import_asset_tasks", baked_data.file_path):
+        asset_tools.import_asset_tasks(import_tasks)
+
+    if asset_paths is not None:
+        asset_paths.extend(get_baked_data_asset_paths(baked_data, import_tasks, create_material, "", ""))
+
+    with baked_data_profiler.phase("post_process", baked_data.file_path):
+        return run_import_steps(process_imported_assets_sdf_steps(baked_data, asset_tools, import_tasks, create_material, texture_formats))
+
+def process_imported_assets_sdf_steps(baked_data, asset_tools, import_tasks, create_material, texture_formats, source_tasks = None):
+    """ Import steps building the volume textures of the imported SDF textures, a step per loaded asset and volume
+
+    create_material creates the material function sampling the volumes if it doesn't exist yet. source_tasks is the
+    one of process_imported_assets_vat_steps().
+    """
+    success, msg = check_texture_formats_sdf(texture_formats)
+    if not success:
+        return (success, msg)
+
+    texture_formats_by_file = {texture_format.path: texture_format for texture_format in texture_formats.values()}
+
+    if source_tasks is None:
+        source_tasks = get_source_tasks(import_tasks)
+
+    imported_assets = []
+    for filename, import_task in source_tasks.items():
+        for object_path in import_task.imported_object_paths:
+            with baked_data_profiler.phase("load_asset", baked_data.file_path):
+                imported_assets.append((filename, object_path, unreal.EditorAssetLibrary.load_asset(object_path)))
+
+            yield (0, "Loaded " + object_path)
 
-            asset = unreal.EditorAssetLibrary.load_asset(object_path)
-            if isinstance(asset, unreal.StaticMesh):
-                #unreal.EditorAssetLibrary.sync_browser_to_objects([object_path])
-
-                # @TODO disable collision
-                asset.set_editor_property("negative_bounds_extension", unreal.Vector(x=float(mesh_bounds_offset_min_x), y=float(mesh_bounds_offset_min_y), z=float(mesh_bounds_offset_min_z))) # @TODO check
-                asset.set_editor_property("positive_bounds_extension", unreal.Vector(x=float(mesh_bounds_offset_max_x), y=float(mesh_bounds_offset_max_y), z=float(mesh_bounds_offset_max_z))) # @TODO check
-                asset.set_editor_property("generate_mesh_distance_field", False)
-
-                body_setup = asset.get_editor_property('body_setup')
-                if body_setup:
-                    default_body_instance = body_setup.get_editor_property('default_instance')
-                    if default_body_instance:
-                        default_body_instance.set_editor_property('collision_profile_name', 'Custom')
-                        default_body_instance.set_editor_property('collision_enabled', unreal.CollisionEnabled.NO_COLLISION)
-                        default_body_instance.set_editor_property('object_type', unreal.CollisionChannel.ECC_WORLD_DYNAMIC)
-                        #collision_responses = default_body_instance.get_editor_property('collision_responses')
-                        #collision_array = collision_responses.get_editor_property('response_array')
-                        #then what?
-
-                mesh_nanite_settings = static_mesh_editor_subsystem.get_nanite_settings(asset)
-                mesh_nanite_settings.enabled = False # @TODO double check this, lerp_u_vs might be the only thing that need to be turned off
-                mesh_nanite_settings.lerp_u_vs = False
-                static_mesh_editor_subsystem.set_nanite_settings(asset, mesh_nanite_settings)
-
-                mesh_set = static_mesh_editor_subsystem.get_lod_build_settings(asset, 0)
-                mesh_set.use_full_precision_u_vs = True # @TODO enable if needed
-                mesh_set.generate_lightmap_u_vs = False
-                mesh_set.distance_field_resolution_scale = 0.0
-                static_mesh_editor_subsystem.set_lod_build_settings(asset, 0, mesh_set)
-
-                static_mesh_editor_subsystem.enable_section_collision(asset, False, 0, 0) # this for material slot(s)
-                static_mesh_editor_subsystem.remove_collisions(asset)
-
-                unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedData", "VAT")
-
-                material_function_path = "/BlenderDataBaker/VAT/Materials/Functions/MF_VAT"
-                material_vat_function_asset = unreal.EditorAssetLibrary.load_asset(material_function_path)
-
-                material_function_path = "/BlenderDataBaker/_Shared/Materials/Functions/MF_SelectTexCoords"
-                material_texcoords_function_asset = unreal.EditorAssetLibrary.load_asset(material_function_path)
-                if material_vat_function_asset and material_texcoords_function_asset:
-                    material = asset_tools.create_asset(create_material_name, destination + create_material_subfolder, unreal.Material, unreal.MaterialFactoryNew())
-                    if material:
-                        #unreal.EditorAssetLibrary.sync_browser_to_objects([material])
-
-                        material.set_editor_property("used_with_niagara_mesh_particles", True)
-                        max_displacement = max(float(mesh_bounds_offset_min_x),
-                                               max(float(mesh_bounds_offset_min_y),
-                                                   max(float(mesh_bounds_offset_min_z),
-                                                       max(float(mesh_bounds_offset_max_x),
-                                                           max(float(mesh_bounds_offset_max_y),
-                                                               float(mesh_bounds_offset_max_z))))))
-                        material.set_editor_property("max_world_position_offset_displacement", max_displacement) # @TODO check
-
-                        material_editing = unreal.MaterialEditingLibrary
-
-                        # particle color
-                        material_expression_pcol = material_editing.create_material_expression(material, unreal.MaterialExpressionParticleColor, node_pos_x=-500, node_pos_y=-350)
-                        material_prop = unreal.MaterialProperty.MP_BASE_COLOR
-                        material_editing.connect_material_property(material_expression_pcol, "", material_prop)
-
-                        # dynamic parameter
-                        material_expression_dynparam = material_editing.create_material_expression(material, unreal.MaterialExpressionDynamicParameter, node_pos_x=-2000, node_pos_y=0)
-                        param_names = ["Frame", "PrevFrame", "Anim", "PrevAnim"]
-                        material_expression_dynparam.set_editor_property("param_names", param_names)
-
-                        # frames width/height
-                        material_expression_frames_width = material_editing.create_material_expression(material, unreal.MaterialExpressionConstant, node_pos_x=-2000, node_pos_y=250)
-                        material_expression_frames_width.set_editor_property("R", float(frames_width))
-
-                        material_expression_frames_height = material_editing.create_material_expression(material, unreal.MaterialExpressionConstant, node_pos_x=-2000, node_pos_y=300)
-                        material_expression_frames_height.set_editor_property("R", float(frames_height))
-
-                        # interpolation & modes
-                        material_expression_interpolation_auto = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2000, node_pos_y=400)
-                        material_expression_interpolation_auto.set_editor_property("Value", False) # @TODO set
-
-                        material_expression_interpolation_nearest = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2000, node_pos_y=475)
-                        material_expression_interpolation_nearest.set_editor_property("Value", True) # @TODO set
-
-                        material_expression_continuous = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2000, node_pos_y=550)
-                        material_expression_continuous.set_editor_property("Value", True) # @TODO set
-
-                        # vertex interpolator
-                        material_expression_vertexinterpolator = material_editing.create_material_expression(material, unreal.MaterialExpressionVertexInterpolator, node_pos_x=-500, node_pos_y=-150)
-                        material_prop = unreal.MaterialProperty.MP_NORMAL
-                        material_editing.connect_material_property(material_expression_vertexinterpolator, "", material_prop)
-
-                        # tex coords
-                        material_expression_vat_function_texcoords = material_editing.create_material_expression(material, unreal.MaterialExpressionMaterialFunctionCall, node_pos_x=-2400, node_pos_y=-30)
-                        material_expression_vat_function_texcoords.set_material_function(material_texcoords_function_asset)
-
-                        material_expression_texcoords0 = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2600, node_pos_y=-100)
-                        material_expression_texcoords0.set_editor_property("Value", int(uv_index) == 0)
-                        material_expression_texcoords1 = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2600, node_pos_y=-25)
-                        material_expression_texcoords1.set_editor_property("Value", int(uv_index) == 1)
-                        material_expression_texcoords2 = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2600, node_pos_y=50)
-                        material_expression_texcoords2.set_editor_property("Value", int(uv_index) == 2)
-                        material_expression_texcoords3 = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2600, node_pos_y=125)
-                        material_expression_texcoords3.set_editor_property("Value", int(uv_index) == 3)
-                        material_expression_texcoords4 = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2600, node_pos_y=200)
-                        material_expression_texcoords4.set_editor_property("Value", int(uv_index) == 4)
-                        material_expression_texcoords5 = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2600, node_pos_y=275)
-                        material_expression_texcoords5.set_editor_property("Value", int(uv_index) == 5)
-                        material_expression_texcoords6 = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2600, node_pos_y=350)
-                        material_expression_texcoords6.set_editor_property("Value", int(uv_index) == 6)
-
-                        material_editing.connect_material_expressions(material_expression_texcoords0, "", material_expression_vat_function_texcoords, "0")
-                        material_editing.connect_material_expressions(material_expression_texcoords1, "", material_expression_vat_function_texcoords, "1")
-                        material_editing.connect_material_expressions(material_expression_texcoords2, "", material_expression_vat_function_texcoords, "2")
-                        material_editing.connect_material_expressions(material_expression_texcoords3, "", material_expression_vat_function_texcoords, "3")
-                        material_editing.connect_material_expressions(material_expression_texcoords4, "", material_expression_vat_function_texcoords, "4")
-                        material_editing.connect_material_expressions(material_expression_texcoords5, "", material_expression_vat_function_texcoords, "5")
-                        material_editing.connect_material_expressions(material_expression_texcoords6, "", material_expression_vat_function_texcoords, "6")
-
-                        # normal transform
-                        material_expression_normaltransform = material_editing.create_material_expression(material, unreal.MaterialExpressionTransform, node_pos_x=-800, node_pos_y=-160)
-                        material_expression_normaltransform.set_editor_property("transform_source_type", unreal.MaterialVectorCoordTransformSource.TRANSFORMSOURCE_INSTANCE)
-                        material_expression_normaltransform.set_editor_property("transform_type", unreal.MaterialVectorCoordTransform.TRANSFORM_TANGENT)
-                        material_editing.connect_material_expressions(material_expression_normaltransform, "", material_expression_vertexinterpolator, "")
-
-                        # normal VAT texture
-                        material_expression_vat_texture_normal = material_editing.create_material_expression(material, unreal.MaterialExpressionTextureObject, node_pos_x=-2000, node_pos_y=-550)
-                        # @TODO set texture
-
-                        # normal remapping
-                        texture_remap = False
-                        textures = root.find("Textures")
-                        if textures is not None:
-                            for texture in textures.findall("Texture"):
-                                texture_type = texture.get("type")
-                                if texture_type is not None and texture_type == "Normal":
-                                    texture_remap = texture.get("remap")
-                                    break
-
-                        material_expression_vat_normalremapped = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2000, node_pos_y=-300)
-                        material_expression_vat_normalremapped.set_editor_property("Value", bool(texture_remap))
-
-                        material_expression_vat_normalremapping = material_editing.create_material_expression(material, unreal.MaterialExpressionConstant3Vector, node_pos_x=-2000, node_pos_y=-200)
-                        material_prop = unreal.LinearColor(1.0, 1.0, 1.0, 1.0)
-                        material_expression_vat_normalremapping.set_editor_property("Constant", material_prop)
-
-                        # normal VAT function
-                        material_expression_vat_function_normal = material_editing.create_material_expression(material, unreal.MaterialExpressionMaterialFunctionCall, node_pos_x=-1400, node_pos_y=-150)
-                        material_expression_vat_function_normal.set_material_function(material_vat_function_asset)
-                        material_editing.connect_material_expressions(material_expression_vat_function_normal, "", material_expression_normaltransform, "")
-                        material_editing.connect_material_expressions(material_expression_vat_texture_normal, "", material_expression_vat_function_normal, "Tex")
-                        material_editing.connect_material_expressions(material_expression_vat_normalremapped, "", material_expression_vat_function_normal, "Remapped")
-                        material_editing.connect_material_expressions(material_expression_vat_normalremapping, "", material_expression_vat_function_normal, "Remapping")
-                        material_editing.connect_material_expressions(material_expression_vat_function_texcoords, "", material_expression_vat_function_normal, "UV")
-                        unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "0", material_expression_vat_function_normal, "Frame"))
-                        unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "Input0", material_expression_vat_function_normal, "Frame"))
-                        unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "Param0", material_expression_vat_function_normal, "Frame"))
-                        unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "Parameter0", material_expression_vat_function_normal, "Frame"))
-                        unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "Parameter", material_expression_vat_function_normal, "Frame"))
-                        unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "DynamicParameter0", material_expression_vat_function_normal, "Frame"))
-                        unreal.log_error(material_editing.connect_material_expressions(material_expression_dynparam, "DynamicParameter", material_expression_vat_function_normal, "Frame"))
-                        material_editing.connect_material_expressions(material_expression_frames_width, "", material_expression_vat_function_normal, "FrameHeight")
-                        material_editing.connect_material_expressions(material_expression_frames_height, "", material_expression_vat_function_normal, "FrameWidth")
-                        material_editing.connect_material_expressions(material_expression_interpolation_auto, "", material_expression_vat_function_normal, "Interpolation_Auto")
-                        material_editing.connect_material_expressions(material_expression_interpolation_nearest, "", material_expression_vat_function_normal, "Interpolation_Nearest")
-                        material_editing.connect_material_expressions(material_expression_continuous, "", material_expression_vat_function_normal, "Continuous")
-
-                        # offset transform
-                        material_expression_offsettransform = material_editing.create_material_expression(material, unreal.MaterialExpressionTransform, node_pos_x=-800, node_pos_y=490)
-                        material_expression_offsettransform.set_editor_property("transform_source_type", unreal.MaterialVectorCoordTransformSource.TRANSFORMSOURCE_INSTANCE)
-                        material_expression_offsettransform.set_editor_property("transform_type", unreal.MaterialVectorCoordTransform.TRANSFORM_WORLD)
-                        #material_prop = unreal.MaterialProperty.MP_WorldPositionOffset # (12), doesn't exist in Python!?
-                        #material_editing.connect_material_property(material_expression_offsettransform, "", material_prop)
-
-                        unit_system = "METRIC"
-                        unit_unit = "METERS"
-                        unit_length = "1.0"
-                        unit_scale = "100.0"
-                        unit_invert_x = "False"
-                        unit_invert_y = "True"
-                        unit_invert_z = "False"
-                        unit = root.find("Unit")
-                        if unit is not None:
-                            unit_system = unit.get("system")
-                            unit_unit = unit.get("unit")
-                            unit_length = unit.get("length")
-                            unit_scale = unit.get("scale") # @TODO apply scale to material > (scale / length) ?
-                            unit_invert_x = unit.get("invert_x")
-                            unit_invert_y = unit.get("invert_y") # @TODO do smthing if not x/Y/z
-                            unit_invert_z = unit.get("invert_z")
-
-                        unit_length = float(unit_length)
-                        unit_scale = float(unit_scale)
-                        unit_invert_x = True if unit_invert_x == 'True' else False
-                        unit_invert_y = True if unit_invert_y == 'True' else False
-                        unit_invert_z = True if unit_invert_z == 'True' else False
-
-                        # see if offset VAT is in centimeters
-                        converted_scale = get_converted_scale(unit_system, unit_unit, unit_length, unit_scale)
-                        converted = abs(converted_scale - 1.0) < 0.001
-
-                        # see if offset VAT is inverted
-                        inverted = (not unit_invert_x) and (unit_invert_y) and (not unit_invert_z)
-                        if not inverted and converted: # @TODO fix
-                            pass
-                        else:
-                            scale = unreal.Vector(-converted_scale if unit_invert_x else converted_scale,
-                                                  converted_scale if unit_invert_y else -converted_scale,
-                                                  -converted_scale if unit_invert_z else converted_scale)
-
-                            material_expression_offsetscale_multiply = material_editing.create_material_expression(material, unreal.MaterialExpressionMultiply, node_pos_x=-450, node_pos_y=500)
-                            material_expression_offsetscale = material_editing.create_material_expression(material, unreal.MaterialExpressionConstant3Vector, node_pos_x=-800, node_pos_y=600)
-                            material_prop = unreal.LinearColor(scale.x, scale.y, scale.z, 1.0)
-                            material_expression_offsetscale.set_editor_property("Constant", material_prop)
-
-                            material_editing.connect_material_expressions(material_expression_offsettransform, "", material_expression_offsetscale_multiply, "A")
-                            material_editing.connect_material_expressions(material_expression_offsetscale, "", material_expression_offsetscale_multiply, "B")
-
-                        # offset VAT texture
-                        material_expression_vat_texture_offset = material_editing.create_material_expression(material, unreal.MaterialExpressionTextureObject, node_pos_x=-2000, node_pos_y=700)
-                        # @TODO set texture
-
-                        # previous frame switch
-                        material_expression_vat_function_prevframeswitch = material_editing.create_material_expression(material, unreal.MaterialExpressionPreviousFrameSwitch, node_pos_x=-1050, node_pos_y=500)
-
-                        # offset remapping
-                        texture_remap = "False"
-                        texture_remap_x = "0"
-                        texture_remap_y = "0"
-                        texture_remap_z = "0"
-                        textures = root.find("Textures")
-                        if textures is not None:
-                            for texture in textures.findall("Texture"):
-                                texture_type = texture.get("type")
-                                if texture_type is not None and texture_type == "Offset":
-                                    texture_remap = texture.get("remap")
-                                    texture_remap_x = texture.get("remap_x")
-                                    texture_remap_y = texture.get("remap_y")
-                                    texture_remap_z = texture.get("remap_z")
-                                    break
-
-                        material_expression_vat_offsetremapped = material_editing.create_material_expression(material, unreal.MaterialExpressionStaticBool, node_pos_x=-2000, node_pos_y=850)
-                        material_expression_vat_offsetremapped.set_editor_property("Value", bool(texture_remap))
-
-                        material_expression_vat_offsetremapping = material_editing.create_material_expression(material, unreal.MaterialExpressionConstant3Vector, node_pos_x=-2000, node_pos_y=1000)
-                        material_prop = unreal.LinearColor(float(texture_remap_x), float(texture_remap_y), float(texture_remap_z), 1.0)
-                        material_expression_vat_offsetremapping.set_editor_property("Constant", material_prop)
-
-                        # offset VAT function
-                        material_expression_vat_function_offset = material_editing.create_material_expression(material, unreal.MaterialExpressionMaterialFunctionCall, node_pos_x=-1700, node_pos_y=500)
-                        material_expression_vat_function_offset.set_material_function(material_vat_function_asset)
-                        material_editing.connect_material_expressions(material_expression_vat_texture_offset, "", material_expression_vat_function_offset, "Tex")
-                        material_editing.connect_material_expressions(material_expression_vat_offsetremapped, "", material_expression_vat_function_offset, "Remapped")
-                        material_editing.connect_material_expressions(material_expression_vat_offsetremapping, "", material_expression_vat_function_offset, "Remapping")
-                        material_editing.connect_material_expressions(material_expression_vat_function_texcoords, "", material_expression_vat_function_offset, "UV")
-                        material_editing.connect_material_expressions(material_expression_dynparam, "Param1", material_expression_vat_function_offset, "Frame")
-                        material_editing.connect_material_expressions(material_expression_frames_width, "", material_expression_vat_function_offset, "FrameHeight")
-                        material_editing.connect_material_expressions(material_expression_frames_height, "", material_expression_vat_function_offset, "FrameWidth")
-                        material_editing.connect_material_expressions(material_expression_interpolation_auto, "", material_expression_vat_function_offset, "Interpolation_Auto")
-                        material_editing.connect_material_expressions(material_expression_interpolation_nearest, "", material_expression_vat_function_offset, "Interpolation_Nearest")
-                        material_editing.connect_material_expressions(material_expression_continuous, "", material_expression_vat_function_offset, "Continuous")
-
-                        # previous offset VAT function
-                        material_expression_vat_function_prevoffset = material_editing.create_material_expression(material, unreal.MaterialExpressionMaterialFunctionCall, node_pos_x=-1400, node_pos_y=700)
-                        material_expression_vat_function_prevoffset.set_material_function(material_vat_function_asset)
-                        material_editing.connect_material_expressions(material_expression_vat_texture_offset, "", material_expression_vat_function_prevoffset, "Tex")
-                        material_editing.connect_material_expressions(material_expression_vat_offsetremapped, "", material_expression_vat_function_prevoffset, "Remapped")
-                        material_editing.connect_material_expressions(material_expression_vat_offsetremapping, "", material_expression_vat_function_prevoffset, "Remapping")
-                        material_editing.connect_material_expressions(material_expression_vat_function_texcoords, "", material_expression_vat_function_prevoffset, "UV")
-                        material_editing.connect_material_expressions(material_expression_dynparam, "Param1", material_expression_vat_function_prevoffset, "0")
-                        material_editing.connect_material_expressions(material_expression_frames_width, "", material_expression_vat_function_prevoffset, "FrameHeight")
-                        material_editing.connect_material_expressions(material_expression_frames_height, "", material_expression_vat_function_prevoffset, "FrameWidth")
-                        material_editing.connect_material_expressions(material_expression_interpolation_auto, "", material_expression_vat_function_prevoffset, "Interpolation_Auto")
-                        material_editing.connect_material_expressions(material_expression_interpolation_nearest, "", material_expression_vat_function_prevoffset, "Interpolation_Nearest")
-                        material_editing.connect_material_expressions(material_expression_continuous, "", material_expression_vat_function_prevoffset, "Continuous")
-
-                        material_editing.connect_material_expressions(material_expression_vat_function_offset, "", material_expression_vat_function_prevframeswitch, "Current Frame")
-                        material_editing.connect_material_expressions(material_expression_vat_function_prevoffset, "", material_expression_vat_function_prevframeswitch, "Previous Frame")
-
-                        material_editing.connect_material_expressions(material_expression_vat_function_prevframeswitch, "", material_expression_offsettransform, "")
-
-            elif isinstance(asset, unreal.Texture2D):
+    volumes = 0
+    for filename, object_path, asset in imported_assets:
+        if isinstance(asset, unreal.Texture2D) and filename in texture_formats_by_file:
+            with baked_data_profiler.phase("volume_texture", baked_data.file_path):
+                if not create_volume_texture_sdf(asset_tools, asset, object_path, texture_formats_by_file[filename]):
+                    return (False, "Couldn't create volume texture of " + filename)
+            volumes += 1
+
+            yield (0, "Built volume texture of " + filename)
+        elif isinstance(asset, unreal.StaticMesh):
+            unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedData", "SDF")
+
+    if texture_formats and not volumes:
+        return (False, "Failed to import SDF texture")
+
+    if create_material and volumes:
+        with baked_data_profiler.phase("material", baked_data.file_path):
+            if not get_sdf_function(asset_tools):
+                return (False, "Couldn't create material function: " + SDF_FUNCTION_PATH)
+
+    return (True, "")
+
+######
+# OA #
+
+# ancestor indices of an element in a block of the lookup written by BlenderDataBakerHierarchy, pivot painter unpacked
+# like Doc/pivot_painter_unpack.hlsl. Size is the (width, height) of a block, the lookup's BakedDataAncestorSize.
+ANCESTORS_HLSL = """uint2 Texel = uint2(uint(Index) % uint(Size.x), uint(Index) / uint(Size.x) + uint(Block) * uint(Size.y));
+uint4 Packed = asuint(Lookup.Load(int3(Texel, 0)));
+uint4 Exponent = (Packed >> 23) & 0xff;
+uint4 Unpacked = ((Packed >> 16) & 0x8000) | (((Exponent - (127 - 15)) << 10) * uint4(Exponent != 0)) | ((Packed >> 13) & 0x3ff);
+return float4(int4(Unpacked) - 1024);"""
+
+def get_texture_formats_oa(baked_data, compression_tolerance, converted_dir):
+    """ Returns the TextureFormat of each ObjectAttributes/OAT texture keyed by source file, plus the ancestor lookup of ObjectAttributes """
+    texture_formats = {}
+    for texture in baked_data.textures:
+        if texture.path and os.path.exists(texture.path):
+            with baked_data_profiler.phase("analyze_texture", baked_data.file_path):
+                texture_format = baked_data_textures.analyze_texture(texture, compression_tolerance, converted_dir)
+
+            texture_format.type = texture.get_key()
+            texture_formats[texture.path] = texture_format
+
+    # OAT animate objects without a hierarchy
+    parent_textures = [texture for texture in baked_data.textures if texture.path and any(channel.mode == "HIERARCHY" for channel in texture.channels.values())]
+    if baked_data.type == 'OA' and parent_textures and converted_dir and baked_data_textures.is_numpy_available():
+        ancestors_path = baked_data_clips.get_generated_texture_path(parent_textures[0], converted_dir, "Ancestors")
+        with baked_data_profiler.phase("ancestors", baked_data.file_path):
+            texture_format = baked_data_hierarchy.get_ancestor_lookup(baked_data, ancestors_path)
+
+        texture_formats[ancestors_path] = texture_format
+
+    return texture_formats
+
+def build_ancestors_function(material_function):
+    """ Lookup (the ancestor lookup), Index (an element's), Block and Size (the lookup's BakedDataAncestorSize) in, the indices of 4 ancestors out
+
+    Block b returns the ancestors 4 * b + 1 to 4 * b + 4 levels up, a hierarchy of depth d is resolved in ceil(d / 4) fetches.
+    """
+    build_custom_function(material_function, (("Lookup", unreal.FunctionInputType.FUNCTION_INPUT_TEXTURE2D, None),
+                                              ("Index", unreal.FunctionInputType.FUNCTION_INPUT_SCALAR, None),
+                                              ("Block", unreal.FunctionInputType.FUNCTION_INPUT_SCALAR, unreal.Vector4(0.0, 0.0, 0.0, 0.0)),
+                                              ("Size", unreal.FunctionInputType.FUNCTION_INPUT_VECTOR2, None)),
+                          ANCESTORS_HLSL, unreal.CustomMaterialOutputType.CMOT_FLOAT4, "Ancestors", "AncestorIndices")
+
+def get_ancestors_function(asset_tools, function_path = ANCESTORS_FUNCTION_PATH):
+    """ Returns the material function fetching ancestor lookups, creating it if needed """
+    return get_material_function(asset_tools, function_path, build_ancestors_function)
+
+def import_baked_data_oa(baked_data, asset_tools, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, create_material, compression_tolerance = COMPRESSION_TOLERANCE, asset_paths = None):
+    """ asset_paths, if given, is filled with the assets the import created """
+    texture_formats = get_texture_formats_oa(baked_data, compression_tolerance, get_converted_textures_dir(baked_data)) if import_textures else {}
+
+    # generated lookups are imported along the baked textures
+    with baked_data_profiler.phase("create_tasks", baked_data.file_path):
+        import_tasks = create_import_tasks(baked_data, destination, import_mesh, import_mesh_subfolder, import_textures, import_textures_subfolder, texture_formats)
+
+    with baked_data_profiler.phase("import_asset_tasks", baked_data.file_path):
+        asset_tools.import_asset_tasks(import_tasks)
+
+    if asset_paths is not None:
+        asset_paths.extend(get_baked_data_asset_paths(baked_data, import_tasks, create_material, "", ""))
+
+    with baked_data_profiler.phase("post_process", baked_data.file_path):
+        return run_import_steps(process_imported_assets_oa_steps(baked_data, asset_tools, import_tasks, create_material, texture_formats))
+
+def process_imported_assets_oa_steps(baked_data, asset_tools, import_tasks, create_material, texture_formats, source_tasks = None):
+    """ Import steps applying the ObjectAttributes/OAT settings to the imported assets, a step per loaded asset, texture and mesh
+
+    create_material creates the material function fetching ancestor lookups if one was imported and it doesn't exist yet.
+    source_tasks is the one of process_imported_assets_vat_steps().
+    """
+    texture_formats_by_file = {texture_format.path: texture_format for texture_format in texture_formats.values() if texture_format.path}
+    lookup = next((texture_format.ancestors for texture_format in texture_formats.values() if texture_format.type == "Ancestors"), None)
+
+    if source_tasks is None:
+        source_tasks = get_source_tasks(import_tasks)
+
+    imported_assets = []
+    for filename, import_task in source_tasks.items():
+        for object_path in import_task.imported_object_paths:
+            with baked_data_profiler.phase("load_asset", baked_data.file_path):
+                imported_assets.append((filename, object_path, unreal.EditorAssetLibrary.load_asset(object_path)))
+
+            yield (0, "Loaded " + object_path)
+
+    ancestors_imported = False
+    for filename, object_path, asset in imported_assets:
+        if isinstance(asset, unreal.Texture2D):
+            with baked_data_profiler.phase("texture_settings", baked_data.file_path):
+                texture_format = texture_formats_by_file.get(filename)
+                if texture_format is None:
+                    texture_format = baked_data_textures.TextureFormat(baked_data_textures.TEXTURE_FORMAT_LOSSLESS, msg="not analyzed")
+                if texture_format.msg:
+                    unreal.log("Keeping {} lossless: {}".format(filename, texture_format.msg))
+
+                # attributes are fetched per element, never filtered
                 asset.set_editor_property("sRGB", False)
-                asset.set_editor_property("compression_settings", unreal.TextureCompressionSettings.TC_HDR_F32)
+                asset.set_editor_property("compression_settings", getattr(unreal.TextureCompressionSettings, texture_format.compression))
+                asset.set_editor_property("compression_none", texture_format.is_uncompressed())
                 asset.set_editor_property("filter", unreal.TextureFilter.TF_NEAREST)
                 asset.set_editor_property("lod_group", unreal.TextureGroup.TEXTUREGROUP_EFFECTS_NOT_FILTERED)
+                asset.set_editor_property("mip_gen_settings", unreal.TextureMipGenSettings.TMGS_NO_MIPMAPS)
 
-    return (True, "")
\ No newline at end of file
+                unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedData", baked_data.type)
+                unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataFormat", texture_format.name)
+                unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataMaxError", "{:g}".format(texture_format.max_error))
+                unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataMemorySaved", str(texture_format.get_memory_saved()))
+
+                if texture_format.type == "Ancestors":
+                    ancestors_imported = True
+                    block_height = texture_format.height // texture_format.ancestors.lookup_fetches
+                    unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataAncestorSize", "{},{}".format(texture_format.width, block_height))
+                    unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataAncestorDepth", str(texture_format.ancestors.depth))
+
+            yield (0, "Applied texture settings to " + filename)
+
+    for filename, object_path, asset in imported_assets:
+        if isinstance(asset, unreal.StaticMesh):
+            unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedData", baked_data.type)
+            if lookup is not None:
+                unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataHierarchyDepth", str(lookup.depth))
+                unreal.EditorAssetLibrary.set_metadata_tag(asset, "BakedDataFetchesSaved", str(lookup.get_fetches_saved()))
+
+            yield (0, "Applied mesh settings to " + filename)
+
+    if lookup is not None:
+        if lookup.msg:
+            unreal.log("No ancestor lookup for {}: {}".format(baked_data.file_path, lookup.msg))
+        else:
+            unreal.log("Ancestors of {}: depth {}, lookup fetches {} (walk {}), {} saved per vertex".format(baked_data.file_path, lookup.depth, lookup.lookup_fetches, lookup.walk_fetches, lookup.get_fetches_saved()))
+
+    if create_material and ancestors_imported:
+        with baked_data_profiler.phase("material", baked_data.file_path):
+            if not get_ancestors_function(asset_tools):
+                return (False, "Couldn't create material function: " + ANCESTORS_FUNCTION_PATH)
+
+    return (True, "")
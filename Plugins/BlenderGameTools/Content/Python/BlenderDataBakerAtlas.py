@@ -0,0 +1,184 @@
+import os
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import BlenderDataBakerTextures as baked_data_textures
+import BlenderDataBakerClips as baked_data_clips
+
+# max atlas width/height in texels
+ATLAS_MAX_SIZE = 8192
+
+# empty texels between regions so bilinear interpolation doesn't bleed into a neighbour
+ATLAS_SPACING = 1
+
+# textures sharing an atlas, every bake has one region at the same place in each of them
+ATLAS_TEXTURE_TYPES = ("Offset", "Normal")
+
+###########
+# PACKING #
+
+def pack_rectangles(sizes, max_size = ATLAS_MAX_SIZE, spacing = ATLAS_SPACING):
+    """ Shelf packs (width, height) rectangles, tallest first
+
+    Returns (positions, atlas_sizes), positions being an (atlas index, x, y) per rectangle or None if it's larger than max_size.
+    """
+    positions = [None] * len(sizes)
+
+    fitting = [index for index, (width, height) in enumerate(sizes) if width <= max_size and height <= max_size]
+    if not fitting:
+        return (positions, [])
+
+    # atlases are kept about square, not wider than needed
+    area = sum((sizes[index][0] + spacing) * (sizes[index][1] + spacing) for index in fitting)
+    atlas_width = min(max_size, max(max(sizes[index][0] for index in fitting), int(math.ceil(math.sqrt(area)))))
+
+    # shelves are [atlas index, y, height, x], x being the next free texel
+    shelves = []
+    atlas_heights = []
+    for index in sorted(fitting, key=lambda index: (sizes[index][1], sizes[index][0]), reverse=True):
+        width, height = sizes[index]
+
+        shelf = next((shelf for shelf in shelves if height <= shelf[2] and shelf[3] + width <= atlas_width), None)
+        if shelf is None:
+            # new shelf at the bottom of the last atlas, or a new atlas if it's full
+            if atlas_heights and atlas_heights[-1] + spacing + height <= max_size:
+                shelf_y = atlas_heights[-1] + spacing
+            else:
+                atlas_heights.append(0)
+                shelf_y = 0
+
+            shelf = [len(atlas_heights) - 1, shelf_y, height, 0]
+            shelves.append(shelf)
+            atlas_heights[-1] = shelf_y + height
+
+        positions[index] = (shelf[0], shelf[3], shelf[1])
+        shelf[3] += width + spacing
+
+    atlas_widths = [0] * len(atlas_heights)
+    for index in fitting:
+        atlas_index, x, y = positions[index]
+        atlas_widths[atlas_index] = max(atlas_widths[atlas_index], x + sizes[index][0])
+
+    return (positions, list(zip(atlas_widths, atlas_heights)))
+
+class AtlasRegion:
+    """ Texels of a bake in an atlas """
+    __slots__ = ("atlas", "x", "y", "width", "height", "atlas_width", "atlas_height")
+
+    def __init__(self, atlas, x, y, width, height, atlas_width, atlas_height):
+        self.atlas = atlas
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.atlas_width = atlas_width
+        self.atlas_height = atlas_height
+
+    def get_uv_scale(self):
+        """ """
+        return (self.width / self.atlas_width, self.height / self.atlas_height)
+
+    def get_uv_offset(self):
+        """ """
+        return (self.x / self.atlas_width, self.y / self.atlas_height)
+
+class Atlas:
+    """ Atlas textures written by build_vat_atlases(), paths are keyed by texture type """
+    __slots__ = ("index", "width", "height", "paths", "count")
+
+    def __init__(self, index, width, height):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.paths = {}
+        self.count = 0
+
+    def get_memory_size(self):
+        """ TC_HDR_F32 bytes of all the atlas textures """
+        return self.width * self.height * baked_data_textures.TEXTURE_FORMAT_LOSSLESS[2] * len(self.paths)
+
+#########
+# BUILD #
+
+def read_atlas_channels(baked_data):
+    """ Returns (channels, msg), channels being the RGBA values of every atlas texture type, keyed by type, or None """
+    channels = {}
+    size = None
+    for texture_type in ATLAS_TEXTURE_TYPES:
+        texture = baked_data.get_texture(texture_type)
+        if texture is None or not texture.path:
+            return (None, "no {} texture".format(texture_type))
+
+        texture_channels, msg = baked_data_textures.read_texture_channels(texture)
+        if texture_channels is None:
+            return (None, msg)
+
+        texture_size = texture_channels[0][1].shape
+        if size is not None and texture_size != size:
+            return (None, "{} texture size doesn't match".format(texture_type))
+        size = texture_size
+
+        channels[texture_type] = dict(texture_channels)
+
+    # frames have to stay whole rows, they're stepped through by MF_VAT
+    if not baked_data_clips.get_rows_per_frame(baked_data, size[0]):
+        return (None, "frames don't map to whole rows")
+
+    return (channels, "")
+
+def get_atlas_path(output_dir, atlas_name, texture_type, atlas_index, num_atlases):
+    """ """
+    suffix = "_{}".format(atlas_index) if num_atlases > 1 else ""
+    return os.path.join(output_dir, "T_{}{}_{}.exr".format(atlas_name, suffix, texture_type))
+
+def build_vat_atlases(baked_datas, output_dir, atlas_name, max_size = ATLAS_MAX_SIZE):
+    """ Packs the Offset/Normal textures of VAT bakes into shared atlases written in output_dir
+
+    Returns (atlases, regions, msgs), regions and msgs having an entry per bake: its AtlasRegion, or None with the reason it wasn't packed.
+    Bakes keep their whole texture, padding frames included, so their frame layout is unchanged.
+    """
+    msgs = [""] * len(baked_datas)
+    channels = [None] * len(baked_datas)
+    for index, baked_data in enumerate(baked_datas):
+        channels[index], msgs[index] = read_atlas_channels(baked_data)
+
+    packed = [index for index, baked_data_channels in enumerate(channels) if baked_data_channels is not None]
+    sizes = [channels[index][ATLAS_TEXTURE_TYPES[0]]["R"].shape[::-1] for index in packed]
+    positions, atlas_sizes = pack_rectangles(sizes, max_size)
+
+    atlases = [Atlas(atlas_index, width, height) for atlas_index, (width, height) in enumerate(atlas_sizes)]
+    regions = [None] * len(baked_datas)
+
+    # RGBA planes of every atlas texture, empty texels stay 0
+    atlas_values = [{texture_type: {channel_name: np.zeros((atlas.height, atlas.width), dtype=np.float32) for channel_name in ("R", "G", "B", "A")} for texture_type in ATLAS_TEXTURE_TYPES} for atlas in atlases]
+
+    for index, (width, height), position in zip(packed, sizes, positions):
+        if position is None:
+            msgs[index] = "texture larger than {} texels".format(max_size)
+            continue
+
+        atlas_index, x, y = position
+        atlas = atlases[atlas_index]
+        regions[index] = AtlasRegion(atlas_index, x, y, width, height, atlas.width, atlas.height)
+        atlas.count += 1
+
+        for texture_type, texture_channels in channels[index].items():
+            for channel_name, channel_values in texture_channels.items():
+                atlas_values[atlas_index][texture_type][channel_name][y:y + height, x:x + width] = channel_values
+
+    ##########
+    # OUTPUT #
+
+    if atlases and not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    for atlas in atlases:
+        for texture_type in ATLAS_TEXTURE_TYPES:
+            atlas.paths[texture_type] = get_atlas_path(output_dir, atlas_name, texture_type, atlas.index, len(atlases))
+            baked_data_textures.write_exr(atlas.paths[texture_type], atlas_values[atlas.index][texture_type])
+
+    return (atlases, regions, msgs)
@@ -0,0 +1,507 @@
+""" Benchmarks for the BlenderDataBaker python modules
+
+Run outside of Unreal with: python BlenderDataBakerBenchmark.py codecs --size 4000000
+                             python BlenderDataBakerBenchmark.py import --json import.json --trace import.trace.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+import BlenderDataBakerCodecs as codecs
+
+#####################
+# SCALAR REFERENCES #
+
+# straight per-texel ports of Doc/*.hlsl, each operation rounded to float32 like the shaders,
+# used to check the vectorized codecs bit for bit and as the per-texel python loop baseline
+
+# @NOTE bits are reinterpreted through numpy, going through python floats would quiet NaN bit patterns
+
+def asuint(value):
+    """ """
+    return int(np.float32(value).view(np.uint32))
+
+def asfloat(value):
+    """ """
+    return np.uint32(value & 0xffffffff).view(np.float32)
+
+def saturate(value):
+    """ """
+    return min(max(value, np.float32(0.0)), np.float32(1.0))
+
+def reference_pack_float_11_10_10(x, y, z, min_xyz, max_xyz):
+    """ """
+    X = int(np.floor(saturate((x - min_xyz[0]) / (max_xyz[0] - min_xyz[0])) * np.float32((1 << 11) - 1)))
+    X = ((X >> 3) << 4) | (X & ((1 << 3) - 1))
+    Y = int(np.floor(saturate((y - min_xyz[1]) / (max_xyz[1] - min_xyz[1])) * np.float32((1 << 10) - 1)))
+    Z = int(np.floor(saturate((z - min_xyz[2]) / (max_xyz[2] - min_xyz[2])) * np.float32((1 << 10) - 1)))
+    return asfloat((X << 20) | (Y << 10) | Z)
+
+def reference_unpack_float_11_10_10(packed, min_xyz, max_xyz):
+    """ """
+    packed_int = asuint(packed)
+    packed_x = packed_int >> 20
+    packed_x = ((packed_x >> 4) << 3) | (packed_x & ((1 << 3) - 1))
+    x = np.float32(packed_x) / np.float32((1 << 11) - 1)
+    x = x * (max_xyz[0] - min_xyz[0]) + min_xyz[0]
+    y = np.float32((packed_int >> 10) & ((1 << 10) - 1)) / np.float32((1 << 10) - 1)
+    y = y * (max_xyz[1] - min_xyz[1]) + min_xyz[1]
+    z = np.float32(packed_int & ((1 << 10) - 1)) / np.float32((1 << 10) - 1)
+    z = z * (max_xyz[2] - min_xyz[2]) + min_xyz[2]
+    return (x, y, z)
+
+def reference_pack_float_16_15(x, y, min_xy, max_xy):
+    """ """
+    X = int(np.floor(saturate((x - min_xy[0]) / (max_xy[0] - min_xy[0])) * np.float32((1 << 16) - 1)))
+    X = ((X >> 8) << 9) | (X & ((1 << 8) - 1))
+    Y = int(np.floor(saturate((y - min_xy[1]) / (max_xy[1] - min_xy[1])) * np.float32((1 << 15) - 1)))
+    return asfloat((X << 15) | Y)
+
+def reference_unpack_float_16_15(packed, min_xy, max_xy):
+    """ """
+    packed_int = asuint(packed)
+    packed_x = packed_int >> 15
+    packed_x = ((packed_x >> 9) << 8) | (packed_x & ((1 << 8) - 1))
+    x = np.float32(packed_x) / np.float32((1 << 16) - 1)
+    x = x * (max_xy[0] - min_xy[0]) + min_xy[0]
+    y = np.float32(packed_int & ((1 << 15) - 1)) / np.float32((1 << 15) - 1)
+    y = y * (max_xy[1] - min_xy[1]) + min_xy[1]
+    return (x, y)
+
+def reference_pack_float_frac(x, y, min_y, max_y, precision):
+    """ """
+    y_remapped = (y - min_y) / (max_y - min_y)
+    y_remapped *= np.float32(min(0.999, max(0.001, precision)))
+    return np.floor(x) + y_remapped
+
+def reference_unpack_float_frac(packed, min_y, max_y, precision):
+    """ """
+    inv_precision = np.float32(1.0) / np.float32(min(0.999, max(0.001, precision)))
+    x = np.floor(packed)
+    return (x, ((packed - x) * inv_precision * (max_y - min_y)) + min_y)
+
+def reference_pack_pivot_painter_index(index):
+    """ """
+    index = int(index) + 1024
+    sign = (index & 0x8000) << 16
+    exponent = 0 if (index & 0x7fff) == 0 else ((((index >> 10) & 0x1f) - 15 + 127) << 23)
+    mantissa = (index & 0x3ff) << 13
+    return asfloat(sign | exponent | mantissa)
+
+def reference_unpack_pivot_painter_index(packed):
+    """ """
+    packed_int = asuint(packed)
+    sign = (packed_int >> 16) & 0x8000
+    exponent = (packed_int >> 23) & 0xff
+    exponent = 0 if exponent == 0 else (exponent - 127 + 15) << 10
+    mantissa = (packed_int >> 13) & 0x3ff
+    return (sign | exponent | mantissa) - 1024
+
+def reference_encode_three_smallest(quat):
+    """ """
+    quat = [np.float32(component) for component in quat]
+
+    max_abs_component = np.float32(-1.0)
+    max_abs_component_index = 0
+    for i in range(4):
+        if abs(quat[i]) > max_abs_component:
+            max_abs_component = abs(quat[i])
+            max_abs_component_index = i
+
+    sign = np.float32(-1.0) if quat[max_abs_component_index] < 0.0 else np.float32(1.0)
+    quat = [component * sign for component in quat]
+
+    three_smallest = [quat[i] for i in range(4) if i != max_abs_component_index]
+
+    scale = np.float32(0.707106781)
+    encoded = max_abs_component_index << 30
+    for i, component in enumerate(three_smallest):
+        component = (component + scale) / (scale + scale)
+        encoded |= int(component * np.float32(1023)) << (10 * (2 - i))
+
+    return asfloat(encoded)
+
+def reference_decode_three_smallest(packed):
+    """ """
+    encoded = asuint(packed)
+    scale = np.float32(0.707106781)
+
+    x, y, z = [np.float32((encoded >> (10 * i)) & 1023) for i in (2, 1, 0)]
+    x, y, z = [(component / np.float32(1023)) * (scale + scale) - scale for component in (x, y, z)]
+    w = np.sqrt(max(np.float32(0.0), np.float32(1.0) + (x * -x + y * -y + z * -z)))
+
+    max_abs_component_index = encoded >> 30
+    if max_abs_component_index == 0:
+        return (w, x, y, z)
+    elif max_abs_component_index == 1:
+        return (x, w, y, z)
+    elif max_abs_component_index == 2:
+        return (x, y, w, z)
+
+    return (x, y, z, w)
+
+##########
+# CODECS #
+
+def get_test_data(size, seed = 0):
+    """ """
+    rng = np.random.default_rng(seed)
+
+    data = {}
+    data["x"] = rng.uniform(-150.0, 150.0, size).astype(np.float32)
+    data["y"] = rng.uniform(-20.0, 80.0, size).astype(np.float32)
+    data["z"] = rng.uniform(0.0, 1.0, size).astype(np.float32)
+    data["min"] = (np.float32(-150.0), np.float32(-20.0), np.float32(0.0))
+    data["max"] = (np.float32(150.0), np.float32(80.0), np.float32(1.0))
+    data["indices"] = rng.integers(0, 30720, size)
+
+    quats = rng.normal(size=(size, 4)).astype(np.float32)
+    data["quats"] = (quats / np.linalg.norm(quats, axis=1, keepdims=True)).astype(np.float32)
+
+    return data
+
+def get_codec_cases(data):
+    """ Returns (name, encode, decode) triplets, encode and decode taking no argument """
+    min_xyz, max_xyz = data["min"], data["max"]
+    precision = 0.99
+
+    packed = {}
+    def encode(name, function, *args):
+        def run():
+            packed[name] = function(*args)
+            return packed[name]
+        return run
+
+    return [
+        ("float_11_10_10",
+            encode("float_11_10_10", codecs.pack_float_11_10_10, data["x"], data["y"], data["z"], min_xyz, max_xyz),
+            lambda: codecs.unpack_float_11_10_10(packed["float_11_10_10"], min_xyz, max_xyz)),
+        ("float_16_15",
+            encode("float_16_15", codecs.pack_float_16_15, data["x"], data["y"], min_xyz[:2], max_xyz[:2]),
+            lambda: codecs.unpack_float_16_15(packed["float_16_15"], min_xyz[:2], max_xyz[:2])),
+        ("float_frac",
+            encode("float_frac", codecs.pack_float_frac, data["x"], data["z"], min_xyz[2], max_xyz[2], precision),
+            lambda: codecs.unpack_float_frac(packed["float_frac"], min_xyz[2], max_xyz[2], precision)),
+        ("pivot_painter",
+            encode("pivot_painter", codecs.pack_pivot_painter_index, data["indices"]),
+            lambda: codecs.unpack_pivot_painter_index(packed["pivot_painter"].astype(np.float16))),
+        ("three_smallest",
+            encode("three_smallest", codecs.encode_three_smallest, data["quats"]),
+            lambda: codecs.decode_three_smallest(packed["three_smallest"])),
+    ]
+
+def get_reference_cases(data, count):
+    """ Returns (name, encode, decode) triplets running the scalar references over the first count elements """
+    min_xyz, max_xyz = data["min"], data["max"]
+    precision = 0.99
+    x, y, z = data["x"][:count], data["y"][:count], data["z"][:count]
+
+    def packed_11_10_10():
+        return [reference_pack_float_11_10_10(*xyz, min_xyz, max_xyz) for xyz in zip(x, y, z)]
+    def packed_16_15():
+        return [reference_pack_float_16_15(*xy, min_xyz[:2], max_xyz[:2]) for xy in zip(x, y)]
+    def packed_frac():
+        return [reference_pack_float_frac(*xy, min_xyz[2], max_xyz[2], precision) for xy in zip(x, z)]
+    def packed_pivot_painter():
+        return [reference_pack_pivot_painter_index(index) for index in data["indices"][:count]]
+    def packed_three_smallest():
+        return [reference_encode_three_smallest(quat) for quat in data["quats"][:count]]
+
+    return [
+        ("float_11_10_10", packed_11_10_10,
+            lambda packed: [reference_unpack_float_11_10_10(value, min_xyz, max_xyz) for value in packed]),
+        ("float_16_15", packed_16_15,
+            lambda packed: [reference_unpack_float_16_15(value, min_xyz[:2], max_xyz[:2]) for value in packed]),
+        ("float_frac", packed_frac,
+            lambda packed: [reference_unpack_float_frac(value, min_xyz[2], max_xyz[2], precision) for value in packed]),
+        ("pivot_painter", packed_pivot_painter,
+            lambda packed: [reference_unpack_pivot_painter_index(np.float32(np.float16(value))) for value in packed]),
+        ("three_smallest", packed_three_smallest,
+            lambda packed: [reference_decode_three_smallest(value) for value in packed]),
+    ]
+
+def get_bits(values):
+    """ Returns the bits of float32 values, or the values themselves for integers """
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        return np.ascontiguousarray(values, dtype=np.float32).view(np.uint32)
+
+    return values
+
+def check_codecs(data, count):
+    """ Compares the vectorized codecs with the scalar references over the first count elements, returns the mismatches """
+    vectorized = {}
+    for name, encode, decode in get_codec_cases(data):
+        vectorized[name] = (encode(), decode())
+
+    mismatches = []
+    for name, encode, decode in get_reference_cases(data, count):
+        packed = encode()
+        decoded = decode(packed)
+
+        if not np.array_equal(get_bits(packed), get_bits(vectorized[name][0][:count])):
+            mismatches.append((name, "encode"))
+
+        reference_decoded = np.asarray(decoded)
+        vectorized_decoded = vectorized[name][1]
+        if isinstance(vectorized_decoded, tuple):
+            vectorized_decoded = np.stack(vectorized_decoded, axis=-1)
+        if not np.array_equal(get_bits(reference_decoded), get_bits(vectorized_decoded[:count])):
+            mismatches.append((name, "decode"))
+
+    return mismatches
+
+def time_function(function, repeat):
+    """ Returns the best time out of repeat runs """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def benchmark_codecs(size = 4000000, repeat = 5, reference_size = 20000):
+    """ Returns (name, encode_seconds, decode_seconds, reference_encode_seconds, reference_decode_seconds) tuples """
+    data = get_test_data(size)
+
+    results = []
+    reference_cases = {name: (encode, decode) for name, encode, decode in get_reference_cases(data, reference_size)}
+    for name, encode, decode in get_codec_cases(data):
+        encode_time = time_function(encode, repeat)
+        decode_time = time_function(decode, repeat)
+
+        # per-texel loops are scaled to the full size, they're far too slow to run over millions of elements
+        reference_encode, reference_decode = reference_cases[name]
+        start = time.perf_counter()
+        packed = reference_encode()
+        reference_encode_time = (time.perf_counter() - start) * size / reference_size
+        start = time.perf_counter()
+        reference_decode(packed)
+        reference_decode_time = (time.perf_counter() - start) * size / reference_size
+
+        results.append((name, encode_time, decode_time, reference_encode_time, reference_decode_time))
+
+    return results
+
+def print_codec_results(results, size):
+    """ """
+    print("{:<16}{:>14}{:>14}{:>14}{:>14}{:>10}".format("codec", "encode ms", "decode ms", "Melem/s enc", "Melem/s dec", "speedup"))
+    for name, encode_time, decode_time, reference_encode_time, reference_decode_time in results:
+        speedup = (reference_encode_time + reference_decode_time) / (encode_time + decode_time)
+        print("{:<16}{:>14.2f}{:>14.2f}{:>14.1f}{:>14.1f}{:>9.0f}x".format(
+            name, encode_time * 1000.0, decode_time * 1000.0, size / encode_time / 1e6, size / decode_time / 1e6, speedup))
+
+##########
+# IMPORT #
+
+# Source/ folder of the repository, holding sample BlenderDataBaker exports
+SOURCE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "Source"))
+
+def benchmark_import(source_dir = SOURCE_DIR, repeat = 3, max_workers = None, normal_encoding = 0, decimation_tolerance = 0.0):
+    """ Runs import_baked_directory() over source_dir against the recording unreal stand-in
+
+    Returns the report of the fastest run: {"total", "imported", "failed", "phases", "descriptors", "calls"}, times in seconds.
+    """
+    import BlenderDataBakerMockUnreal as mock_unreal
+    mock = mock_unreal.install()
+
+    import BlenderDataBaker as importer
+    import BlenderDataBakerProfiler as profiler
+
+    best = None
+    for _ in range(repeat):
+        mock.reset()
+        importer.parent_materials_vat.clear()
+        profiler.enable_profiling()
+
+        start = time.perf_counter()
+        results = importer.import_baked_directory(source_dir, "/Game/Benchmark", max_workers=max_workers, force=True,
+                                                  normal_encoding=normal_encoding, decimation_tolerance=decimation_tolerance)
+        total = time.perf_counter() - start
+
+        profiler.disable_profiling()
+        if best is None or total < best["total"]:
+            best = profiler.profiler.get_report()
+            best["total"] = total
+            best["imported"] = sum(1 for _, success, _ in results if success)
+            best["failed"] = {Path(file_path).relative_to(source_dir).as_posix(): msg for file_path, success, msg in results if not success}
+            best["calls"] = mock.recorder.get_calls()
+            best["trace"] = profiler.profiler.get_chrome_trace()
+
+    # descriptors are reported relative to source_dir so reports of different machines compare
+    best["descriptors"] = {Path(descriptor).relative_to(source_dir).as_posix(): phases for descriptor, phases in best["descriptors"].items()}
+    return best
+
+def compare_import_results(results, baseline, tolerance):
+    """ Returns the regressions of results compared to a baseline report
+
+    Times may grow by tolerance (a ratio), call counts are deterministic and may not grow at all.
+    """
+    regressions = []
+    if results["total"] > baseline["total"] * (1.0 + tolerance):
+        regressions.append("total time {:.1f} ms > {:.1f} ms".format(results["total"] * 1000.0, baseline["total"] * 1000.0))
+
+    for name, count in sorted(results["calls"].items()):
+        baseline_count = baseline["calls"].get(name, 0)
+        if count > baseline_count:
+            regressions.append("{} called {} times > {}".format(name, count, baseline_count))
+
+    return regressions
+
+def print_import_results(results, max_descriptors = 20):
+    """ """
+    print("{:<24}{:>8}{:>14}{:>14}".format("phase", "count", "total ms", "max ms"))
+    for name, phase in sorted(results["phases"].items(), key=lambda item: -item[1]["total"]):
+        print("{:<24}{:>8}{:>14.2f}{:>14.2f}".format(name, phase["count"], phase["total"] * 1000.0, phase["max"] * 1000.0))
+
+    print("")
+    print("{:<64}{:>14}".format("slowest descriptors", "total ms"))
+    descriptor_totals = [(descriptor, sum(phase["total"] for phase in phases.values())) for descriptor, phases in results["descriptors"].items()]
+    for descriptor, total in sorted(descriptor_totals, key=lambda item: -item[1])[:max_descriptors]:
+        print("{:<64}{:>14.2f}".format(descriptor, total * 1000.0))
+
+    print("")
+    print("{:<64}{:>8}".format("unreal call", "count"))
+    for name, count in sorted(results["calls"].items(), key=lambda item: -item[1]):
+        print("{:<64}{:>8}".format(name, count))
+
+    # descriptors of types without importer are expected, only their count is shown
+    print("")
+    unsupported = {}
+    for descriptor, msg in sorted(results["failed"].items()):
+        if msg.startswith("Unsupported importer"):
+            unsupported[msg] = unsupported.get(msg, 0) + 1
+        else:
+            print("FAILED: {} ({})".format(descriptor, msg))
+    for msg, count in sorted(unsupported.items()):
+        print("SKIPPED: {} descriptors ({})".format(count, msg))
+
+    # post import settings should rebuild each mesh once
+    for descriptor, phases in sorted(results["descriptors"].items()):
+        builds = phases.get("mesh_build", {}).get("count", 0)
+        if builds > 1:
+            print("REBUILT: {} built {} times".format(descriptor, builds))
+    print("{} mesh builds after import".format(results["phases"].get("mesh_build", {}).get("count", 0)))
+    print("imported {} descriptors in {:.1f} ms, {} unreal calls".format(results["imported"], results["total"] * 1000.0, sum(results["calls"].values())))
+
+def benchmark_import_job(source_dir = SOURCE_DIR, tick_budget = 0.010, cancel_after = 0, frame_time = 1.0 / 60.0):
+    """ Runs an ImportJob over source_dir against the recording unreal stand-in, ticking it every frame_time seconds
+
+    Returns {"total", "ticks", "max_tick", "imported", "failed", "assets"}, times in seconds. The job is cancelled after
+    cancel_after ticks if given, assets are then the ones left behind.
+    """
+    import BlenderDataBakerMockUnreal as mock_unreal
+    mock = mock_unreal.install()
+
+    import BlenderDataBaker as importer
+    import BlenderDataBakerJob as import_job
+
+    mock.reset()
+    importer.parent_materials_vat.clear()
+
+    start = time.perf_counter()
+    job, msg = import_job.start_import_job(source_dir, "/Game/Benchmark", tick_budget, force=True)
+    if job is None:
+        raise RuntimeError(msg)
+
+    while job.state == "running":
+        mock.tick(frame_time)
+        if cancel_after and job.ticks >= cancel_after:
+            job.cancel()
+        time.sleep(frame_time)
+    total = time.perf_counter() - start
+
+    return {
+        "state": job.state,
+        "total": total,
+        "ticks": job.ticks,
+        "max_tick": job.max_tick_time,
+        "imported": sum(1 for _, success, _ in job.report if success),
+        "failed": {Path(file_path).relative_to(source_dir).as_posix(): msg for file_path, success, msg in job.report if not success},
+        "assets": sorted(mock.assets),
+    }
+
+def print_import_job_results(results, tick_budget):
+    """ """
+    for descriptor, msg in sorted(results["failed"].items()):
+        if not msg.startswith("Unsupported importer"):
+            print("FAILED: {} ({})".format(descriptor, msg))
+
+    print("job {} in {:.1f} ms over {} ticks, longest tick {:.1f} ms for a {:.1f} ms budget".format(
+        results["state"], results["total"] * 1000.0, results["ticks"], results["max_tick"] * 1000.0, tick_budget * 1000.0))
+    print("imported {} descriptors, {} assets in the project".format(results["imported"], len(results["assets"])))
+
+########
+# MAIN #
+
+def main(argv = None):
+    """ """
+    parser = argparse.ArgumentParser(description="BlenderDataBaker benchmarks")
+    subparsers = parser.add_subparsers(dest="suite", required=True)
+
+    codecs_parser = subparsers.add_parser("codecs", help="encode/decode throughput of the Doc/*.hlsl packing schemes")
+    codecs_parser.add_argument("--size", type=int, default=4000000, help="number of elements per array")
+    codecs_parser.add_argument("--repeat", type=int, default=5, help="runs per measure, the best one is kept")
+    codecs_parser.add_argument("--check", type=int, default=20000, help="number of elements compared with the scalar references")
+
+    import_parser = subparsers.add_parser("import", help="python side cost of importing every descriptor under Source/ against a recording unreal stand-in")
+    import_parser.add_argument("--source", default=SOURCE_DIR, help="directory holding the descriptors")
+    import_parser.add_argument("--repeat", type=int, default=3, help="runs, the fastest one is kept")
+    import_parser.add_argument("--max-workers", type=int, default=None, help="threads parsing and analyzing descriptors")
+    import_parser.add_argument("--normal-encoding", type=int, default=0, choices=(0, 8, 16), help="octahedral normal encoding bits")
+    import_parser.add_argument("--decimation", type=float, default=0.0, help="frame decimation tolerance, 0 disables it")
+    import_parser.add_argument("--json", help="writes the timings and call counts to this file")
+    import_parser.add_argument("--trace", help="writes a Chrome trace of the fastest run to this file")
+    import_parser.add_argument("--baseline", help="json written by a previous run, fails on regressions")
+    import_parser.add_argument("--tolerance", type=float, default=0.25, help="time regression allowed against the baseline, as a ratio")
+
+    job_parser = subparsers.add_parser("job", help="time-sliced import of every descriptor under Source/ against a recording unreal stand-in")
+    job_parser.add_argument("--source", default=SOURCE_DIR, help="directory holding the descriptors")
+    job_parser.add_argument("--tick-budget", type=float, default=10.0, help="ms of import steps per tick")
+    job_parser.add_argument("--cancel-after", type=int, default=0, help="cancels the job after this many ticks, 0 lets it finish")
+
+    args = parser.parse_args(argv)
+
+    if args.suite == "codecs":
+        mismatches = check_codecs(get_test_data(args.check), args.check)
+        for name, step in mismatches:
+            print("MISMATCH: {} {} differs from the HLSL reference".format(name, step))
+
+        print_codec_results(benchmark_codecs(args.size, args.repeat, args.check), args.size)
+        return 1 if mismatches else 0
+
+    if args.suite == "import":
+        results = benchmark_import(os.path.abspath(args.source), args.repeat, args.max_workers, args.normal_encoding, args.decimation)
+        trace = results.pop("trace")
+        print_import_results(results)
+
+        if args.trace:
+            with open(args.trace, "w") as file:
+                json.dump(trace, file)
+
+        if args.json:
+            with open(args.json, "w") as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+
+        if args.baseline:
+            with open(args.baseline, "r") as file:
+                regressions = compare_import_results(results, json.load(file), args.tolerance)
+            for regression in regressions:
+                print("REGRESSION: " + regression)
+            return 1 if regressions else 0
+
+    if args.suite == "job":
+        results = benchmark_import_job(os.path.abspath(args.source), args.tick_budget / 1000.0, args.cancel_after)
+        print_import_job_results(results, args.tick_budget / 1000.0)
+        return 0 if results["state"] in ("finished", "cancelled") else 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
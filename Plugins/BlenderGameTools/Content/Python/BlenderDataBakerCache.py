@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import time
+
+def get_file_hash(file_path, chunk_size = 1 << 20):
+    """ """
+    file_hash = hashlib.sha1()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+def get_file_fingerprint(file_path, previous = None):
+    """ Returns a {size, mtime, hash} dict, reusing the previous hash if size and mtime didn't change """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime") == stat.st_mtime:
+        file_hash = previous.get("hash")
+    else:
+        file_hash = get_file_hash(file_path)
+
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "hash": file_hash}
+
+def get_baked_data_fingerprints(file_paths, entry = None):
+    """ """
+    previous_fingerprints = entry.get("files", {}) if entry else {}
+
+    fingerprints = {}
+    for file_path in file_paths:
+        fingerprints[file_path] = get_file_fingerprint(file_path, previous_fingerprints.get(file_path))
+
+    return fingerprints
+
+def load_import_manifest(manifest_path, importer_version):
+    """ Returns the manifest entries keyed by BakedData ID, empty if missing or written by another importer version """
+    if not os.path.exists(manifest_path):
+        return {}
+
+    try:
+        with open(manifest_path, "r") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    if manifest.get("version") != importer_version:
+        return {}
+
+    return manifest.get("entries", {})
+
+def save_import_manifest(manifest_path, importer_version, entries):
+    """ """
+    manifest_dir = os.path.dirname(manifest_path)
+    if manifest_dir and not os.path.isdir(manifest_dir):
+        os.makedirs(manifest_dir)
+
+    # write next to the manifest first so an interrupted save doesn't corrupt it
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, "w") as file:
+        json.dump({"version": importer_version, "entries": entries}, file, indent=1, sort_keys=True)
+
+    os.replace(temp_path, manifest_path)
+
+def merge_import_manifest(manifest_path, importer_version, entries, timeout = 60.0):
+    """ Adds entries to the manifest, several processes can merge into the same manifest
+
+    Returns False if the manifest stayed locked for timeout seconds.
+    """
+    lock_path = manifest_path + ".lock"
+    manifest_dir = os.path.dirname(manifest_path)
+    if manifest_dir and not os.path.isdir(manifest_dir):
+        os.makedirs(manifest_dir)
+
+    start = time.monotonic()
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            if time.monotonic() - start > timeout:
+                return False
+            time.sleep(0.05)
+
+    try:
+        manifest = load_import_manifest(manifest_path, importer_version)
+        manifest.update(entries)
+        save_import_manifest(manifest_path, importer_version, manifest)
+    finally:
+        os.remove(lock_path)
+
+    return True
+
+def clear_import_manifest(manifest_path):
+    """ """
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+def is_baked_data_up_to_date(entry, fingerprints, destination, options):
+    """ """
+    if not entry:
+        return False
+
+    if entry.get("destination") != destination or entry.get("options") != options:
+        return False
+
+    previous_fingerprints = entry.get("files", {})
+    if set(previous_fingerprints) != set(fingerprints):
+        return False
+
+    for file_path, fingerprint in fingerprints.items():
+        previous_fingerprint = previous_fingerprints[file_path]
+        if fingerprint is None or previous_fingerprint is None:
+            return False
+        if fingerprint["size"] != previous_fingerprint["size"] or fingerprint["hash"] != previous_fingerprint["hash"]:
+            return False
+
+    return True
+
+def create_manifest_entry(fingerprints, destination, options, asset_paths = ()):
+    """ asset_paths are the assets the import created, the entry is stale if any of them is deleted """
+    return {"files": fingerprints, "destination": destination, "options": options, "assets": sorted(set(asset_paths))}
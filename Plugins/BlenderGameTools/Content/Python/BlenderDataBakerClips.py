@@ -0,0 +1,401 @@
+import os
+import json
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import BlenderDataBakerTextures as baked_data_textures
+
+# frame layouts where every frame spans a fixed number of whole rows
+STACKED_SAMPLINGS = ("STACK_SINGLE", "STACK_MULT")
+
+def get_num_frames(baked_data):
+    """ Returns the number of frames stored in the textures, padding included """
+    frames = baked_data.frames
+    if frames is None:
+        return 0
+
+    return frames.padded if frames.padded > 0 else frames.count
+
+def get_rows_per_frame(baked_data, texture_height):
+    """ Returns the number of texture rows each frame spans, 0 if frames don't map to whole rows """
+    num_frames = get_num_frames(baked_data)
+    if num_frames <= 0 or baked_data.frames.sampling not in STACKED_SAMPLINGS:
+        return 0
+
+    if texture_height % num_frames != 0:
+        return 0
+
+    return texture_height // num_frames
+
+def get_animation_frame_range(baked_data, animation):
+    """ Returns the (start, end) frames of an animation clamped to the textures, end included, None if it's outside of them """
+    start_frame = max(0, animation.start_frame)
+    end_frame = min(get_num_frames(baked_data) - 1, animation.end_frame)
+    if start_frame > end_frame:
+        return None
+
+    return (start_frame, end_frame)
+
+def get_clip_frame_ranges(baked_data):
+    """ Returns the (start, end) frames of every clip, end included, the whole texture being one clip if none is described """
+    num_frames = get_num_frames(baked_data)
+    ranges = []
+    for animation in baked_data.animations:
+        frame_range = get_animation_frame_range(baked_data, animation)
+        if frame_range is not None:
+            ranges.append(frame_range)
+
+    if not ranges:
+        ranges.append((0, num_frames - 1))
+
+    return ranges
+
+def get_generated_texture_path(offset_texture, output_dir, texture_type):
+    """ Path of a texture generated from the offset texture, named like the baked ones (e.g. T_BakedMesh.VAT_FrameRemap.exr) """
+    # descriptors baked on Windows keep their separators
+    stem = os.path.splitext(os.path.basename(offset_texture.path.replace("\\", "/")))[0]
+    return os.path.join(output_dir, stem.rsplit("_", 1)[0] + "_" + texture_type + ".exr")
+
+##############
+# DECIMATION #
+
+def get_interpolation_errors(frames, start_frame, end_frame):
+    """ Returns the max error per in-between frame when linearly interpolating frames[start_frame] to frames[end_frame]
+
+    frames is a (frames, vertices, components) array, the error is the euclidean distance per vertex.
+    """
+    weights = (np.arange(start_frame + 1, end_frame, dtype=np.float32) - start_frame) / np.float32(end_frame - start_frame)
+    interpolated = frames[start_frame] + (frames[end_frame] - frames[start_frame]) * weights[:, None, None]
+    distances = np.sqrt(np.sum((interpolated - frames[start_frame + 1:end_frame]) ** 2, axis=-1))
+    return np.max(distances, axis=1)
+
+def get_normal_interpolation_errors(normals, start_frame, end_frame):
+    """ Returns the max angle in degrees per in-between frame when interpolating unit normals """
+    weights = (np.arange(start_frame + 1, end_frame, dtype=np.float32) - start_frame) / np.float32(end_frame - start_frame)
+    interpolated = normals[start_frame] + (normals[end_frame] - normals[start_frame]) * weights[:, None, None]
+    length = np.sqrt(np.sum(interpolated * interpolated, axis=-1))
+    dot = np.sum(interpolated * normals[start_frame + 1:end_frame], axis=-1) / np.maximum(length, np.float32(1e-8))
+    return np.degrees(np.arccos(np.clip(np.min(dot, axis=1), -1.0, 1.0)))
+
+def is_interpolated(offsets, normals, start_frame, end_frame, tolerance, normal_tolerance):
+    """ """
+    if end_frame - start_frame < 2:
+        return True
+
+    if np.max(get_interpolation_errors(offsets, start_frame, end_frame)) > tolerance:
+        return False
+
+    if normals is not None and np.max(get_normal_interpolation_errors(normals, start_frame, end_frame)) > normal_tolerance:
+        return False
+
+    return True
+
+def decimate_clip(offsets, normals, start_frame, end_frame, tolerance, normal_tolerance):
+    """ Returns the frames of a clip to keep, greedily extending each interpolated span as far as the tolerances allow """
+    kept = [start_frame]
+    frame = start_frame
+    while frame < end_frame:
+        next_frame = frame + 1
+        while next_frame < end_frame and is_interpolated(offsets, normals, frame, next_frame + 1, tolerance, normal_tolerance):
+            next_frame += 1
+
+        kept.append(next_frame)
+        frame = next_frame
+
+    return kept
+
+def get_frame_remap(num_frames, kept_frames):
+    """ Returns a (num_frames, 3) float32 array of (row A, row B, alpha) sampling each original frame from the kept ones """
+    kept_frames = np.array(sorted(kept_frames))
+
+    frames = np.arange(num_frames)
+    next_index = np.clip(np.searchsorted(kept_frames, frames), 0, len(kept_frames) - 1)
+    previous_index = np.where(kept_frames[next_index] == frames, next_index, np.maximum(next_index - 1, 0))
+
+    previous_frames = kept_frames[previous_index]
+    next_frames = kept_frames[next_index]
+    span = np.maximum(next_frames - previous_frames, 1)
+    alpha = np.where(next_frames == previous_frames, 0.0, (frames - previous_frames) / span)
+
+    return np.stack((previous_index, next_index, alpha), axis=-1).astype(np.float32)
+
+class FrameDecimation:
+    """ Result of decimate_vat_textures(), paths are keyed by texture type """
+    __slots__ = ("paths", "frame_remap_path", "kept_frames", "num_frames", "rows_per_frame", "max_error", "max_normal_error", "msg")
+
+    def __init__(self, msg = ""):
+        self.paths = {}
+        self.frame_remap_path = None
+        self.kept_frames = []
+        self.num_frames = 0
+        self.rows_per_frame = 0
+        self.max_error = 0.0
+        self.max_normal_error = 0.0
+        self.msg = msg
+
+def get_frame_values(values, num_frames, rows_per_frame):
+    """ Reshapes (height, width, components) texels into (frames, texels per frame, components) """
+    height, width, components = values.shape
+    return values.reshape(num_frames, rows_per_frame * width, components)
+
+def decimate_vat_textures(baked_data, output_dir, tolerance, normal_tolerance, offset_scale = 1.0):
+    """ Drops the frames of every clip that linear interpolation reproduces within tolerance
+
+    tolerance is a distance in world units (offsets being multiplied by offset_scale), normal_tolerance an angle in degrees.
+    Writes the decimated Offset/Normal textures and a frame remap lookup in output_dir.
+    """
+    offset_texture = baked_data.get_texture("Offset")
+    if offset_texture is None or not offset_texture.path:
+        return FrameDecimation("no offset texture")
+
+    offset_channels, msg = baked_data_textures.read_texture_channels(offset_texture)
+    if offset_channels is None or len(offset_channels) < 3:
+        return FrameDecimation(msg if msg else "offset texture has less than 3 channels")
+
+    height = offset_channels[0][1].shape[0]
+    rows_per_frame = get_rows_per_frame(baked_data, height)
+    if not rows_per_frame:
+        return FrameDecimation("frames don't map to whole rows")
+
+    num_frames = get_num_frames(baked_data)
+
+    # offsets in world units, remapped ones are brought back to their range first
+    remaps = baked_data_textures.get_channel_remaps(offset_texture, [channel_name for channel_name, _ in offset_channels[:3]])
+    if remaps is None:
+        return FrameDecimation("remapped offsets without a valid range")
+
+    # range offsets don't change interpolation errors
+    scales = np.abs(remaps[0])
+
+    offsets = np.stack([channel_values for _, channel_values in offset_channels[:3]], axis=-1) * (scales * abs(offset_scale)).astype(np.float32)
+    offsets = get_frame_values(offsets, num_frames, rows_per_frame)
+
+    normal_texture = baked_data.get_texture("Normal")
+    normal_channels = None
+    normals = None
+    if normal_texture is not None and normal_texture.path:
+        normal_channels, msg = baked_data_textures.read_texture_channels(normal_texture)
+        if normal_channels is None or normal_channels[0][1].shape[0] != height:
+            return FrameDecimation("normal texture doesn't match the offset texture")
+
+        normals = np.stack([channel_values for _, channel_values in normal_channels[:3]], axis=-1)
+        if normal_texture.remapped:
+            normals = normals * np.float32(2.0) - np.float32(1.0)
+        normals = get_frame_values(baked_data_textures.baked_data_codecs.normalize(normals), num_frames, rows_per_frame)
+
+    # frames outside of clips (padding) are kept as-is, overlapping clips keep every frame one of them needs
+    clip_ranges = get_clip_frame_ranges(baked_data)
+    kept_frames = set(range(num_frames))
+    for start_frame, end_frame in clip_ranges:
+        kept_frames -= set(range(start_frame, end_frame + 1))
+    for start_frame, end_frame in clip_ranges:
+        kept_frames |= set(decimate_clip(offsets, normals, start_frame, end_frame, tolerance, normal_tolerance))
+
+    # @NOTE the frames a clip keeps split the spans of the clips it overlaps, spans are checked again once merged
+    merged_frames = sorted(kept_frames)
+    for frame, next_frame in zip(merged_frames[:-1], merged_frames[1:]):
+        if not is_interpolated(offsets, normals, frame, next_frame, tolerance, normal_tolerance):
+            kept_frames |= set(decimate_clip(offsets, normals, frame, next_frame, tolerance, normal_tolerance))
+
+    decimation = FrameDecimation()
+    decimation.kept_frames = sorted(kept_frames)
+    for frame, next_frame in zip(decimation.kept_frames[:-1], decimation.kept_frames[1:]):
+        if next_frame - frame >= 2:
+            decimation.max_error = max(decimation.max_error, float(np.max(get_interpolation_errors(offsets, frame, next_frame))))
+            if normals is not None:
+                decimation.max_normal_error = max(decimation.max_normal_error, float(np.max(get_normal_interpolation_errors(normals, frame, next_frame))))
+
+    decimation.num_frames = num_frames
+    decimation.rows_per_frame = rows_per_frame
+    if len(decimation.kept_frames) == num_frames:
+        decimation.msg = "no frame can be interpolated"
+        return decimation
+
+    ##########
+    # OUTPUT #
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    kept_rows = (np.array(decimation.kept_frames)[:, None] * rows_per_frame + np.arange(rows_per_frame)).reshape(-1)
+
+    # same file names so the imported assets keep their names
+    for texture, channels in ((offset_texture, offset_channels), (normal_texture, normal_channels)):
+        if channels is None:
+            continue
+
+        path = os.path.join(output_dir, os.path.splitext(os.path.basename(texture.path))[0] + ".exr")
+        baked_data_textures.write_exr(path, {channel_name: channel_values[kept_rows] for channel_name, channel_values in channels})
+        decimation.paths[texture.type] = path
+
+    frame_remap = get_frame_remap(num_frames, decimation.kept_frames)
+    decimation.frame_remap_path = get_generated_texture_path(offset_texture, output_dir, "FrameRemap")
+    baked_data_textures.write_exr(decimation.frame_remap_path, {channel_name: frame_remap[None, :, index] for index, channel_name in enumerate(("R", "G", "B"))})
+
+    return decimation
+
+##########
+# BOUNDS #
+
+class OffsetBounds:
+    """ Extremes of the offsets of a clip, in engine units, extensions are relative to the rest pose bounds """
+    __slots__ = ("name", "start_frame", "end_frame", "negative", "positive", "max_displacement")
+
+    def __init__(self, name, start_frame, end_frame, negative = (0.0, 0.0, 0.0), positive = (0.0, 0.0, 0.0), max_displacement = 0.0):
+        self.name = name
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.negative = tuple(negative)
+        self.positive = tuple(positive)
+        self.max_displacement = max_displacement
+
+    def to_dict(self):
+        """ """
+        return {"name": self.name, "start_frame": self.start_frame, "end_frame": self.end_frame,
+                "negative": list(self.negative), "positive": list(self.positive), "max_displacement": self.max_displacement}
+
+    @staticmethod
+    def from_dict(data):
+        """ """
+        return OffsetBounds(data["name"], data["start_frame"], data["end_frame"], data["negative"], data["positive"], data["max_displacement"])
+
+def get_offset_values(offset_texture, offset_channels):
+    """ Returns the (height, width, 3) offsets in the descriptor's units, None if remapped without a valid range """
+    offsets = np.stack([channel_values for _, channel_values in offset_channels[:3]], axis=-1)
+    if not offset_texture.remapped:
+        return offsets
+
+    if offset_texture.range is None:
+        return None
+
+    range_offset = offset_texture.range_offset if offset_texture.range_offset is not None else (0.0, 0.0, 0.0)
+    return offsets * np.array(offset_texture.range, dtype=np.float32) + np.array(range_offset, dtype=np.float32)
+
+def get_offset_bounds(offsets, name, start_frame, end_frame, limit = None):
+    """ Returns the OffsetBounds of (..., 3) engine space offsets
+
+    A vertex can't get further from the rest pose bounds than its offset, the extensions are clamped to limit, a (negative, positive) pair known to be valid (e.g. the descriptor's).
+    """
+    offsets = offsets.reshape(-1, 3)
+    negative = np.maximum(-np.min(offsets, axis=0), 0.0)
+    positive = np.maximum(np.max(offsets, axis=0), 0.0)
+    if limit is not None:
+        negative = np.minimum(negative, limit[0])
+        positive = np.minimum(positive, limit[1])
+
+    return OffsetBounds(name, start_frame, end_frame, negative.tolist(), positive.tolist(), float(np.max(np.abs(offsets))))
+
+def get_clip_bounds(baked_data, axis_scales = (1.0, 1.0, 1.0), limit = None):
+    """ Scans the offset texture for the bounds of the whole bake and of every clip
+
+    axis_scales converts offsets to engine space (as the material does), limit is passed to get_offset_bounds().
+    Returns (bounds, clip_bounds, msg), clip_bounds follows baked_data.animations and is empty if frames don't map to whole rows.
+    """
+    offset_texture = baked_data.get_texture("Offset")
+    if offset_texture is None or not offset_texture.path:
+        return (None, [], "no offset texture")
+
+    offset_channels, msg = baked_data_textures.read_texture_channels(offset_texture)
+    if offset_channels is None or len(offset_channels) < 3:
+        return (None, [], msg if msg else "offset texture has less than 3 channels")
+
+    offsets = get_offset_values(offset_texture, offset_channels)
+    if offsets is None:
+        return (None, [], "remapped offsets without a valid range")
+
+    offsets = offsets * np.array(axis_scales, dtype=np.float32)
+
+    num_frames = get_num_frames(baked_data)
+    bounds = get_offset_bounds(offsets, "", 0, max(num_frames - 1, 0), limit)
+
+    rows_per_frame = get_rows_per_frame(baked_data, offsets.shape[0])
+    if not rows_per_frame:
+        return (bounds, [], "frames don't map to whole rows")
+
+    frames = get_frame_values(offsets, num_frames, rows_per_frame)
+
+    if not baked_data.animations:
+        return (bounds, [get_offset_bounds(frames, "", 0, num_frames - 1, limit)], "")
+
+    # a clip per animation so indices match the clip table, empty bounds for clips outside of the textures
+    clip_bounds = []
+    for animation in baked_data.animations:
+        frame_range = get_animation_frame_range(baked_data, animation)
+        if frame_range is None:
+            clip_bounds.append(OffsetBounds(animation.name, animation.start_frame, animation.end_frame))
+        else:
+            clip_bounds.append(get_offset_bounds(frames[frame_range[0]:frame_range[1] + 1], animation.name, frame_range[0], frame_range[1], limit))
+
+    return (bounds, clip_bounds, "")
+
+def write_clip_bounds(file_path, bounds, clip_bounds):
+    """ Writes the clip bounds as a lookup texture and the whole bounds with them in a json file next to it
+
+    Texel (clip, 0) is the negative extension, texel (clip, 1) the positive one, alpha being the max displacement.
+    """
+    values = {channel_name: np.zeros((2, len(clip_bounds)), dtype=np.float32) for channel_name in ("R", "G", "B", "A")}
+    for index, clip in enumerate(clip_bounds):
+        for row, extension in enumerate((clip.negative, clip.positive)):
+            for channel_name, value in zip(("R", "G", "B"), extension):
+                values[channel_name][row, index] = value
+            values["A"][row, index] = clip.max_displacement
+
+    output_dir = os.path.dirname(file_path)
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    baked_data_textures.write_exr(file_path, values)
+
+    with open(get_clip_bounds_json_path(file_path), "w") as file:
+        json.dump({"bounds": bounds.to_dict(), "clips": [clip.to_dict() for clip in clip_bounds]}, file, indent=2)
+
+def get_clip_bounds_json_path(file_path):
+    """ """
+    return os.path.splitext(file_path)[0] + ".json"
+
+def load_clip_bounds(file_path):
+    """ Returns the (bounds, clip_bounds) written by write_clip_bounds(), (None, []) if they can't be read """
+    try:
+        with open(get_clip_bounds_json_path(file_path), "r") as file:
+            data = json.load(file)
+        return (OffsetBounds.from_dict(data["bounds"]), [OffsetBounds.from_dict(clip) for clip in data["clips"]])
+    except (OSError, ValueError, KeyError):
+        return (None, [])
+
+##############
+# CLIP TABLE #
+
+def get_clip_table(baked_data):
+    """ Returns (names, values), values being the (start frame, end frame, frame count, frame rate) of every animation as a (1, clips, 4) float32 array
+
+    Clips are indexed in the descriptor's order, a clip outside of the textures has no frame.
+    """
+    rate = baked_data.frames.rate if baked_data.frames is not None else 0.0
+
+    names = []
+    values = np.zeros((1, len(baked_data.animations), 4), dtype=np.float32)
+    for index, animation in enumerate(baked_data.animations):
+        names.append(animation.name)
+
+        frame_range = get_animation_frame_range(baked_data, animation)
+        if frame_range is not None:
+            values[0, index] = (frame_range[0], frame_range[1], frame_range[1] - frame_range[0] + 1, rate)
+
+    return (names, values)
+
+def write_clip_table(file_path, baked_data):
+    """ Writes the clip table lookup texture, returns the clip names by index or None if the descriptor has no animation """
+    if not baked_data.animations or baked_data.frames is None:
+        return None
+
+    names, values = get_clip_table(baked_data)
+
+    output_dir = os.path.dirname(file_path)
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    baked_data_textures.write_exr(file_path, {channel_name: values[:, :, index] for index, channel_name in enumerate(("R", "G", "B", "A"))})
+    return names
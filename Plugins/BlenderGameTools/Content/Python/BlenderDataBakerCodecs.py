@@ -0,0 +1,293 @@
+""" Vectorized encode/decode of the packing schemes documented in Doc/*.hlsl
+
+Every function works on whole arrays (e.g. an EXR channel) and follows the HLSL step by step using
+IEEE float32 arithmetic, so results match the shaders bit for bit. Packed values are returned as
+float32 arrays holding the packed bits, as stored in the textures.
+
+three_smallest doesn't prevent NaN bit patterns, keep packed values in numpy arrays as converting
+them to python floats may alter their bits.
+"""
+import numpy as np
+
+def as_packed_uint(packed):
+    """ Reinterprets packed float32 values as uint32, the equivalent of asuint() """
+    packed = np.asarray(packed)
+    if packed.dtype == np.uint32:
+        return packed
+
+    return np.ascontiguousarray(packed, dtype=np.float32).view(np.uint32)
+
+def as_packed_float(packed):
+    """ Reinterprets packed uint32 values as float32, the equivalent of asfloat() """
+    return np.ascontiguousarray(packed, dtype=np.uint32).view(np.float32)
+
+def remap_to_unit(value, range_min, range_max):
+    """ saturate((value - min) / (max - min)) """
+    value = np.asarray(value, dtype=np.float32)
+    range_min = np.float32(range_min)
+    range_max = np.float32(range_max)
+    return np.clip((value - range_min) / (range_max - range_min), np.float32(0.0), np.float32(1.0))
+
+def remap_from_unit(value, range_min, range_max):
+    """ value * (max - min) + min, in that order """
+    range_min = np.float32(range_min)
+    range_max = np.float32(range_max)
+    return value * (range_max - range_min) + range_min
+
+def quantize(value, bits):
+    """ floor(value * ((1 << bits) - 1)) """
+    return np.floor(value * np.float32((1 << bits) - 1)).astype(np.uint32)
+
+def dequantize(value, bits):
+    """ value / float((1 << bits) - 1) """
+    return value.astype(np.float32) / np.float32((1 << bits) - 1)
+
+##################
+# FLOAT 11 10 10 #
+
+def pack_float_11_10_10(x, y, z, min_xyz, max_xyz):
+    """ Packs three floats in one using 11, 10 and 10 bits, see Doc/float_11_10_10_pack.hlsl """
+    packed_x = quantize(remap_to_unit(x, min_xyz[0], max_xyz[0]), 11)
+    packed_y = quantize(remap_to_unit(y, min_xyz[1], max_xyz[1]), 10)
+    packed_z = quantize(remap_to_unit(z, min_xyz[2], max_xyz[2]), 10)
+
+    # split X around the 0 bit preventing NaNs: aaaaaaaa0bbb
+    packed_x = ((packed_x >> np.uint32(3)) << np.uint32(4)) | (packed_x & np.uint32(0x7))
+
+    return as_packed_float((packed_x << np.uint32(20)) | (packed_y << np.uint32(10)) | packed_z)
+
+def unpack_float_11_10_10(packed, min_xyz, max_xyz):
+    """ Returns (x, y, z), see Doc/float_11_10_10_unpack.hlsl """
+    packed_int = as_packed_uint(packed)
+
+    packed_x = packed_int >> np.uint32(20)
+    packed_x = ((packed_x >> np.uint32(4)) << np.uint32(3)) | (packed_x & np.uint32(0x7))
+    packed_y = (packed_int >> np.uint32(10)) & np.uint32(0x3ff)
+    packed_z = packed_int & np.uint32(0x3ff)
+
+    x = remap_from_unit(dequantize(packed_x, 11), min_xyz[0], max_xyz[0])
+    y = remap_from_unit(dequantize(packed_y, 10), min_xyz[1], max_xyz[1])
+    z = remap_from_unit(dequantize(packed_z, 10), min_xyz[2], max_xyz[2])
+    return (x, y, z)
+
+###############
+# FLOAT 16 15 #
+
+def pack_uint_16_15(packed_x, packed_y):
+    """ Packs already quantized 16 and 15 bit integers with the float_16_15 layout """
+    packed_x = np.asarray(packed_x, dtype=np.uint32)
+    packed_y = np.asarray(packed_y, dtype=np.uint32)
+
+    # split X around the 0 bit preventing NaNs: aaaaaaaa0bbbbbbbb
+    packed_x = ((packed_x >> np.uint32(8)) << np.uint32(9)) | (packed_x & np.uint32(0xff))
+
+    return as_packed_float((packed_x << np.uint32(15)) | packed_y)
+
+def unpack_uint_16_15(packed):
+    """ Returns the (x, y) 16 and 15 bit integers of float_16_15 packed values """
+    packed_int = as_packed_uint(packed)
+
+    packed_x = packed_int >> np.uint32(15)
+    packed_x = ((packed_x >> np.uint32(9)) << np.uint32(8)) | (packed_x & np.uint32(0xff))
+    packed_y = packed_int & np.uint32(0x7fff)
+
+    return (packed_x, packed_y)
+
+def pack_float_16_15(x, y, min_xy, max_xy):
+    """ Packs two floats in one using 16 and 15 bits, see Doc/float_16_15_pack.hlsl """
+    packed_x = quantize(remap_to_unit(x, min_xy[0], max_xy[0]), 16)
+    packed_y = quantize(remap_to_unit(y, min_xy[1], max_xy[1]), 15)
+
+    return pack_uint_16_15(packed_x, packed_y)
+
+def unpack_float_16_15(packed, min_xy, max_xy):
+    """ Returns (x, y), see Doc/float_16_15_unpack.hlsl """
+    packed_x, packed_y = unpack_uint_16_15(packed)
+
+    x = remap_from_unit(dequantize(packed_x, 16), min_xy[0], max_xy[0])
+    y = remap_from_unit(dequantize(packed_y, 15), min_xy[1], max_xy[1])
+    return (x, y)
+
+##############
+# FLOAT FRAC #
+
+def get_frac_precision(precision):
+    """ min(0.999, max(0.001, precision)) """
+    return np.float32(min(0.999, max(0.001, precision)))
+
+def pack_float_frac(x, y, min_y, max_y, precision):
+    """ Stores floor(x) in the integer part and remapped y in the fractional part, see Doc/float_frac_pack.hlsl """
+    y_remapped = (np.asarray(y, dtype=np.float32) - np.float32(min_y)) / (np.float32(max_y) - np.float32(min_y))
+    y_remapped *= get_frac_precision(precision)
+
+    return np.floor(np.asarray(x, dtype=np.float32)) + y_remapped
+
+def unpack_float_frac(packed, min_y, max_y, precision):
+    """ Returns (x, y), see Doc/float_frac_unpack.hlsl """
+    packed = np.asarray(packed, dtype=np.float32)
+    x = np.floor(packed)
+    inv_precision = np.float32(1.0) / get_frac_precision(precision)
+    y = ((packed - x) * inv_precision * (np.float32(max_y) - np.float32(min_y))) + np.float32(min_y)
+    return (x, y)
+
+#################
+# PIVOT PAINTER #
+
+def pack_pivot_painter_index(indices):
+    """ Packs integer indices so they survive the float32 > float16 > float32 round trip, see Doc/pivot_painter_pack.hlsl """
+    index = np.asarray(indices).astype(np.uint32) + np.uint32(1024)
+
+    sign = (index & np.uint32(0x8000)) << np.uint32(16)
+
+    exponent = ((index >> np.uint32(10)) & np.uint32(0x1f)) - np.uint32(15) + np.uint32(127)
+    exponent = np.where((index & np.uint32(0x7fff)) == 0, np.uint32(0), exponent << np.uint32(23))
+
+    mantissa = (index & np.uint32(0x3ff)) << np.uint32(13)
+
+    return as_packed_float(sign | exponent | mantissa)
+
+def unpack_pivot_painter_index(packed):
+    """ Returns the integer indices, accepts float16 or float32 values, see Doc/pivot_painter_unpack.hlsl """
+    packed = np.asarray(packed)
+    if packed.dtype == np.float16:
+        packed = packed.astype(np.float32)
+
+    packed_int = as_packed_uint(packed)
+
+    # @NOTE the HLSL overwrites the shifted sign with a second assignment, this is the intended (bits >> 16) & 0x8000
+    sign = (packed_int >> np.uint32(16)) & np.uint32(0x8000)
+
+    exponent = (packed_int >> np.uint32(23)) & np.uint32(0xff)
+    exponent = np.where(exponent == 0, np.uint32(0), (exponent - np.uint32(127 - 15)) << np.uint32(10))
+
+    mantissa = (packed_int >> np.uint32(13)) & np.uint32(0x3ff)
+
+    return (sign | exponent | mantissa).astype(np.int32) - np.int32(1024)
+
+##################
+# THREE SMALLEST #
+
+THREE_SMALLEST_SCALE = np.float32(0.707106781)
+THREE_SMALLEST_BITS = 10
+THREE_SMALLEST_MASK = (1 << THREE_SMALLEST_BITS) - 1
+
+# components kept for each index of the largest component (x, y, z, w)
+THREE_SMALLEST_KEPT = np.array([[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]])
+
+# decoded xyz + reconstructed w swizzles for each index of the largest component (wxyz, xwyz, xywz, xyzw)
+THREE_SMALLEST_ORDER = np.array([[3, 0, 1, 2], [0, 3, 1, 2], [0, 1, 3, 2], [0, 1, 2, 3]])
+
+def encode_three_smallest(quats):
+    """ Encodes (..., 4) xyzw quaternions in 32 bits each, see Doc/three_smallest_encode.hlsl """
+    quats = np.asarray(quats, dtype=np.float32)
+    shape = quats.shape[:-1]
+    quats = quats.reshape(-1, 4)
+
+    # argmax returns the first of equal components, like the strict comparison of the shader loop
+    max_index = np.argmax(np.abs(quats), axis=1)
+    max_sign = np.where(quats[np.arange(len(quats)), max_index] < 0.0, np.float32(-1.0), np.float32(1.0))
+    quats = quats * max_sign[:, None]
+
+    three_smallest = np.take_along_axis(quats, THREE_SMALLEST_KEPT[max_index], axis=1)
+    three_smallest = (three_smallest + THREE_SMALLEST_SCALE) / (THREE_SMALLEST_SCALE + THREE_SMALLEST_SCALE)
+
+    encoded = three_smallest * np.float32(THREE_SMALLEST_MASK)
+    encoded = encoded.astype(np.uint32)
+
+    packed = max_index.astype(np.uint32) << np.uint32(30)
+    packed |= encoded[:, 0] << np.uint32(THREE_SMALLEST_BITS * 2)
+    packed |= encoded[:, 1] << np.uint32(THREE_SMALLEST_BITS * 1)
+    packed |= encoded[:, 2]
+
+    return as_packed_float(packed).reshape(shape)
+
+def decode_three_smallest(packed):
+    """ Returns (..., 4) xyzw quaternions, see Doc/three_smallest_decode.hlsl """
+    packed_int = as_packed_uint(packed)
+    shape = packed_int.shape
+    packed_int = packed_int.reshape(-1)
+
+    max_index = packed_int >> np.uint32(30)
+
+    mask = np.uint32(THREE_SMALLEST_MASK)
+    x = ((packed_int >> np.uint32(THREE_SMALLEST_BITS * 2)) & mask).astype(np.float32)
+    y = ((packed_int >> np.uint32(THREE_SMALLEST_BITS * 1)) & mask).astype(np.float32)
+    z = (packed_int & mask).astype(np.float32)
+
+    x = (x / np.float32(THREE_SMALLEST_MASK)) * (THREE_SMALLEST_SCALE + THREE_SMALLEST_SCALE) - THREE_SMALLEST_SCALE
+    y = (y / np.float32(THREE_SMALLEST_MASK)) * (THREE_SMALLEST_SCALE + THREE_SMALLEST_SCALE) - THREE_SMALLEST_SCALE
+    z = (z / np.float32(THREE_SMALLEST_MASK)) * (THREE_SMALLEST_SCALE + THREE_SMALLEST_SCALE) - THREE_SMALLEST_SCALE
+
+    w = np.sqrt(np.maximum(np.float32(0.0), np.float32(1.0) + (x * -x + y * -y + z * -z)))
+
+    quats = np.empty((len(packed_int), 4), dtype=np.float32)
+    quats[:, 0] = x
+    quats[:, 1] = y
+    quats[:, 2] = z
+    quats[:, 3] = w
+
+    # move the reconstructed component back to its original position
+    quats = np.take_along_axis(quats, THREE_SMALLEST_ORDER[max_index], axis=1)
+
+    return quats.reshape(shape + (4,))
+
+##############
+# OCTAHEDRAL #
+
+def normalize(vectors):
+    """ Normalizes (..., 3) vectors, zero length vectors become +Z """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    length = np.sqrt(np.sum(vectors * vectors, axis=-1, keepdims=True))
+    normalized = vectors / np.where(length > 0.0, length, np.float32(1.0))
+    normalized[length[..., 0] <= 0.0] = (0.0, 0.0, 1.0)
+    return normalized
+
+def decode_octahedral(encoded, bits_x, bits_y):
+    """ Returns (..., 3) float32 unit vectors from (..., 2) integer octahedral coordinates, in the decode shader's order """
+    encoded = np.asarray(encoded)
+    f_x = encoded[..., 0].astype(np.float32) / np.float32((1 << bits_x) - 1) * np.float32(2.0) - np.float32(1.0)
+    f_y = encoded[..., 1].astype(np.float32) / np.float32((1 << bits_y) - 1) * np.float32(2.0) - np.float32(1.0)
+    f_z = np.float32(1.0) - np.abs(f_x) - np.abs(f_y)
+
+    t = np.clip(-f_z, np.float32(0.0), np.float32(1.0))
+    f_x = f_x + np.where(f_x >= 0.0, -t, t)
+    f_y = f_y + np.where(f_y >= 0.0, -t, t)
+
+    decoded = np.stack((f_x, f_y, f_z), axis=-1)
+    return decoded / np.sqrt(np.sum(decoded * decoded, axis=-1, keepdims=True))
+
+def encode_octahedral(normals, bits_x, bits_y):
+    """ Returns (..., 2) uint32 octahedral coordinates of (..., 3) vectors, quantized to bits_x/bits_y bits
+
+    Out of the four floor/ceil roundings, the one decoding closest to the input is kept.
+    """
+    normals = normalize(normals)
+    levels = np.array([(1 << bits_x) - 1, (1 << bits_y) - 1], dtype=np.float32)
+
+    xy = normals[..., :2] / np.sum(np.abs(normals), axis=-1, keepdims=True)
+
+    # fold the lower hemisphere over the upper one
+    folded = (np.float32(1.0) - np.abs(xy[..., ::-1])) * np.where(xy >= 0.0, np.float32(1.0), np.float32(-1.0))
+    xy = np.where(normals[..., 2:] < 0.0, folded, xy)
+
+    uv = np.clip(xy * np.float32(0.5) + np.float32(0.5), np.float32(0.0), np.float32(1.0)) * levels
+    base = np.floor(uv)
+
+    best = None
+    best_dot = None
+    for offset in ((0.0, 0.0), (1.0, 0.0), (0.0, 1.0), (1.0, 1.0)):
+        candidate = np.minimum(base + np.array(offset, dtype=np.float32), levels).astype(np.uint32)
+        dot = np.sum(decode_octahedral(candidate, bits_x, bits_y) * normals, axis=-1)
+        if best is None:
+            best, best_dot = candidate, dot
+        else:
+            better = dot > best_dot
+            best = np.where(better[..., None], candidate, best)
+            best_dot = np.where(better, dot, best_dot)
+
+    return best
+
+def get_angular_errors(normals, decoded):
+    """ Returns the angle in degrees between (..., 3) vectors """
+    dot = np.sum(normalize(normals).astype(np.float64) * np.asarray(decoded, dtype=np.float64), axis=-1)
+    return np.degrees(np.arccos(np.clip(dot, -1.0, 1.0)))
@@ -0,0 +1,396 @@
+import json
+import os
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# type strings written by the baker, mapped to the importer's short bake types
+BAKE_TYPES = {
+    "VertexAnimationTextures": "VAT",
+    "BoneAnimationTextures": "BAT",
+    "ObjectAnimationTextures": "OAT",
+    "ObjectAttributes": "OA",
+    "Data": "DATA",
+    "VAT": "VAT",
+    "BAT": "BAT",
+    "OAT": "OAT",
+    "OA": "OA",
+    "DATA": "DATA",
+    "SDF": "SDF",
+}
+
+def get_bake_type(type):
+    """ """
+    if type and isinstance(type, str):
+        return BAKE_TYPES.get(type)
+
+    return None
+
+def get_float(element, name, default = None):
+    """ Attributes the baker failed to format (e.g. '<bpy_float[3], ...>') fall back to the default """
+    value = element.get(name)
+    if value is None:
+        return default
+
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+def get_int(element, name, default = None):
+    """ """
+    value = get_float(element, name)
+    return default if value is None else int(value)
+
+def get_bool(element, name, default = False):
+    """ """
+    value = element.get(name)
+    if value is None:
+        return default
+
+    return value == "True"
+
+def get_vector(element, prefix, default = None):
+    """ Returns the prefix_x/y/z attributes as a tuple, or the default if any of them is missing or invalid """
+    vector = tuple(get_float(element, prefix + axis) for axis in ("_x", "_y", "_z"))
+    if None in vector:
+        return default
+
+    return vector
+
+def get_path_key(path):
+    """ Normalized path used to compare paths written on other machines """
+    return path.replace("\\", "/").lower() if path else ""
+
+class BakedDataUnit:
+    __slots__ = ("system", "unit", "length", "scale", "invert_x", "invert_y", "invert_z", "invert_v", "axis_order")
+
+    def __init__(self, element = None):
+        self.system = "METRIC"
+        self.unit = "METERS"
+        self.length = 1.0
+        self.scale = 100.0
+        self.invert_x = False
+        self.invert_y = True
+        self.invert_z = False
+        self.invert_v = True
+        self.axis_order = "XYZ"
+
+        if element is not None:
+            self.system = element.get("system", self.system)
+            self.unit = element.get("unit", self.unit)
+            self.length = get_float(element, "length", self.length)
+            self.scale = get_float(element, "unit_scale", get_float(element, "scale", self.scale))
+            self.invert_x = get_bool(element, "unit_invert_x", get_bool(element, "invert_x", self.invert_x))
+            self.invert_y = get_bool(element, "unit_invert_y", get_bool(element, "invert_y", self.invert_y))
+            self.invert_z = get_bool(element, "unit_invert_z", get_bool(element, "invert_z", self.invert_z))
+            self.invert_v = get_bool(element, "unit_invert_v", get_bool(element, "invert_v", self.invert_v))
+            self.axis_order = element.get("unit_axis_order", self.axis_order)
+
+class BakedDataFrames:
+    __slots__ = ("sampling", "count", "padded", "padding", "rate", "width", "height", "ref", "ref_padding", "stack_mode")
+
+    def __init__(self, element):
+        self.sampling = element.get("sampling")
+        self.count = get_int(element, "count", 0)
+        self.padded = get_int(element, "padded", self.count)
+        self.padding = get_int(element, "padding", 0)
+        self.rate = get_float(element, "rate", 0.0)
+        self.width = get_float(element, "width", 1.0)
+        self.height = get_float(element, "height", 1.0)
+        self.ref = get_int(element, "ref", 0)
+        self.ref_padding = get_int(element, "ref_padding", 0)
+        self.stack_mode = element.get("stack_mode")
+
+class BakedDataMesh:
+    __slots__ = ("path", "uv_index", "num_elements", "bounds_offset_min", "bounds_offset_max")
+
+    def __init__(self, element):
+        self.path = element.get("path")
+        self.uv_index = get_int(element, "uv_index", 0)
+        self.num_elements = get_int(element, "num_elements", 0)
+        self.bounds_offset_min = get_vector(element, "bounds_offset_min", (0.0, 0.0, 0.0))
+        self.bounds_offset_max = get_vector(element, "bounds_offset_max", (0.0, 0.0, 0.0))
+
+class BakedDataChannel:
+    """ One of the R/G/B/A channels of a texture or texture row """
+    __slots__ = ("name", "mode", "index", "component", "axis", "depth", "remapped", "range", "range_offset", "range_valid", "attributes")
+
+    def __init__(self, element):
+        self.name = element.tag
+        self.mode = element.get("mode")
+        self.index = get_int(element, "index")
+        self.component = element.get("component")
+        self.axis = element.get("axis")
+        self.depth = get_int(element, "depth", 0)
+        self.remapped = get_bool(element, "remapped")
+        self.range = get_float(element, "range")
+        self.range_offset = get_float(element, "range_offset")
+        self.range_valid = get_bool(element, "range_valid")
+        # mode specific attributes (quat, rot_mode, reference_mode...) are kept as-is
+        self.attributes = element.attrib
+
+class BakedDataTexture:
+    __slots__ = ("type", "name", "mode", "path", "width", "height", "frame_width", "frame_height", "rows", "remapped", "range", "range_offset", "channels", "row_channels",
+                 "slices", "tiles", "distance", "max_dist", "x", "y", "z")
+
+    def __init__(self, element, textures_element = None):
+        self.type = element.get("type")
+        self.name = element.get("name")
+        self.mode = element.get("mode")
+        self.path = element.get("path")
+
+        # ObjectAttributes write the texture size on the Textures element
+        shared = textures_element if textures_element is not None else element
+        self.width = get_int(element, "width", get_int(shared, "width", 0))
+        self.height = get_int(element, "height", get_int(shared, "height", 0))
+        self.frame_width = get_float(element, "frame_width", get_float(shared, "frame_width", 1.0))
+        self.frame_height = get_float(element, "frame_height", get_float(shared, "frame_height", 1.0))
+
+        self.rows = get_float(element, "rows", 0.0)
+        self.remapped = get_bool(element, "remapped")
+        self.range = get_vector(element, "range")
+        self.range_offset = get_vector(element, "range_offset")
+
+        self.channels = {}
+        for channel in ("R", "G", "B", "A"):
+            channel_element = element.find(channel)
+            if channel_element is not None:
+                self.channels[channel] = BakedDataChannel(channel_element)
+
+        self.row_channels = []
+        for row in element.findall("Row"):
+            self.row_channels.append((row.get("name"), [BakedDataChannel(channel) for channel in row]))
+
+        # SDF
+        self.slices = get_int(element, "slices", 0)
+        self.tiles = element.get("tiles")
+        self.distance = element.get("distance")
+        self.max_dist = get_float(element, "max_dist", 0.0)
+        self.x = get_int(element, "x", 0)
+        self.y = get_int(element, "y", 0)
+        self.z = get_int(element, "z", 0)
+
+    def get_key(self):
+        """ Texture type for VAT/BAT, name for ObjectAttributes/OAT """
+        return self.type if self.type else self.name
+
+class BakedDataAnimation:
+    __slots__ = ("name", "start_frame", "end_frame", "frames")
+
+    def __init__(self, element):
+        self.name = element.get("name")
+        self.start_frame = get_int(element, "start_frame", 0)
+        self.end_frame = get_int(element, "end_frame", 0)
+        self.frames = get_int(element, "frames", 0)
+
+class BakedDataLayer:
+    __slots__ = ("name", "packing", "uv_index", "uv_channel", "vcol_rgba", "normal_xyz", "range", "range_offset", "range_valid", "packed")
+
+    def __init__(self, element):
+        self.name = element.get("name")
+        self.packing = element.get("packing")
+        self.uv_index = get_int(element, "uv_index", 0)
+        self.uv_channel = element.get("uv_channel")
+        self.vcol_rgba = element.get("vcol_rgba")
+        self.normal_xyz = element.get("normal_xyz")
+        self.range = get_float(element, "range")
+        self.range_offset = get_float(element, "range_offset")
+        self.range_valid = get_bool(element, "range_valid")
+        self.packed = [(packed.get("component"), packed.get("name")) for packed in element.findall("Packed")]
+
+class BakedDataDepth:
+    __slots__ = ("depth_limit", "depth_limit_use", "use_8bit_packing", "use_pivot_painter_packing")
+
+    def __init__(self, element):
+        self.depth_limit = get_int(element, "depth_limit", 0)
+        self.depth_limit_use = get_bool(element, "depth_limit_use")
+        self.use_8bit_packing = get_bool(element, "use_8bit_packing")
+        self.use_pivot_painter_packing = get_bool(element, "use_pivot_painter_packing")
+
+class BakedData:
+    """ Parsed BakedData xml, built once with every numeric attribute already converted """
+    __slots__ = ("file_path", "ID", "type", "type_name", "version", "unit", "frames", "mesh", "textures", "textures_by_key", "animations", "layers", "depth", "vcol")
+
+    def __init__(self, root, file_path = ""):
+        self.file_path = file_path
+        self.ID = root.get("ID")
+        self.type_name = root.get("type")
+        self.type = get_bake_type(self.type_name)
+        self.version = root.get("version")
+
+        self.unit = BakedDataUnit(root.find("Unit"))
+
+        frames = root.find("Frames")
+        self.frames = BakedDataFrames(frames) if frames is not None else None
+
+        mesh = root.find("Mesh")
+        self.mesh = BakedDataMesh(mesh) if mesh is not None else None
+
+        self.textures = []
+        textures = root.find("Textures")
+        if textures is not None:
+            self.textures = [BakedDataTexture(texture, textures) for texture in textures.findall("Texture")]
+
+        # SDF write a single texture without the Textures element
+        texture = root.find("Texture")
+        if texture is not None:
+            self.textures.append(BakedDataTexture(texture))
+
+        self.textures_by_key = {}
+        for texture in self.textures:
+            self.textures_by_key.setdefault(texture.get_key(), texture)
+
+        animations = root.find("Animations")
+        self.animations = [BakedDataAnimation(animation) for animation in animations.findall("Animation")] if animations is not None else []
+
+        layers = root.find("Layers")
+        self.layers = [BakedDataLayer(layer) for layer in layers.findall("Layer")] if layers is not None else []
+
+        depth = root.find("Depth")
+        self.depth = BakedDataDepth(depth) if depth is not None else None
+
+        vcol = root.find("VCol")
+        self.vcol = [BakedDataChannel(channel) for channel in vcol] if vcol is not None else []
+
+    def get_texture(self, key):
+        """ """
+        return self.textures_by_key.get(key)
+
+    def get_files(self):
+        """ Returns the mesh and texture files this descriptor references """
+        file_paths = []
+        if self.mesh is not None and self.mesh.path:
+            file_paths.append(self.mesh.path)
+
+        file_paths.extend(texture.path for texture in self.textures if texture.path)
+        return file_paths
+
+def parse_baked_data(file_path):
+    """ Raises ET.ParseError if the file isn't valid xml """
+    return BakedData(ET.parse(file_path).getroot(), str(file_path))
+
+#########
+# INDEX #
+
+def get_index_entry(baked_data, stat):
+    """ """
+    return {
+        "file_path": baked_data.file_path,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "type": baked_data.type,
+        "version": baked_data.version,
+        "mesh": baked_data.mesh.path if baked_data.mesh is not None else None,
+        "textures": [(texture.get_key(), texture.path) for texture in baked_data.textures],
+        "animations": [animation.name for animation in baked_data.animations],
+    }
+
+class BakedDataIndex:
+    """ Persistent index of every BakedData found in a content tree, keyed by ID """
+    __slots__ = ("index_path", "entries", "by_type", "by_mesh", "by_texture")
+
+    def __init__(self, index_path = None):
+        self.index_path = index_path
+        self.entries = {}
+        self.by_type = {}
+        self.by_mesh = {}
+        self.by_texture = {}
+
+        if index_path and os.path.exists(index_path):
+            try:
+                with open(index_path, "r") as file:
+                    self.entries = json.load(file).get("entries", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+        self.build_lookups()
+
+    def build_lookups(self):
+        """ """
+        self.by_type = {}
+        self.by_mesh = {}
+        self.by_texture = {}
+
+        for baked_data_ID, entry in self.entries.items():
+            self.by_type.setdefault(entry["type"], set()).add(baked_data_ID)
+
+            if entry["mesh"]:
+                for key in (get_path_key(entry["mesh"]), get_path_key(Path(entry["mesh"].replace("\\", "/")).name)):
+                    self.by_mesh.setdefault(key, set()).add(baked_data_ID)
+
+            for texture_key, texture_path in entry["textures"]:
+                if texture_path:
+                    for key in (get_path_key(texture_path), get_path_key(Path(texture_path.replace("\\", "/")).name)):
+                        self.by_texture.setdefault(key, set()).add(baked_data_ID)
+
+    def update(self, root_dir):
+        """ Re-parses only the descriptors that changed since the last update, returns the number of parsed files """
+        known = {entry["file_path"]: (baked_data_ID, entry) for baked_data_ID, entry in self.entries.items()}
+
+        entries = {}
+        parsed = 0
+        for file_path in sorted(str(file_path) for file_path in Path(root_dir).rglob("*.xml")):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+
+            baked_data_ID, entry = known.get(file_path, (None, None))
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                entries[baked_data_ID] = entry
+                continue
+
+            try:
+                baked_data = parse_baked_data(file_path)
+            except ET.ParseError:
+                continue
+
+            parsed += 1
+            if baked_data.ID and baked_data.type:
+                entries[baked_data.ID] = get_index_entry(baked_data, stat)
+
+        self.entries = entries
+        self.build_lookups()
+        return parsed
+
+    def save(self, index_path = None):
+        """ """
+        index_path = index_path if index_path else self.index_path
+        index_dir = os.path.dirname(index_path)
+        if index_dir and not os.path.isdir(index_dir):
+            os.makedirs(index_dir)
+
+        with open(index_path, "w") as file:
+            json.dump({"entries": self.entries}, file, indent=1, sort_keys=True)
+
+    def get(self, baked_data_ID):
+        """ """
+        return self.entries.get(baked_data_ID)
+
+    def find(self, type = None, mesh = None, texture = None):
+        """ Returns the IDs matching every given criteria, mesh/texture being a full path or a file name """
+        results = None
+        if type is not None:
+            results = set(self.by_type.get(get_bake_type(type) or type, ()))
+        if mesh is not None:
+            matches = self.by_mesh.get(get_path_key(mesh), set())
+            results = matches if results is None else results & matches
+        if texture is not None:
+            matches = self.by_texture.get(get_path_key(texture), set())
+            results = matches if results is None else results & matches
+
+        return sorted(results if results is not None else self.entries)
+
+    def load(self, baked_data_ID):
+        """ Parses the full descriptor of an indexed entry """
+        entry = self.entries.get(baked_data_ID)
+        return parse_baked_data(entry["file_path"]) if entry else None
+
+def build_baked_data_index(root_dir, index_path = None):
+    """ """
+    index = BakedDataIndex(index_path)
+    index.update(root_dir)
+    if index_path:
+        index.save()
+
+    return index
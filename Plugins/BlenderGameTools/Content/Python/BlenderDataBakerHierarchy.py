@@ -0,0 +1,168 @@
+import math
+import os
+
+try:
+    import numpy as np
+    import BlenderDataBakerCodecs as baked_data_codecs
+except ImportError:
+    np = None
+
+import BlenderDataBakerTextures as baked_data_textures
+
+# ancestors written per texel of the lookup, one per channel
+ANCESTORS_PER_FETCH = 4
+
+# largest index pivot painter packing keeps intact, (index + 1024) has to stay below the half float infinity exponent
+MAX_PACKED_INDEX = 0x7c00 - 1 - 1024
+
+# half float texels hold pivot painter packed indices exactly
+ANCESTORS_FORMAT = baked_data_textures.TEXTURE_FORMATS[1]
+
+############
+# DECODING #
+
+def get_hierarchy_channels(baked_data):
+    """ Returns the (texture, channel name, depth) of every HIERARCHY channel, sorted by depth """
+    channels = []
+    for texture in baked_data.textures:
+        for channel_name, channel in texture.channels.items():
+            if channel.mode == "HIERARCHY":
+                channels.append((texture, channel_name, channel.depth))
+
+    return sorted(channels, key=lambda channel: channel[2])
+
+def decode_indices(values, depth):
+    """ Returns the integer indices stored in a HIERARCHY channel, depth being the descriptor's BakedDataDepth """
+    if depth is not None and depth.use_pivot_painter_packing:
+        return baked_data_codecs.unpack_pivot_painter_index(values)
+
+    # 8 bit packing stores index / 255, unpacked indices are stored as-is
+    scale = np.float32(255.0) if depth is not None and depth.use_8bit_packing else np.float32(1.0)
+    return np.rint(values * scale).astype(np.int32)
+
+def get_parents(indices, element_count):
+    """ Parent of each element, roots and elements with an invalid parent being their own parent """
+    elements = np.arange(element_count, dtype=np.int32)
+    parents = indices.reshape(-1)[:element_count]
+    return np.where((parents >= 0) & (parents < element_count), parents, elements)
+
+def get_ancestors(parents, max_depth):
+    """ Returns a (depth, elements) array, row d holding the ancestor of each element d + 1 levels up
+
+    Chains shorter than the hierarchy stop at their root, like the depth channels the baker writes.
+    """
+    levels = []
+    if np.array_equal(parents, np.arange(len(parents))):
+        return np.zeros((0, len(parents)), dtype=np.int32)
+
+    ancestors = parents
+    while len(levels) < max_depth:
+        levels.append(ancestors)
+
+        next_ancestors = parents[ancestors]
+        if np.array_equal(next_ancestors, ancestors):
+            break
+        ancestors = next_ancestors
+
+    return np.stack(levels)
+
+##########
+# LOOKUP #
+
+class AncestorLookup:
+    """ Fetches a vertex needs to find the indices of its ancestors, walking the parent chain or with the ancestor lookup """
+    __slots__ = ("depth", "walk_fetches", "lookup_fetches", "element_count", "msg")
+
+    def __init__(self, depth = 0, walk_fetches = 0, element_count = 0, msg = ""):
+        self.depth = depth
+        # each fetch of a walk only finds as many ancestors as the texture holding the parent index has depth channels
+        self.walk_fetches = walk_fetches
+        self.lookup_fetches = math.ceil(depth / ANCESTORS_PER_FETCH)
+        self.element_count = element_count
+        self.msg = msg
+
+    def get_fetches_saved(self):
+        """ Dependent fetches per vertex the lookup saves, none if it wasn't written """
+        return 0 if self.msg else self.walk_fetches - self.lookup_fetches
+
+def write_ancestor_rows(output_path, ancestors, width, height):
+    """ Writes the ancestors in blocks of height rows, channel c of block b holding the ancestors 4 * b + c + 1 levels up
+
+    Texels are indexed like the baked ones (index % width, index // width) within each block, padding texels are left empty.
+    """
+    depth, element_count = ancestors.shape
+    blocks = math.ceil(depth / ANCESTORS_PER_FETCH)
+
+    packed = np.zeros((blocks * ANCESTORS_PER_FETCH, height * width), dtype=np.float32)
+    packed[:depth, :element_count] = baked_data_codecs.pack_pivot_painter_index(ancestors)
+
+    # (block, channel, y, x) > (block * y, x) per channel
+    packed = packed.reshape(blocks, ANCESTORS_PER_FETCH, height, width).transpose(1, 0, 2, 3).reshape(ANCESTORS_PER_FETCH, blocks * height, width)
+
+    output_dir = os.path.dirname(output_path)
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    baked_data_textures.write_exr(output_path, {channel_name: packed[index] for index, channel_name in enumerate(("R", "G", "B", "A"))})
+
+def get_ancestors_format(lookup, width = 0, height = 0, path = None):
+    """ """
+    texture_format = baked_data_textures.TextureFormat(ANCESTORS_FORMAT, width, height, msg=lookup.msg, path=path)
+    texture_format.type = "Ancestors"
+    texture_format.ancestors = lookup
+    return texture_format
+
+def get_ancestor_lookup(baked_data, output_path):
+    """ Decodes the parent indices of an ObjectAttributes descriptor and writes its ancestor lookup to output_path
+
+    Returns the lookup's TextureFormat, its ancestors being the AncestorLookup. It has no path if the lookup wasn't
+    written, its msg telling why.
+    """
+    channels = get_hierarchy_channels(baked_data)
+
+    # walks start from the parent index holding the most levels (e.g. a prebaked RGBA hierarchy over the PosIndex one)
+    walk_depths = {}
+    for texture, _, channel_depth in channels:
+        walk_depths[texture.path] = max(walk_depths.get(texture.path, 0), channel_depth)
+
+    parent_channels = [(texture, channel_name) for texture, channel_name, channel_depth in channels if channel_depth == 1]
+    if not parent_channels:
+        return get_ancestors_format(AncestorLookup(msg="no parent index channel"))
+
+    parent_texture, channel_name = max(parent_channels, key=lambda parent_channel: walk_depths[parent_channel[0].path])
+    if not parent_texture.path or not os.path.exists(parent_texture.path):
+        return get_ancestors_format(AncestorLookup(msg="missing texture"))
+
+    texture_channels, msg = baked_data_textures.read_texture_channels(parent_texture)
+    if texture_channels is None:
+        return get_ancestors_format(AncestorLookup(msg=msg))
+
+    values = dict(texture_channels).get(channel_name)
+    if values is None:
+        return get_ancestors_format(AncestorLookup(msg="no {} channel".format(channel_name)))
+
+    height, width = values.shape
+    element_count = baked_data.mesh.num_elements if baked_data.mesh is not None and baked_data.mesh.num_elements > 0 else width * height
+    element_count = min(element_count, width * height)
+    if element_count - 1 > MAX_PACKED_INDEX:
+        return get_ancestors_format(AncestorLookup(element_count=element_count, msg="{} elements can't be packed".format(element_count)))
+
+    max_depth = element_count
+    if baked_data.depth is not None and baked_data.depth.depth_limit_use and baked_data.depth.depth_limit > 0:
+        max_depth = baked_data.depth.depth_limit
+
+    parents = get_parents(decode_indices(values, baked_data.depth), element_count)
+    ancestors = get_ancestors(parents, max_depth)
+    depth = len(ancestors)
+
+    lookup = AncestorLookup(depth, math.ceil(depth / walk_depths[parent_texture.path]), element_count)
+
+    if not depth:
+        lookup.msg = "no hierarchy"
+    elif lookup.walk_fetches <= lookup.lookup_fetches:
+        lookup.msg = "baked depth channels already resolve {} levels per fetch".format(walk_depths[parent_texture.path])
+    if lookup.msg:
+        return get_ancestors_format(lookup)
+
+    write_ancestor_rows(output_path, ancestors, width, height)
+    return get_ancestors_format(lookup, width, lookup.lookup_fetches * height, output_path)
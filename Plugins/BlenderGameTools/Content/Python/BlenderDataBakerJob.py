@@ -0,0 +1,166 @@
+""" Time-sliced import of a directory of BakedData, spreads the import over editor ticks so the editor keeps responding
+
+    import BlenderDataBakerJob as baked_data_job
+    job, msg = baked_data_job.start_import_job("D:/Bakes", "/Game/Bakes", use_parent_material=True)
+
+Descriptors are parsed and analyzed on worker threads, the unreal side of the import (importing a BakedData's files,
+loading its assets, applying texture and mesh settings, building its material) runs as steps on the editor thread,
+as many per tick as fit in the job's budget.
+
+Progress is logged to the Output Log and can be polled with ImportJob.get_progress(). show_dialog opens a slow task
+dialog instead, it's modal: the editor can't be used until the job is done or cancelled from the dialog.
+"""
+import os
+import time
+import concurrent.futures
+
+import unreal
+
+import BlenderDataBaker as baked_data_importer
+
+# seconds of import steps run per editor tick
+# @NOTE the budget is checked between steps, importing the files of a large BakedData or building a material still takes a whole frame
+DEFAULT_TICK_BUDGET = 0.010
+
+# seconds between progress logs of a job without dialog
+PROGRESS_LOG_PERIOD = 2.0
+
+# jobs being ticked, a job removes itself once done
+import_jobs = []
+
+class ImportJob:
+    """ Imports a directory like BlenderDataBaker.import_baked_directory() does, a few steps per editor tick
+
+    state is "running" until the job is "finished", "cancelled" or "failed". Cancelling or failing deletes the assets
+    of the BakedData being imported, the ones already imported are kept and recorded in the import manifest.
+    A BakedData whose post processing raises is reported as failed and its assets deleted, the job goes on.
+    """
+
+    def __init__(self, root_dir, destination, tick_budget = DEFAULT_TICK_BUDGET, show_dialog = False, on_finished = None, **import_options):
+        self.file_paths = baked_data_importer.get_baked_data_files(root_dir)
+        self.tick_budget = tick_budget
+        self.on_finished = on_finished
+        self.report = []
+        self.in_flight_assets = []
+        self.steps = baked_data_importer.import_baked_directory_steps(self.report, self.file_paths, root_dir, destination, batch_import=False, in_flight_assets=self.in_flight_assets, **import_options)
+
+        self.total_work = len(self.file_paths) * len(baked_data_importer.IMPORT_STAGES)
+        self.work = 0
+        self.msg = ""
+        self.state = "running"
+        self.ticks = 0
+        self.max_tick_time = 0.0
+        self.last_progress_log = time.perf_counter()
+
+        # @NOTE the dialog is modal, see the module docstring
+        self.slow_task = None
+        if show_dialog:
+            self.slow_task = unreal.ScopedSlowTask(self.total_work, "Importing baked data")
+            self.slow_task.__enter__()
+            self.slow_task.make_dialog(True)
+
+        self.tick_handle = unreal.register_slate_post_tick_callback(self.tick)
+        import_jobs.append(self)
+
+    def get_progress(self):
+        """ Completed ratio of the job, from 0 to 1 """
+        return self.work / self.total_work if self.total_work else 1.0
+
+    def tick(self, delta_seconds):
+        """ Runs import steps until the budget is spent or a step waits on worker threads """
+        if self.state != "running":
+            return
+
+        if self.slow_task is not None and self.slow_task.should_cancel():
+            self.cancel()
+            return
+
+        self.ticks += 1
+        start = time.perf_counter()
+        try:
+            while time.perf_counter() - start < self.tick_budget:
+                step = next(self.steps)
+                if isinstance(step, concurrent.futures.Future):
+                    # descriptors are still being parsed or analyzed, give the frame back
+                    break
+
+                work, self.msg = step
+                self.work += work
+                if self.slow_task is not None:
+                    self.slow_task.enter_progress_frame(work, self.msg)
+
+            if self.slow_task is None:
+                self.log_progress()
+        except StopIteration:
+            self.finish("finished")
+        except Exception as e:
+            unreal.log_error("Import job failed: {}".format(e))
+            self.finish("failed")
+        finally:
+            self.max_tick_time = max(self.max_tick_time, time.perf_counter() - start)
+
+    def log_progress(self):
+        """ Logs the job's progress, at most every PROGRESS_LOG_PERIOD seconds """
+        now = time.perf_counter()
+        if now - self.last_progress_log >= PROGRESS_LOG_PERIOD:
+            self.last_progress_log = now
+            unreal.log("Importing baked data: {:.0%}, {}".format(self.get_progress(), self.msg))
+
+    def cancel(self):
+        """ Stops the job and deletes the assets of the BakedData being imported """
+        if self.state != "running":
+            return
+
+        # stopping the steps saves the manifest entries of the completed descriptors
+        self.steps.close()
+        self.finish("cancelled")
+
+    def delete_in_flight_assets(self):
+        """ """
+        baked_data_importer.delete_assets(self.in_flight_assets)
+        self.in_flight_assets.clear()
+
+    def finish(self, state):
+        """ """
+        self.state = state
+        unreal.unregister_slate_post_tick_callback(self.tick_handle)
+
+        if self.slow_task is not None:
+            self.slow_task.__exit__(None, None, None)
+            self.slow_task = None
+
+        if state != "finished":
+            self.delete_in_flight_assets()
+
+            reported = set(file_path for file_path, success, msg in self.report)
+            for file_path in self.file_paths:
+                if file_path not in reported:
+                    self.report.append((file_path, False, "Import " + state))
+
+        baked_data_importer.log_import_report(self.report)
+        unreal.log("Import job {} after {} ticks, longest tick {:.1f} ms".format(state, self.ticks, self.max_tick_time * 1000.0))
+
+        if self in import_jobs:
+            import_jobs.remove(self)
+
+        if self.on_finished is not None:
+            self.on_finished(self)
+
+def start_import_job(root_dir, destination, tick_budget = DEFAULT_TICK_BUDGET, show_dialog = False, on_finished = None, **import_options):
+    """ Returns (job, msg), job being None if the import couldn't start
+
+    import_options are the ones of BlenderDataBaker.import_baked_directory(), on_finished is called with the job once it's done.
+    show_dialog shows progress in a modal dialog the job can be cancelled from, blocking the editor until it's done.
+    """
+    if destination == "":
+        return (None, "Invalid destination")
+
+    if not os.path.isdir(root_dir):
+        return (None, "Invalid directory: " + root_dir)
+
+    return (ImportJob(root_dir, destination, tick_budget, show_dialog, on_finished, **import_options), "")
+
+def cancel_import_jobs():
+    """ """
+    for job in list(import_jobs):
+        job.cancel()
@@ -0,0 +1,333 @@
+""" Recording stand-in for the unreal module, lets the importer run outside of the editor
+
+Every call made through it is counted by its dotted name (e.g. MaterialEditingLibrary.connect_material_expressions).
+Install it before importing BlenderDataBaker:
+
+    import BlenderDataBakerMockUnreal as mock_unreal
+    mock_unreal.install()
+"""
+import sys
+import tempfile
+import threading
+import types
+from pathlib import Path
+
+class Recorder:
+    """ Counts calls by name, safe to use from worker threads """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def record(self, name):
+        """ """
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def reset(self):
+        """ """
+        with self.lock:
+            self.calls = {}
+
+    def get_calls(self):
+        """ """
+        with self.lock:
+            return dict(self.calls)
+
+class MockObject:
+    """ Any attribute is another MockObject, calling one records the call and returns a new MockObject
+
+    Attributes and editor properties that were set are returned as-is.
+    """
+
+    def __init__(self, recorder, name):
+        object.__setattr__(self, "_recorder", recorder)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_properties", {})
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        properties = object.__getattribute__(self, "_properties")
+        if name not in properties:
+            properties[name] = MockObject(self._recorder, self._name + "." + name)
+        return properties[name]
+
+    def __setattr__(self, name, value):
+        self._properties[name] = value
+
+    def __call__(self, *args, **kwargs):
+        self._recorder.record(self._name)
+        return MockObject(self._recorder, self._name.rsplit(".", 1)[-1] + "()")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def __repr__(self):
+        return "<MockObject {}>".format(self._name)
+
+    def get_recorded_name(self):
+        """ Name calls on this object are recorded under, assets are grouped by class """
+        return type(self).__name__ if isinstance(self, MockAsset) else self._name
+
+    def set_editor_property(self, name, value, notify_mode = None):
+        """ """
+        self._recorder.record(self.get_recorded_name() + ".set_editor_property")
+        self._properties[name] = value
+
+    def get_editor_property(self, name):
+        """ """
+        self._recorder.record(self.get_recorded_name() + ".get_editor_property")
+        return getattr(self, name)
+
+class MockAsset(MockObject):
+    """ Asset created or imported through the stand-in """
+
+class Texture2D(MockAsset):
+    """ """
+
+class StaticMesh(MockAsset):
+    """ """
+
+class Material(MockAsset):
+    """ """
+
+class MaterialInstanceConstant(MockAsset):
+    """ """
+
+# imported asset class by file extension
+IMPORTED_ASSET_CLASSES = {".fbx": StaticMesh, ".exr": Texture2D, ".png": Texture2D}
+
+def get_asset_name(file_path):
+    """ Asset name UE gives to an imported file """
+    return Path(file_path).stem.replace(".", "_").replace(" ", "_")
+
+class MockAssetTools(MockObject):
+    """ """
+
+    def import_asset_tasks(self, import_tasks):
+        """ Imports every task at once, each gets a single imported object """
+        self._recorder.record("AssetTools.import_asset_tasks")
+        for import_task in import_tasks:
+            asset_class = IMPORTED_ASSET_CLASSES.get(Path(import_task.filename).suffix.lower(), MockAsset)
+            asset_name = get_asset_name(import_task.filename)
+            import_task.imported_object_paths = [self._unreal.add_asset(import_task.destination_path, asset_name, asset_class)]
+
+    def create_asset(self, asset_name, package_path, asset_class, factory):
+        """ """
+        self._recorder.record("AssetTools.create_asset")
+        asset_class = asset_class if isinstance(asset_class, type) and issubclass(asset_class, MockAsset) else MockAsset
+        return self._unreal.get_asset(self._unreal.add_asset(package_path, asset_name, asset_class))
+
+class MockEditorAssetLibrary(MockObject):
+    """ """
+
+    def load_asset(self, asset_path):
+        """ """
+        self._recorder.record("EditorAssetLibrary.load_asset")
+        return self._unreal.get_asset(asset_path)
+
+    def does_asset_exist(self, asset_path):
+        """ """
+        self._recorder.record("EditorAssetLibrary.does_asset_exist")
+        return self._unreal.get_asset(asset_path) is not None
+
+    def does_directory_have_assets(self, directory_path, recursive = True):
+        """ """
+        self._recorder.record("EditorAssetLibrary.does_directory_have_assets")
+        directory_path = directory_path.rstrip("/") + "/"
+        return any(asset_path.startswith(directory_path) for asset_path in self._unreal.assets)
+
+    def delete_asset(self, asset_path):
+        """ """
+        self._recorder.record("EditorAssetLibrary.delete_asset")
+        return self._unreal.remove_asset(asset_path)
+
+class MockStaticMeshEditorSubsystem(MockObject):
+    """ Meshes come with the settings of a fresh UE import, no simple collision """
+
+    def get_simple_collision_count(self, static_mesh):
+        """ """
+        self._recorder.record("StaticMeshEditorSubsystem.get_simple_collision_count")
+        return 0
+
+    def get_nanite_settings(self, static_mesh):
+        """ """
+        self._recorder.record("StaticMeshEditorSubsystem.get_nanite_settings")
+        nanite_settings = MockObject(self._recorder, "MeshNaniteSettings")
+        nanite_settings.enabled = False
+        nanite_settings.lerp_u_vs = True
+        return nanite_settings
+
+    def get_lod_build_settings(self, static_mesh, lod_index):
+        """ """
+        self._recorder.record("StaticMeshEditorSubsystem.get_lod_build_settings")
+        build_settings = MockObject(self._recorder, "MeshBuildSettings")
+        build_settings.use_full_precision_u_vs = False
+        build_settings.generate_lightmap_u_vs = True
+        build_settings.distance_field_resolution_scale = 1.0
+        return build_settings
+
+class MockScopedSlowTask(MockObject):
+    """ Slow task whose dialog is never cancelled, progress is kept to be checked """
+
+    def __init__(self, recorder, work, desc = "", enabled = True):
+        super().__init__(recorder, "ScopedSlowTask")
+        self.total_work = work
+        self.completed_work = 0.0
+
+    def enter_progress_frame(self, work = 1.0, desc = ""):
+        """ """
+        self._recorder.record("ScopedSlowTask.enter_progress_frame")
+        self.completed_work += work
+
+    def should_cancel(self):
+        """ """
+        self._recorder.record("ScopedSlowTask.should_cancel")
+        return False
+
+# content shipped with the plugin, its assets always exist
+MOUNTED_CONTENT = ("/BlenderDataBaker/",)
+
+class MockUnreal(types.ModuleType):
+    """ The unreal module, anything not defined here is a MockObject """
+
+    def __init__(self, saved_dir = None, verbose = False):
+        super().__init__("unreal")
+        self.recorder = Recorder()
+        self.saved_dir = saved_dir if saved_dir else tempfile.mkdtemp(prefix="BlenderDataBaker")
+        self.verbose = verbose
+        self.mounted_content = MOUNTED_CONTENT
+        self.assets = {}
+        self.assets_lock = threading.Lock()
+        self.tick_callbacks = {}
+
+        self.Texture2D = Texture2D
+        self.StaticMesh = StaticMesh
+        self.Material = Material
+        self.MaterialInstanceConstant = MaterialInstanceConstant
+
+        asset_tools = MockAssetTools(self.recorder, "AssetTools")
+        object.__setattr__(asset_tools, "_unreal", self)
+        self.AssetToolsHelpers = MockObject(self.recorder, "AssetToolsHelpers")
+        self.AssetToolsHelpers.get_asset_tools = lambda: asset_tools
+
+        self.EditorAssetLibrary = MockEditorAssetLibrary(self.recorder, "EditorAssetLibrary")
+        object.__setattr__(self.EditorAssetLibrary, "_unreal", self)
+
+        self.static_mesh_editor_subsystem = MockStaticMeshEditorSubsystem(self.recorder, "StaticMeshEditorSubsystem")
+
+        self.Paths = MockObject(self.recorder, "Paths")
+        self.Paths.project_saved_dir = lambda: self.saved_dir
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        mock_object = MockObject(self.recorder, name)
+        setattr(self, name, mock_object)
+        return mock_object
+
+    def get_editor_subsystem(self, subsystem_class):
+        """ """
+        self.recorder.record("get_editor_subsystem")
+        if subsystem_class is self.StaticMeshEditorSubsystem:
+            return self.static_mesh_editor_subsystem
+        return MockObject(self.recorder, "get_editor_subsystem()")
+
+    def ScopedSlowTask(self, work, desc = "", enabled = True):
+        """ """
+        self.recorder.record("ScopedSlowTask")
+        return MockScopedSlowTask(self.recorder, work, desc, enabled)
+
+    def register_slate_post_tick_callback(self, callback):
+        """ Returns the handle to unregister callback with, callbacks are called by tick() """
+        self.recorder.record("register_slate_post_tick_callback")
+        handle = len(self.tick_callbacks)
+        while handle in self.tick_callbacks:
+            handle += 1
+        self.tick_callbacks[handle] = callback
+        return handle
+
+    def unregister_slate_post_tick_callback(self, handle):
+        """ """
+        self.recorder.record("unregister_slate_post_tick_callback")
+        self.tick_callbacks.pop(handle, None)
+
+    def tick(self, delta_seconds = 1.0 / 60.0):
+        """ Stands in for an editor frame, calls the registered post tick callbacks """
+        for callback in list(self.tick_callbacks.values()):
+            callback(delta_seconds)
+
+    def add_asset(self, package_path, asset_name, asset_class):
+        """ Returns the object path of the new asset """
+        asset_path = "{}/{}.{}".format(package_path.rstrip("/"), asset_name, asset_name)
+        with self.assets_lock:
+            self.assets[asset_path] = asset_class(self.recorder, asset_class.__name__)
+        return asset_path
+
+    def get_asset(self, asset_path):
+        """ Accepts object paths as well as package paths """
+        asset_name = asset_path.rsplit("/", 1)[-1]
+        if "." not in asset_name:
+            asset_path = "{}.{}".format(asset_path, asset_name)
+
+        with self.assets_lock:
+            asset = self.assets.get(asset_path)
+
+        if asset is None and asset_path.startswith(self.mounted_content):
+            package_path, asset_name = asset_path.rsplit(".", 1)[0].rsplit("/", 1)
+            asset = self.get_asset(self.add_asset(package_path, asset_name, MockAsset))
+
+        return asset
+
+    def remove_asset(self, asset_path):
+        """ Returns True if the asset existed """
+        asset_name = asset_path.rsplit("/", 1)[-1]
+        if "." not in asset_name:
+            asset_path = "{}.{}".format(asset_path, asset_name)
+
+        with self.assets_lock:
+            return self.assets.pop(asset_path, None) is not None
+
+    def reset(self):
+        """ Forgets assets and recorded calls """
+        self.recorder.reset()
+        with self.assets_lock:
+            self.assets = {}
+        self.tick_callbacks = {}
+
+    def log(self, msg):
+        """ """
+        self.recorder.record("log")
+        if self.verbose:
+            print(msg)
+
+    def log_warning(self, msg):
+        """ """
+        self.recorder.record("log_warning")
+        if self.verbose:
+            print("Warning: {}".format(msg))
+
+    def log_error(self, msg):
+        """ """
+        self.recorder.record("log_error")
+        if self.verbose:
+            print("Error: {}".format(msg))
+
+def install(saved_dir = None, verbose = False):
+    """ Installs the stand-in as the unreal module, must be called before importing BlenderDataBaker """
+    module = sys.modules.get("unreal")
+    if isinstance(module, MockUnreal):
+        return module
+
+    if module is not None:
+        raise RuntimeError("the real unreal module is already imported")
+
+    module = MockUnreal(saved_dir, verbose)
+    sys.modules["unreal"] = module
+    return module
@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import threading
+
+class NullPhase:
+    """ Phase used while profiling is disabled """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+NULL_PHASE = NullPhase()
+
+class Phase:
+    """ Times a with block and records it to its Profiler on exit """
+    __slots__ = ("profiler", "name", "descriptor", "start")
+
+    def __init__(self, profiler, name, descriptor):
+        self.profiler = profiler
+        self.name = name
+        self.descriptor = descriptor
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.record(self.name, self.descriptor, self.start, time.perf_counter() - self.start)
+        return False
+
+class Profiler:
+    """ Records wall time per phase and per descriptor, safe to use from worker threads
+
+    Disabled by default, phase() is then a shared no-op context manager.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    def phase(self, name, descriptor = ""):
+        """ Context manager timing the phase name, descriptor being the BakedData it's working on if any """
+        if not self.enabled:
+            return NULL_PHASE
+
+        return Phase(self, name, descriptor)
+
+    def record(self, name, descriptor, start, duration):
+        """ """
+        with self.lock:
+            self.events.append((name, descriptor, start, duration, threading.get_ident()))
+
+    def reset(self):
+        """ """
+        with self.lock:
+            self.events = []
+            self.origin = time.perf_counter()
+
+    def get_phases(self, descriptor = None):
+        """ Returns {phase: {"count", "total", "max"}} in seconds, for a single descriptor if given """
+        phases = {}
+        with self.lock:
+            events = list(self.events)
+
+        for name, event_descriptor, start, duration, thread_id in events:
+            if descriptor is not None and event_descriptor != descriptor:
+                continue
+
+            phase = phases.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            phase["count"] += 1
+            phase["total"] += duration
+            phase["max"] = max(phase["max"], duration)
+
+        return phases
+
+    def get_descriptors(self):
+        """ """
+        with self.lock:
+            return sorted(set(event[1] for event in self.events if event[1]))
+
+    def get_report(self):
+        """ Returns the per phase and per descriptor timings as a json serializable dict """
+        return {"phases": self.get_phases(),
+                "descriptors": {descriptor: self.get_phases(descriptor) for descriptor in self.get_descriptors()}}
+
+    def save_json(self, file_path):
+        """ """
+        with open(file_path, "w") as file:
+            json.dump(self.get_report(), file, indent=2, sort_keys=True)
+
+    def get_chrome_trace(self):
+        """ Returns the events in the Chrome trace event format, open it in chrome://tracing or Perfetto """
+        with self.lock:
+            events = list(self.events)
+
+        pid = os.getpid()
+        trace_events = []
+        for name, descriptor, start, duration, thread_id in events:
+            trace_event = {"name": name, "cat": "BlenderDataBaker", "ph": "X", "pid": pid, "tid": thread_id,
+                           "ts": (start - self.origin) * 1e6, "dur": duration * 1e6}
+            if descriptor:
+                trace_event["args"] = {"descriptor": descriptor}
+            trace_events.append(trace_event)
+
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, file_path):
+        """ """
+        with open(file_path, "w") as file:
+            json.dump(self.get_chrome_trace(), file)
+
+# importer wide profiler
+profiler = Profiler()
+
+def enable_profiling(reset = True):
+    """ """
+    if reset:
+        profiler.reset()
+    profiler.enabled = True
+
+def disable_profiling():
+    """ """
+    profiler.enabled = False
+
+def phase(name, descriptor = ""):
+    """ See Profiler.phase() """
+    return profiler.phase(name, descriptor)
@@ -0,0 +1,128 @@
+import os
+
+import BlenderDataBakerDescriptor as baked_data_descriptor
+
+# extensions of the files descriptors reference, the only ones indexed
+REFERENCED_EXTENSIONS = (".fbx", ".exr", ".png")
+
+def split_path_key(path):
+    """ Lowercase parts of a path written on any platform """
+    return [part for part in baked_data_descriptor.get_path_key(path).split("/") if part]
+
+def get_common_suffix_length(parts, other_parts):
+    """ Number of trailing parts both paths share """
+    length = 0
+    for part, other_part in zip(reversed(parts), reversed(other_parts)):
+        if part != other_part:
+            break
+        length += 1
+
+    return length
+
+def get_common_prefix_length(parts, other_parts):
+    """ """
+    length = 0
+    for part, other_part in zip(parts, other_parts):
+        if part != other_part:
+            break
+        length += 1
+
+    return length
+
+class FileIndex:
+    """ Referenced files of a content tree by lowercase file name, built with a single walk of the tree """
+    __slots__ = ("root_dir", "by_name")
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.by_name = {}
+
+        for dir_path, dir_names, file_names in os.walk(root_dir):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                if os.path.splitext(file_name)[1].lower() in REFERENCED_EXTENSIONS:
+                    self.by_name.setdefault(file_name.lower(), []).append(os.path.join(dir_path, file_name))
+
+    def get_file_count(self):
+        """ """
+        return sum(len(file_paths) for file_paths in self.by_name.values())
+
+class FileResolver:
+    """ Relocates the absolute paths descriptors were baked with (e.g. 'G:\\Unreal Projects\\...') to files of the local content tree
+
+    A referenced file resolves to the indexed file of the same name sharing the longest path suffix with it, the one
+    closest to the descriptor if several do. Files outside of the indexed tree, or only matching files of other bakes, are
+    only found at their original path.
+    """
+    __slots__ = ("index",)
+
+    def __init__(self, root_dir):
+        self.index = FileIndex(root_dir)
+
+    def resolve(self, path, descriptor_path):
+        """ Returns the local file path references from the descriptor at descriptor_path resolves to, None if there's none """
+        if not path:
+            return None
+
+        parts = split_path_key(path)
+        descriptor_parts = split_path_key(os.path.dirname(os.path.abspath(descriptor_path)))
+
+        def get_match(candidate):
+            candidate_parts = split_path_key(candidate)
+            suffix_length = get_common_suffix_length(parts, candidate_parts)
+            prefix_length = get_common_prefix_length(descriptor_parts, candidate_parts)
+            # files of the descriptor's bake (its folder and the sibling Meshes/Textures ones) always match, elsewhere the
+            # folders setting the candidate apart have to be the referenced ones, e.g. SDF/Blob's texture doesn't resolve
+            # to the file of the same name baked in SDF/Suzanne
+            if prefix_length < len(descriptor_parts) - 1 and suffix_length < len(candidate_parts) - prefix_length:
+                return None
+
+            return (suffix_length, prefix_length)
+
+        matches = []
+        for candidate in (self.index.by_name.get(parts[-1], ()) if parts else ()):
+            match = get_match(candidate)
+            if match is not None:
+                matches.append((match, candidate))
+
+        if not matches:
+            return path if os.path.exists(path) else None
+
+        return max(matches, key=lambda match: match[0])[1]
+
+    def resolve_baked_data(self, baked_data):
+        """ Points the mesh and textures of baked_data to their local files, returns the paths that couldn't be resolved """
+        items = list(baked_data.textures)
+        if baked_data.mesh is not None:
+            items.append(baked_data.mesh)
+
+        unresolved = []
+        for item in items:
+            if not item.path:
+                continue
+
+            resolved_path = self.resolve(item.path, baked_data.file_path)
+            if resolved_path is None:
+                unresolved.append(item.path)
+            else:
+                item.path = resolved_path
+
+        return unresolved
+
+# resolvers of the content trees already indexed, keyed by root directory
+file_resolvers = {}
+
+def get_file_resolver(root_dir, refresh = False):
+    """ Returns the resolver of root_dir, only walking the tree the first time or on refresh """
+    root_dir = os.path.abspath(root_dir)
+
+    resolver = file_resolvers.get(root_dir)
+    if resolver is None or refresh:
+        resolver = FileResolver(root_dir)
+        file_resolvers[root_dir] = resolver
+
+    return resolver
+
+def get_baked_data_root_dir(file_path):
+    """ Content tree of a single descriptor, the folder holding its Meshes/Textures folders """
+    return os.path.dirname(os.path.dirname(os.path.abspath(file_path)))
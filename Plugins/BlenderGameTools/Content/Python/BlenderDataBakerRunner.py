@@ -0,0 +1,463 @@
+""" Imports BakedData descriptors with several editor processes, each working on its own shard of destination folders
+
+The runner splits the descriptors, launches a worker per shard and merges their results:
+
+    python BlenderDataBakerRunner.py run --source <dir> --destination /Game/Baked --workers 4
+        --command "UnrealEditor-Cmd <project>.uproject -run=pythonscript -script=\\"{script} worker --shard {shard} --result {result}\\" -unattended -nullrhi"
+
+--workers accepts a list (e.g. 1,2,4) to measure the scaling efficiency of each worker count.
+Without --command workers are local python processes importing against BlenderDataBakerMockUnreal.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import BlenderDataBakerDescriptor as baked_data_descriptor
+import BlenderDataBakerResolver as baked_data_resolver
+
+# worker launched when no command is given, {python} {script} {shard} {result} and {index} are replaced
+DEFAULT_COMMAND = '"{python}" "{script}" worker --mock --shard "{shard}" --result "{result}"'
+
+##########
+# SHARDS #
+
+def get_destination_key(root_dir, file_path, import_mesh_subfolder):
+    """ Descriptors sharing a key are imported in the same destination folder, see BlenderDataBaker.get_baked_data_destination() """
+    relative_dir = Path(file_path).parent.relative_to(root_dir)
+    if import_mesh_subfolder and relative_dir.name == import_mesh_subfolder:
+        relative_dir = relative_dir.parent
+
+    return relative_dir.as_posix()
+
+def get_descriptor_cost(file_path, resolver):
+    """ Bytes of the descriptor and of the files it imports, used to balance the shards """
+    cost = os.path.getsize(file_path)
+    try:
+        baked_data = baked_data_descriptor.parse_baked_data(file_path)
+    except Exception:
+        return cost
+
+    resolver.resolve_baked_data(baked_data)
+
+    for path in baked_data.get_files():
+        if os.path.exists(path):
+            cost += os.path.getsize(path)
+
+    return cost
+
+def split_shards(file_paths, root_dir, num_shards, costs, import_mesh_subfolder = "Meshes"):
+    """ Splits the descriptors in at most num_shards lists, a destination folder is never split across shards
+
+    Folders are assigned largest first to the least loaded shard, descriptors keep their order within a shard.
+    """
+    groups = {}
+    for file_path in file_paths:
+        groups.setdefault(get_destination_key(root_dir, file_path, import_mesh_subfolder), []).append(file_path)
+
+    shard_costs = [0] * max(1, min(num_shards, len(groups)))
+    shard_keys = [[] for _ in shard_costs]
+    for key, group in sorted(groups.items(), key=lambda item: (-sum(costs[file_path] for file_path in item[1]), item[0])):
+        index = shard_costs.index(min(shard_costs))
+        shard_costs[index] += sum(costs[file_path] for file_path in group)
+        shard_keys[index].append(key)
+
+    order = {file_path: index for index, file_path in enumerate(file_paths)}
+    shards = []
+    for keys in shard_keys:
+        shards.append(sorted((file_path for key in keys for file_path in groups[key]), key=lambda file_path: order[file_path]))
+
+    return [shard for shard in shards if shard]
+
+##########
+# RUNNER #
+
+def launch_worker(command, index, shard_path, result_path, log_path):
+    """ """
+    worker_command = command.format(python=sys.executable, script=os.path.abspath(__file__), shard=shard_path, result=result_path, index=index)
+    log_file = open(log_path, "w")
+    process = subprocess.Popen(worker_command, shell=True, stdout=log_file, stderr=subprocess.STDOUT)
+    return (process, log_file)
+
+def write_json(file_path, data):
+    """ Replaces file_path at once, processes polling for it never read it partially written """
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "w") as file:
+        json.dump(data, file, indent=1)
+    os.replace(temp_path, file_path)
+
+def start_worker(index, file_paths, root_dir, destination, options, command, work_dir, role = "shard", clamps = None):
+    """ Writes the shard of a worker and launches it, returns (index, file_paths, result_path, process, log_file)
+
+    role is "shard", "prelude" (creates the parent materials) or "finalize" (grows their displacement clamps to clamps).
+    """
+    name = "shard_{}".format(index) if role == "shard" else role
+    shard_path = os.path.join(work_dir, name + ".json")
+    result_path = os.path.join(work_dir, name + ".result.json")
+    if os.path.exists(result_path):
+        os.remove(result_path)
+
+    shard = {"index": index, "role": role, "root_dir": root_dir, "destination": destination, "file_paths": file_paths, "options": options}
+    if clamps is not None:
+        shard["clamps"] = clamps
+
+    with open(shard_path, "w") as file:
+        json.dump(shard, file, indent=1)
+
+    return (index, file_paths, result_path) + launch_worker(command, index, shard_path, result_path, os.path.join(work_dir, name + ".log"))
+
+def read_worker_result(worker, exit_code):
+    """ """
+    index, file_paths, result_path, process, log_file = worker
+    try:
+        with open(result_path, "r") as file:
+            worker_result = json.load(file)
+    except (OSError, ValueError):
+        # a crashed worker fails its whole shard
+        worker_result = {"results": [[file_path, False, "Worker {} exited with code {}".format(index, exit_code)] for file_path in file_paths], "imported": [], "total": 0.0}
+
+    worker_result["index"] = index
+    worker_result["exit_code"] = exit_code
+    worker_result["count"] = len(file_paths)
+    return worker_result
+
+def run_workers(shards, root_dir, destination, options, command, work_dir):
+    """ Runs a worker per shard and waits for all of them, returns their results """
+    workers = [start_worker(index, file_paths, root_dir, destination, options, command, work_dir) for index, file_paths in enumerate(shards)]
+
+    return [wait_for_worker(worker) for worker in workers]
+
+def wait_for_worker(worker):
+    """ Returns the worker's result once it exited """
+    exit_code = worker[3].wait()
+    worker[4].close()
+    return read_worker_result(worker, exit_code)
+
+def get_parent_material_clamps(parent_materials, worker_results):
+    """ Returns {parent_material_path: displacement} of the parents whose clamp doesn't cover every import of the shards """
+    clamps = {}
+    for worker_result in worker_results:
+        for parent_material_path, displacement in worker_result.get("parent_material_displacements", {}).items():
+            if displacement > max(clamps.get(parent_material_path, 0.0), parent_materials.get(parent_material_path, 0.0)):
+                clamps[parent_material_path] = displacement
+
+    return clamps
+
+def run_shards(root_dir, destination, file_paths, num_workers, options, command = DEFAULT_COMMAND, work_dir = None):
+    """ Imports file_paths with num_workers worker processes
+
+    Parent materials are shared by every shard: they're created by a single prelude worker first and only loaded by the others.
+    Once the shards are done, a finalize worker grows the parents' displacement clamp to what they report, if any needs to.
+    Returns {"results", "total", "prelude", "clamps", "workers"}, results being a (file_path, success, msg) per descriptor in file_paths order.
+    """
+    if work_dir is None:
+        work_dir = tempfile.mkdtemp(prefix="BlenderDataBakerRunner")
+    elif not os.path.isdir(work_dir):
+        os.makedirs(work_dir)
+
+    start = time.perf_counter()
+
+    results = {}
+    prelude = None
+    prelude_total = 0.0
+    parent_materials = {}
+    remaining = list(file_paths)
+    if options.get("use_parent_material"):
+        prelude = start_worker(0, remaining, root_dir, destination, options, command, work_dir, role="prelude")
+
+    # shards are balanced while the prelude imports
+    resolver = baked_data_resolver.get_file_resolver(root_dir, True)
+    costs = {file_path: get_descriptor_cost(file_path, resolver) for file_path in remaining}
+
+    if prelude is not None:
+        prelude_result = wait_for_worker(prelude)
+        prelude_total = time.perf_counter() - start
+
+        for file_path, success, msg in prelude_result["results"]:
+            results[file_path] = (file_path, success, msg)
+
+        # a failed prelude would leave every worker without parent materials
+        if prelude_result["exit_code"] != 0 or not prelude_result.get("parent_materials_ready", False):
+            for file_path in remaining:
+                results.setdefault(file_path, (file_path, False, "Parent materials couldn't be prepared"))
+            remaining = []
+
+        imported = set(prelude_result["imported"])
+        remaining = [file_path for file_path in remaining if file_path not in imported]
+        parent_materials = prelude_result.get("parent_materials", {})
+
+    shards = split_shards(remaining, root_dir, num_workers, costs, options.get("import_mesh_subfolder", "Meshes"))
+
+    worker_results = run_workers(shards, root_dir, destination, dict(options, parent_materials_read_only=bool(options.get("use_parent_material"))), command, work_dir) if shards else []
+    for worker_result in worker_results:
+        for file_path, success, msg in worker_result["results"]:
+            results[file_path] = (file_path, success, msg)
+
+    # @NOTE a short lived worker rather than keeping the prelude's editor waiting on the shards, it only runs if a clamp has to grow
+    clamps = get_parent_material_clamps(parent_materials, worker_results) if prelude is not None else {}
+    finalize_exit_code = 0
+    if clamps:
+        finalize_exit_code = wait_for_worker(start_worker(0, [], root_dir, destination, options, command, work_dir, role="finalize", clamps=clamps))["exit_code"]
+
+    total = time.perf_counter() - start
+
+    merged = [results.get(file_path, (file_path, False, "Not imported")) for file_path in file_paths]
+    workers = [{"index": worker_result["index"], "count": worker_result["count"], "cost": sum(costs[file_path] for file_path in shard), "total": worker_result["total"], "exit_code": worker_result["exit_code"]}
+               for worker_result, shard in zip(worker_results, shards)]
+
+    return {"results": merged, "total": total, "prelude": prelude_total, "finalize_exit_code": finalize_exit_code, "clamps": clamps, "workers": workers, "work_dir": work_dir}
+
+def get_scaling(runs):
+    """ Returns (workers, total, speedup, efficiency) per run, relative to the run with the fewest workers """
+    runs = sorted(runs, key=lambda run: run[0])
+    if not runs:
+        return []
+
+    base_workers, base_run = runs[0]
+    scaling = []
+    for num_workers, run in runs:
+        speedup = base_run["total"] / run["total"] if run["total"] > 0.0 else 0.0
+        scaling.append((num_workers, run["total"], speedup, speedup * base_workers / num_workers))
+
+    return scaling
+
+def print_run(run):
+    """ """
+    print("{:<8}{:>8}{:>14}{:>14}{:>6}".format("worker", "count", "MB", "total ms", "exit"))
+    for worker in run["workers"]:
+        print("{:<8}{:>8}{:>14.1f}{:>14.1f}{:>6}".format(worker["index"], worker["count"], worker["cost"] / 1e6, worker["total"] * 1000.0, worker["exit_code"]))
+
+    unsupported = {}
+    for file_path, success, msg in run["results"]:
+        if msg.startswith("Unsupported importer"):
+            unsupported[msg] = unsupported.get(msg, 0) + 1
+        elif not success:
+            print("FAILED: {} ({})".format(file_path, msg))
+    for msg, count in sorted(unsupported.items()):
+        print("SKIPPED: {} descriptors ({})".format(count, msg))
+
+    if run["finalize_exit_code"] != 0:
+        print("FAILED: finalize worker exited with code {}, clamps weren't grown: {}".format(run["finalize_exit_code"], run["clamps"]))
+
+    imported = sum(1 for _, success, _ in run["results"] if success)
+    print("imported {} descriptors in {:.1f} ms ({:.1f} ms prelude) with {} workers".format(imported, run["total"] * 1000.0, run["prelude"] * 1000.0, len(run["workers"])))
+
+##########
+# WORKER #
+
+def get_expected_signatures(importer, file_paths, options):
+    """ Groups the VAT descriptors by the parent material they're expected to use, returns {signature: file_paths}
+
+    Only descriptors are parsed, offsets don't change the signature and only size the displacement clamp the shards report.
+    """
+    numpy_available = importer.baked_data_textures.is_numpy_available()
+
+    groups = {}
+    for file_path in file_paths:
+        baked_data, msg = importer.load_baked_data(file_path)
+        if baked_data is None or baked_data.type != 'VAT':
+            continue
+
+        # encoding and decimation are assumed to succeed, imports whose parent doesn't exist get their own material
+        normal_encoding = options["normal_encoding"] if baked_data.get_texture("Normal") is not None else 0
+        frame_remap = options["decimation_tolerance"] > 0.0 and numpy_available
+        clip_table = bool(baked_data.animations) and numpy_available
+        settings = importer.get_material_settings_vat(baked_data, normal_encoding, frame_remap, None, None, clip_table)
+
+        groups.setdefault(importer.get_material_signature_vat(settings), []).append(file_path)
+
+    return groups
+
+def import_shard_file(importer, root_dir, destination, file_path, options):
+    """ """
+    baked_data_destination = importer.get_baked_data_destination(root_dir, file_path, destination, options["import_mesh_subfolder"])
+    success, msg = importer.import_baked_data(file_path, baked_data_destination, True, options["import_mesh_subfolder"], True, options["import_textures_subfolder"],
+                                             True, options["create_material_subfolder"], importer.get_default_material_name(file_path), "", options["force"],
+                                             options["use_parent_material"], options["compression_tolerance"], options["normal_encoding"], options["decimation_tolerance"])
+    return (baked_data_destination, success, msg)
+
+def run_prelude(importer, unreal, shard):
+    """ Creates every parent material the shards will share, importing a descriptor of each
+
+    Returns (results, imported, parent_materials), parent_materials being {parent_material_path: displacement clamp}.
+    """
+    options = shard["options"]
+    results = []
+    imported = []
+    parent_materials = {}
+    destinations = set()
+    for signature, file_paths in get_expected_signatures(importer, shard["file_paths"], options).items():
+        parent_material_path = importer.PARENT_MATERIAL_PATH.rstrip("/") + "/M_VAT_" + signature
+
+        # the first import of the group creates its parent, unless its encoding or decimation failed
+        for file_path in file_paths:
+            baked_data_destination, success, msg = import_shard_file(importer, shard["root_dir"], shard["destination"], file_path, options)
+            results.append((file_path, success, msg))
+            imported.append(file_path)
+            destinations.add(baked_data_destination)
+
+            parent_material = importer.parent_materials_vat.get(parent_material_path)
+            if parent_material is not None:
+                parent_materials[parent_material_path] = parent_material.get_editor_property("max_world_position_offset_displacement")
+                break
+
+    for baked_data_destination in sorted(destinations) + [importer.PARENT_MATERIAL_PATH]:
+        unreal.EditorAssetLibrary.save_directory(baked_data_destination, only_if_is_dirty=True, recursive=True)
+
+    return (results, imported, parent_materials)
+
+def grow_parent_material_clamps(importer, unreal, clamps):
+    """ Returns the parent materials grown, clamps only holds the ones the shards need larger than the prelude's clamp
+
+    @NOTE the displacement clamp can't be overridden per instance, the parents created by the prelude grow to cover the shards' imports
+    """
+    grown = []
+    for parent_material_path, displacement in sorted(clamps.items()):
+        parent_material = unreal.EditorAssetLibrary.load_asset(parent_material_path)
+        if parent_material is not None:
+            parent_material.set_editor_property("max_world_position_offset_displacement", displacement)
+            grown.append(parent_material_path)
+
+    if grown:
+        unreal.EditorAssetLibrary.save_directory(importer.PARENT_MATERIAL_PATH, only_if_is_dirty=True, recursive=True)
+
+    return grown
+
+def run_worker(shard_path, result_path, mock = False):
+    """ Imports a shard written by run_workers(), run inside the editor or against the unreal stand-in with mock """
+    with open(shard_path, "r") as file:
+        shard = json.load(file)
+
+    options = shard["options"]
+
+    if mock:
+        import BlenderDataBakerMockUnreal as mock_unreal
+        unreal = mock_unreal.install()
+    else:
+        import unreal
+
+    import BlenderDataBaker as importer
+    import BlenderDataBakerCache as baked_data_cache
+
+    # the prelude's parent materials, saved by another process
+    if mock and (options.get("parent_materials_read_only") or shard["role"] == "finalize"):
+        unreal.mounted_content += (importer.PARENT_MATERIAL_PATH.rstrip("/") + "/",)
+
+    if shard["role"] == "finalize":
+        start = time.perf_counter()
+        grown = grow_parent_material_clamps(importer, unreal, shard["clamps"])
+        write_json(result_path, {"results": [], "imported": [], "grown": grown, "total": time.perf_counter() - start})
+        return 0 if len(grown) == len(shard["clamps"]) else 1
+
+    # MF_VAT/MF_SelectTexCoords are plugin content every worker loads, only the shard's folders are ever saved
+    importer.parent_materials_read_only = bool(options.get("parent_materials_read_only"))
+
+    # the shared manifest is only written once, merged with the entries of the other workers
+    shared_manifest_path = importer.get_shared_import_manifest_path()
+    shared_entries = baked_data_cache.load_import_manifest(shared_manifest_path, importer.IMPORTER_VERSION)
+    importer.import_manifest_path = "{}.{}.json".format(os.path.splitext(shared_manifest_path)[0], "prelude" if shard["role"] == "prelude" else "shard_{}".format(shard["index"]))
+    baked_data_cache.save_import_manifest(importer.import_manifest_path, importer.IMPORTER_VERSION, shared_entries)
+
+    start = time.perf_counter()
+    worker_result = {"results": [], "imported": []}
+    if shard["role"] == "prelude":
+        results, imported, parent_materials = run_prelude(importer, unreal, shard)
+        worker_result["results"] = results
+        worker_result["imported"] = imported
+        worker_result["parent_materials"] = parent_materials
+        worker_result["parent_materials_ready"] = True
+    else:
+        destinations = set()
+        for file_path in shard["file_paths"]:
+            try:
+                baked_data_destination, success, msg = import_shard_file(importer, shard["root_dir"], shard["destination"], file_path, options)
+            except Exception as e:
+                baked_data_destination, success, msg = (None, False, "Import failed: " + str(e))
+
+            worker_result["results"].append((file_path, success, msg))
+            if success and baked_data_destination:
+                destinations.add(baked_data_destination)
+
+        for baked_data_destination in sorted(destinations):
+            unreal.EditorAssetLibrary.save_directory(baked_data_destination, only_if_is_dirty=True, recursive=True)
+
+        worker_result["parent_material_displacements"] = importer.parent_material_displacements
+
+    worker_result["total"] = time.perf_counter() - start
+
+    entries = baked_data_cache.load_import_manifest(importer.import_manifest_path, importer.IMPORTER_VERSION)
+    baked_data_cache.merge_import_manifest(shared_manifest_path, importer.IMPORTER_VERSION, {key: entry for key, entry in entries.items() if shared_entries.get(key) != entry})
+    baked_data_cache.clear_import_manifest(importer.import_manifest_path)
+
+    if mock:
+        worker_result["calls"] = unreal.recorder.get_calls()
+
+    write_json(result_path, worker_result)
+    return 0
+
+########
+# MAIN #
+
+def main(argv = None):
+    """ """
+    parser = argparse.ArgumentParser(description="BlenderDataBaker sharded import runner")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    run_parser = subparsers.add_parser("run", help="splits the descriptors in shards and imports them with worker processes")
+    run_parser.add_argument("--source", required=True, help="directory holding the descriptors")
+    run_parser.add_argument("--destination", default="/Game/BlenderGameTools", help="content folder the descriptors are imported in")
+    run_parser.add_argument("--workers", default="4", help="number of workers, a comma separated list measures the scaling of each")
+    run_parser.add_argument("--command", default=None, help="worker command, {python} {script} {shard} {result} and {index} are replaced. Defaults to a local process against the unreal stand-in")
+    run_parser.add_argument("--work-dir", default=None, help="where shards, results and worker logs are written")
+    run_parser.add_argument("--parent-materials", action="store_true", help="share parent materials, created by a prelude worker")
+    run_parser.add_argument("--normal-encoding", type=int, default=0, choices=(0, 8, 16), help="octahedral normal encoding bits")
+    run_parser.add_argument("--decimation", type=float, default=0.0, help="frame decimation tolerance, 0 disables it")
+    run_parser.add_argument("--force", action="store_true", help="re-imports up to date descriptors, implied when measuring several worker counts")
+    run_parser.add_argument("--json", help="writes the merged results and scaling to this file")
+
+    worker_parser = subparsers.add_parser("worker", help="imports a shard, launched by run")
+    worker_parser.add_argument("--shard", required=True)
+    worker_parser.add_argument("--result", required=True)
+    worker_parser.add_argument("--mock", action="store_true", help="imports against the recording unreal stand-in")
+
+    args = parser.parse_args(argv)
+
+    if args.mode == "worker":
+        return run_worker(args.shard, args.result, args.mock)
+
+    root_dir = os.path.abspath(args.source)
+    file_paths = sorted(str(file_path) for file_path in Path(root_dir).rglob("*.xml"))
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    command = args.command if args.command else DEFAULT_COMMAND
+
+    options = {"import_mesh_subfolder": "Meshes", "import_textures_subfolder": "Textures", "create_material_subfolder": "Materials",
+               "force": args.force or len(worker_counts) > 1, "use_parent_material": args.parent_materials,
+               "compression_tolerance": 0.001, "normal_encoding": args.normal_encoding, "decimation_tolerance": args.decimation}
+
+    runs = []
+    for num_workers in worker_counts:
+        run = run_shards(root_dir, args.destination, file_paths, num_workers, options, command, args.work_dir)
+        print_run(run)
+        print("")
+        runs.append((num_workers, run))
+
+    scaling = get_scaling(runs)
+    if len(scaling) > 1:
+        print("{:<8}{:>14}{:>10}{:>12}".format("workers", "total ms", "speedup", "efficiency"))
+        for num_workers, total, speedup, efficiency in scaling:
+            print("{:<8}{:>14.1f}{:>9.2f}x{:>11.0f}%".format(num_workers, total * 1000.0, speedup, efficiency * 100.0))
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"runs": [dict(run, workers_count=num_workers) for num_workers, run in runs],
+                       "scaling": [{"workers": num_workers, "total": total, "speedup": speedup, "efficiency": efficiency} for num_workers, total, speedup, efficiency in scaling]}, file, indent=2)
+
+    failed = any(not success and not msg.startswith("Unsupported importer") for _, run in runs for _, success, msg in run["results"])
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
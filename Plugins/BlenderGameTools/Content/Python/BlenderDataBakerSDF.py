@@ -0,0 +1,158 @@
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import BlenderDataBakerTextures as baked_data_textures
+
+# (name, unreal.TextureCompressionSettings member, bytes per texel) of single channel volume formats, from the most to the least precise
+SDF_FORMATS = (
+    ("R32F", "TC_SINGLE_FLOAT", 4),
+    ("R16F", "TC_HALF_FLOAT", 2),
+    ("G8", "TC_GRAYSCALE", 1),
+)
+
+SDF_FORMAT_LOSSLESS = SDF_FORMATS[0]
+
+# max reconstruction error of a distance a format may introduce, as a ratio of the descriptor's max_dist
+SDF_TOLERANCE = 0.001
+
+# tile orders written by the baker, rows then columns (e.g. BT_LR stacks slices from the bottom-left tile, row by row)
+TILE_ROW_ORDERS = ("TB", "BT")
+TILE_COLUMN_ORDERS = ("LR", "RL")
+
+##########
+# TILING #
+
+def get_tile_layout(texture, width, height):
+    """ Returns (columns, rows, msg), columns and rows being 0 if the slices don't fit the texture """
+    tiles = texture.tiles if texture.tiles else "TB_LR"
+    row_order, _, column_order = tiles.partition("_")
+    if row_order not in TILE_ROW_ORDERS or column_order not in TILE_COLUMN_ORDERS:
+        return (0, 0, "unsupported tile order: " + tiles)
+
+    if texture.x <= 0 or texture.y <= 0 or texture.z <= 0:
+        return (0, 0, "invalid volume size")
+
+    if width % texture.x or height % texture.y:
+        return (0, 0, "{}x{} texture isn't made of {}x{} tiles".format(width, height, texture.x, texture.y))
+
+    columns = width // texture.x
+    rows = height // texture.y
+    if texture.slices and texture.slices != columns:
+        return (0, 0, "{} slices per row, {} found".format(texture.slices, columns))
+
+    if columns * rows < texture.z:
+        return (0, 0, "{} tiles for {} slices".format(columns * rows, texture.z))
+
+    return (columns, rows, "")
+
+def get_volume(values, texture, columns, rows):
+    """ Returns the (z, y, x) volume stored in the tiles of a (height, width) texture channel """
+    # (row, column, y, x) tiles, rows from the top of the file
+    tiles = values.reshape(rows, texture.y, columns, texture.x).transpose(0, 2, 1, 3)
+
+    row_order, _, column_order = (texture.tiles if texture.tiles else "TB_LR").partition("_")
+    if row_order == "BT":
+        tiles = tiles[::-1]
+    if column_order == "RL":
+        tiles = tiles[:, ::-1]
+
+    return tiles.reshape(rows * columns, texture.y, texture.x)[:texture.z]
+
+def tile_volume(volume, columns):
+    """ Lays a (z, y, x) volume out as the 2D source of a VolumeTexture: tiles row by row from the top-left, slice 0 first """
+    size_z, size_y, size_x = volume.shape
+    rows = (size_z + columns - 1) // columns
+
+    tiles = np.zeros((rows * columns, size_y, size_x), dtype=volume.dtype)
+    tiles[:size_z] = volume
+
+    return np.ascontiguousarray(tiles.reshape(rows, columns, size_y, size_x).transpose(0, 2, 1, 3).reshape(rows * size_y, columns * size_x))
+
+#############
+# DISTANCES #
+
+def get_distances(values, texture):
+    """ Distances in the descriptor's units """
+    # @NOTE REMAPPED distances map [-max_dist, max_dist] to [0, 1]
+    if texture.distance == "REMAPPED":
+        return (values * np.float32(2.0) - np.float32(1.0)) * np.float32(texture.max_dist)
+
+    return values
+
+def get_distance_remap(sdf_format, max_dist):
+    """ (scale, bias) decoding a sampled value of the format back to a distance """
+    if sdf_format[0] == "G8":
+        return (2.0 * max_dist, -max_dist)
+
+    return (1.0, 0.0)
+
+def encode_distances(distances, sdf_format, max_dist):
+    """ Values written to the volume's source for the format, see get_distance_remap() """
+    scale, bias = get_distance_remap(sdf_format, max_dist)
+    return ((distances - np.float32(bias)) / np.float32(scale)).astype(np.float32)
+
+def get_sdf_format_errors(distances, max_dist):
+    """ Returns the max absolute error of the distances each format introduces """
+    errors = {}
+    errors["R32F"] = 0.0
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        half = distances.astype(np.float16).astype(np.float32)
+        errors["R16F"] = float(np.max(np.abs(half - distances)))
+
+        if max_dist > 0.0:
+            scale, bias = get_distance_remap(("G8",), max_dist)
+            normalized = np.round(np.clip((distances - np.float32(bias)) / np.float32(scale), 0.0, 1.0) * np.float32(255.0)) / np.float32(255.0)
+            errors["G8"] = float(np.max(np.abs(normalized * np.float32(scale) + np.float32(bias) - distances)))
+        else:
+            errors["G8"] = np.inf
+
+    # overflowed halfs and NaNs can't be reconstructed at all
+    return {name: np.inf if np.isnan(error) else error for name, error in errors.items()}
+
+###########
+# CONVERT #
+
+def convert_sdf_texture(texture, output_dir, tolerance = SDF_TOLERANCE):
+    """ Reads the tiled slices of an SDF texture once and writes them re-tiled as a VolumeTexture expects, returns its TextureFormat
+
+    The cheapest format whose max error stays within tolerance * max_dist is picked, the returned format has no path if
+    the texture couldn't be converted.
+    """
+    channels, msg = baked_data_textures.read_texture_channels(texture)
+    if channels is None:
+        return baked_data_textures.TextureFormat(SDF_FORMAT_LOSSLESS, texture.width, texture.height, msg=msg)
+
+    values = channels[0][1]
+    height, width = values.shape
+    columns, rows, msg = get_tile_layout(texture, width, height)
+    if not columns:
+        return baked_data_textures.TextureFormat(SDF_FORMAT_LOSSLESS, width, height, msg=msg)
+
+    distances = get_distances(get_volume(values, texture, columns, rows), texture)
+    max_dist = texture.max_dist if texture.max_dist > 0.0 else float(np.max(np.abs(distances)))
+
+    errors = get_sdf_format_errors(distances, max_dist)
+    selected = SDF_FORMAT_LOSSLESS
+    for sdf_format in SDF_FORMATS:
+        if errors[sdf_format[0]] <= tolerance * max_dist and sdf_format[2] < selected[2]:
+            selected = sdf_format
+
+    tiled = tile_volume(encode_distances(distances, selected, max_dist), columns)
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    # same file name so the imported source keeps its name
+    output_path = os.path.join(output_dir, os.path.splitext(os.path.basename(texture.path))[0] + ".exr")
+    baked_data_textures.write_exr(output_path, {"R": tiled})
+
+    texture_format = baked_data_textures.TextureFormat(selected, tiled.shape[1], tiled.shape[0], errors, path=output_path)
+    texture_format.source_height = height
+    texture_format.tile_size = (texture.x, texture.y, texture.z)
+    texture_format.distance_remap = get_distance_remap(selected, max_dist)
+    return texture_format
@@ -0,0 +1,448 @@
+import os
+import struct
+import zlib
+
+# @NOTE numpy isn't shipped with every editor install, textures then keep the lossless TC_HDR_F32
+try:
+    import numpy as np
+    import BlenderDataBakerCodecs as baked_data_codecs
+except ImportError:
+    np = None
+
+def is_numpy_available():
+    """ Modules built on numpy still import without it, callers check this before using them and fall back to lossless imports """
+    return np is not None
+
+#######
+# EXR #
+
+EXR_MAGIC = 20000630
+
+EXR_COMPRESSION_NONE = 0
+EXR_COMPRESSION_ZIPS = 2
+EXR_COMPRESSION_ZIP = 3
+
+# scanlines stored per chunk
+EXR_LINES_PER_CHUNK = {EXR_COMPRESSION_NONE: 1, EXR_COMPRESSION_ZIPS: 1, EXR_COMPRESSION_ZIP: 16}
+
+EXR_PIXEL_TYPES = {0: "<u4", 1: "<f2", 2: "<f4"}
+
+def read_exr_string(data, offset):
+    """ Returns (string, offset after the null terminator) """
+    end = data.index(b"\0", offset)
+    return (data[offset:end].decode("ascii"), end + 1)
+
+def read_exr_header(data):
+    """ Returns (attributes, offset of the chunk offset table), raises ValueError for unsupported files """
+    magic, version = struct.unpack_from("<ii", data, 0)
+    if magic != EXR_MAGIC:
+        raise ValueError("Not an OpenEXR file")
+
+    # single part scanline files only
+    if version & 0x200 or version & 0x1000:
+        raise ValueError("Tiled and multi-part OpenEXR files aren't supported")
+
+    attributes = {}
+    offset = 8
+    while data[offset] != 0:
+        name, offset = read_exr_string(data, offset)
+        type, offset = read_exr_string(data, offset)
+        size = struct.unpack_from("<i", data, offset)[0]
+        offset += 4
+        value = data[offset:offset + size]
+        offset += size
+
+        if type == "chlist":
+            channels = []
+            channel_offset = 0
+            while value[channel_offset] != 0:
+                channel_name, channel_offset = read_exr_string(value, channel_offset)
+                pixel_type, _, x_sampling, y_sampling = struct.unpack_from("<iiii", value, channel_offset)
+                channel_offset += 16
+                channels.append((channel_name, pixel_type, x_sampling, y_sampling))
+            attributes[name] = channels
+        elif type == "compression":
+            attributes[name] = value[0]
+        elif type == "box2i":
+            attributes[name] = struct.unpack("<iiii", value)
+        else:
+            attributes[name] = value
+
+    return (attributes, offset + 1)
+
+def decompress_exr_zip(data, size):
+    """ Reverses the zlib, predictor and byte interleaving of ZIP/ZIPS chunks """
+    data = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+    if len(data) != size:
+        raise ValueError("Corrupted OpenEXR chunk")
+
+    # predictor, each byte was stored as the difference with the previous one + 128
+    data = ((np.cumsum(data.astype(np.int64) - 128) + 128) & 0xff).astype(np.uint8)
+
+    # bytes were split between even and odd positions
+    interleaved = np.empty(size, dtype=np.uint8)
+    half = (size + 1) // 2
+    interleaved[0::2] = data[:half]
+    interleaved[1::2] = data[half:]
+    return interleaved.tobytes()
+
+def read_exr(file_path):
+    """ Returns the channels of a scanline OpenEXR file as float32 (height, width) arrays keyed by name """
+    with open(file_path, "rb") as file:
+        data = file.read()
+
+    attributes, offset = read_exr_header(data)
+
+    compression = attributes.get("compression", EXR_COMPRESSION_NONE)
+    if compression not in EXR_LINES_PER_CHUNK:
+        raise ValueError("Unsupported OpenEXR compression: {}".format(compression))
+
+    x_min, y_min, x_max, y_max = attributes["dataWindow"]
+    width = x_max - x_min + 1
+    height = y_max - y_min + 1
+
+    channels = attributes["channels"]
+    for channel_name, pixel_type, x_sampling, y_sampling in channels:
+        if pixel_type not in EXR_PIXEL_TYPES or x_sampling != 1 or y_sampling != 1:
+            raise ValueError("Unsupported OpenEXR channel: {}".format(channel_name))
+
+    # one scanline interleaves every channel, in the (alphabetical) chlist order
+    scanline_dtype = np.dtype([(channel_name, EXR_PIXEL_TYPES[pixel_type], (width,)) for channel_name, pixel_type, _, _ in channels])
+
+    lines_per_chunk = EXR_LINES_PER_CHUNK[compression]
+    num_chunks = (height + lines_per_chunk - 1) // lines_per_chunk
+    chunk_offsets = np.frombuffer(data, dtype="<u8", count=num_chunks, offset=offset)
+
+    scanlines = np.empty(height, dtype=scanline_dtype)
+    for chunk_offset in chunk_offsets:
+        chunk_offset = int(chunk_offset)
+        y, size = struct.unpack_from("<ii", data, chunk_offset)
+        line = y - y_min
+        num_lines = min(lines_per_chunk, height - line)
+        chunk = data[chunk_offset + 8:chunk_offset + 8 + size]
+
+        # chunks that wouldn't shrink are stored as-is
+        uncompressed_size = scanline_dtype.itemsize * num_lines
+        if compression != EXR_COMPRESSION_NONE and size < uncompressed_size:
+            chunk = decompress_exr_zip(chunk, uncompressed_size)
+
+        scanlines[line:line + num_lines] = np.frombuffer(chunk, dtype=scanline_dtype, count=num_lines)
+
+    return {channel_name: scanlines[channel_name].astype(np.float32) for channel_name, _, _, _ in channels}
+
+def get_exr_attribute(name, type, value):
+    """ """
+    return name.encode("ascii") + b"\0" + type.encode("ascii") + b"\0" + struct.pack("<i", len(value)) + value
+
+def write_exr(file_path, channels):
+    """ Writes float32 (height, width) arrays keyed by channel name as an uncompressed scanline OpenEXR file """
+    channel_names = sorted(channels)
+    height, width = channels[channel_names[0]].shape
+
+    chlist = b"".join(channel_name.encode("ascii") + b"\0" + struct.pack("<iB3xii", 2, 0, 1, 1) for channel_name in channel_names) + b"\0"
+    window = struct.pack("<iiii", 0, 0, width - 1, height - 1)
+
+    header = struct.pack("<ii", EXR_MAGIC, 2)
+    header += get_exr_attribute("channels", "chlist", chlist)
+    header += get_exr_attribute("compression", "compression", bytes([EXR_COMPRESSION_NONE]))
+    header += get_exr_attribute("dataWindow", "box2i", window)
+    header += get_exr_attribute("displayWindow", "box2i", window)
+    header += get_exr_attribute("lineOrder", "lineOrder", bytes([0]))
+    header += get_exr_attribute("pixelAspectRatio", "float", struct.pack("<f", 1.0))
+    header += get_exr_attribute("screenWindowCenter", "v2f", struct.pack("<ff", 0.0, 0.0))
+    header += get_exr_attribute("screenWindowWidth", "float", struct.pack("<f", 1.0))
+    header += b"\0"
+
+    scanline_size = 4 * width * len(channel_names)
+    chunks_offset = len(header) + 8 * height
+    chunk_offsets = chunks_offset + np.arange(height, dtype="<u8") * (8 + scanline_size)
+
+    # each chunk is the line number, the data size, then the line of every channel
+    scanlines = np.empty((height, 8 + scanline_size), dtype=np.uint8)
+    scanlines[:, 0:4] = np.arange(height, dtype="<i4").view(np.uint8).reshape(height, 4)
+    scanlines[:, 4:8] = np.frombuffer(struct.pack("<i", scanline_size), dtype=np.uint8)
+    for index, channel_name in enumerate(channel_names):
+        start = 8 + index * 4 * width
+        scanlines[:, start:start + 4 * width] = np.ascontiguousarray(channels[channel_name], dtype="<f4").view(np.uint8).reshape(height, 4 * width)
+
+    with open(file_path, "wb") as file:
+        file.write(header)
+        file.write(chunk_offsets.tobytes())
+        file.write(scanlines.tobytes())
+
+#######
+# PNG #
+
+def get_png_chunk(type, data):
+    """ """
+    return struct.pack(">I", len(data)) + type + data + struct.pack(">I", zlib.crc32(type + data) & 0xffffffff)
+
+def write_png_16(file_path, values):
+    """ Writes a (height, width) uint16 array as a 16-bit grayscale PNG, or a (height, width, 3 or 4) one as RGB(A) """
+    height, width = values.shape[:2]
+    num_channels = values.shape[2] if values.ndim == 3 else 1
+    color_type = {1: 0, 3: 2, 4: 6}[num_channels]
+
+    # every row starts with its filter type, 0 for none
+    rows = np.zeros((height, 1 + 2 * width * num_channels), dtype=np.uint8)
+    rows[:, 1:] = np.ascontiguousarray(values, dtype=">u2").view(np.uint8).reshape(height, 2 * width * num_channels)
+
+    with open(file_path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n")
+        file.write(get_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 16, color_type, 0, 0, 0)))
+        file.write(get_png_chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        file.write(get_png_chunk(b"IEND", b""))
+
+###################
+# TEXTURE FORMATS #
+
+# (name, unreal.TextureCompressionSettings member, bytes per texel) from the most to the least precise
+TEXTURE_FORMATS = (
+    ("HDR_F32", "TC_HDR_F32", 16),
+    ("HDR", "TC_HDR", 8),
+    # @NOTE there's no RGBA16 unorm compression setting, textures are converted to 16-bit PNGs imported uncompressed (see TextureFormat.is_uncompressed())
+    ("UNORM16", "TC_DEFAULT", 8),
+    ("UNORM8", "TC_VECTOR_DISPLACEMENTMAP", 4),
+)
+
+TEXTURE_FORMAT_LOSSLESS = TEXTURE_FORMATS[0]
+
+# octahedral normal encodings by bits per component, see encode_normal_texture()
+NORMAL_ENCODINGS = {
+    # float_16_15 layout in a single float channel
+    16: ("OCT16", "TC_SINGLE_FLOAT", 4),
+    # 8 + 8 bits in a 16-bit grayscale channel
+    8: ("OCT8", "TC_GRAYSCALE", 2),
+}
+
+class TextureFormat:
+    """ Format picked for an imported texture, errors are in the decoded (remapped back) units
+
+    path is the file to import, a converted copy of the source for UNORM16, encoded or decimated textures.
+    """
+    __slots__ = ("name", "compression", "bytes_per_texel", "max_error", "errors", "width", "height", "msg", "path", "angular_error", "type", "source_height", "frames",
+                 "tile_size", "distance_remap", "ancestors")
+
+    def __init__(self, texture_format, width = 0, height = 0, errors = None, msg = "", path = None):
+        self.name, self.compression, self.bytes_per_texel = texture_format
+        self.errors = errors if errors is not None else {}
+        self.max_error = self.errors.get(self.name, 0.0)
+        self.width = width
+        self.height = height
+        self.msg = msg
+        self.path = path
+        # (max, mean) in degrees for encoded normals
+        self.angular_error = None
+        # texture type the imported file is bound to in the material
+        self.type = None
+        # height before frame decimation and (kept, total) frames of decimated textures
+        self.source_height = height
+        self.frames = None
+        # (x, y, z) slice size and (scale, bias) decoding distances of re-tiled SDF volumes
+        self.tile_size = None
+        self.distance_remap = None
+        # AncestorLookup of ObjectAttributes ancestor lookups
+        self.ancestors = None
+
+    def get_normal_encoding(self):
+        """ Bits per component of octahedral encoded normals, 0 if not encoded """
+        for bits, (name, _, _) in NORMAL_ENCODINGS.items():
+            if name == self.name:
+                return bits
+
+        return 0
+
+    def is_uncompressed(self):
+        """ Converted 16-bit PNGs keep their precision only if imported without compression """
+        return self.name == "UNORM16"
+
+    def get_memory_size(self):
+        """ """
+        return self.width * self.height * self.bytes_per_texel
+
+    def get_memory_saved(self):
+        """ Bytes saved compared to TC_HDR_F32 of the source texture """
+        return self.width * self.source_height * TEXTURE_FORMAT_LOSSLESS[2] - self.get_memory_size()
+
+def get_texture_channels(channels):
+    """ Returns the (name, values) of the R, G, B and A channels present in the file, in that order """
+    return [(channel_name, channels[channel_name]) for channel_name in ("R", "G", "B", "A") if channel_name in channels]
+
+def get_channel_remaps(texture, channel_names):
+    """ Returns the (scales, offsets) decoding stored values back to the descriptor's units, (range, range_offset) of remapped channels
+
+    Returns None if a channel is remapped without a valid range, its stored values can't be decoded.
+    """
+    scales = []
+    offsets = []
+    for index, channel_name in enumerate(channel_names):
+        scale, offset = 1.0, 0.0
+
+        channel = texture.channels.get(channel_name)
+        if channel is not None and channel.remapped:
+            if not channel.range or channel.range_valid is False:
+                return None
+            scale = channel.range
+            offset = channel.range_offset if channel.range_offset is not None else 0.0
+        elif texture.remapped and index < 3:
+            if texture.range is None:
+                return None
+            scale = texture.range[index]
+            offset = texture.range_offset[index] if texture.range_offset is not None else 0.0
+
+        scales.append(scale)
+        offsets.append(offset)
+
+    return (np.array(scales, dtype=np.float64), np.array(offsets, dtype=np.float64))
+
+def is_texture_packed(texture):
+    """ Textures holding bit packed values (e.g. three_smallest quaternions in a single channel) must stay lossless """
+    channels = list(texture.channels.values())
+    for _, row_channels in texture.row_channels:
+        channels.extend(row_channels)
+
+    # hierarchy indices are only exact as stored
+    if any(channel.mode == "HIERARCHY" for channel in channels):
+        return True
+
+    # quaternions stored in a single channel are encoded, other rotation modes use one channel per component
+    return sum(1 for channel in channels if channel.mode == "ROTATION") == 1
+
+def get_format_errors(values, remaps = None):
+    """ Returns the max absolute error per channel each format introduces, values being a (texels, channels) array
+
+    Errors are measured on the values decoded with remaps, the (scales, offsets) of get_channel_remaps(). Normalized
+    formats store the remapped [0, 1] values, values outside of it are clamped.
+    """
+    scales, offsets = remaps if remaps is not None else (np.ones(values.shape[1]), np.zeros(values.shape[1]))
+
+    def decode(stored):
+        return stored.astype(np.float64) * scales + offsets
+
+    decoded = decode(values)
+
+    errors = {}
+    errors["HDR_F32"] = np.zeros(values.shape[1])
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        half = values.astype(np.float16).astype(np.float32)
+        errors["HDR"] = np.max(np.abs(decode(half) - decoded), axis=0)
+
+        for name, levels in (("UNORM16", 65535.0), ("UNORM8", 255.0)):
+            normalized = np.round(np.clip(values, 0.0, 1.0) * np.float32(levels)) / np.float32(levels)
+            errors[name] = np.max(np.abs(decode(normalized) - decoded), axis=0)
+
+    # overflowed halfs and NaNs can't be reconstructed at all
+    return {name: np.where(np.isnan(error), np.inf, error).astype(np.float64) for name, error in errors.items()}
+
+def read_texture_channels(texture):
+    """ Returns (channels, msg), channels being the (name, values) of the texture's R, G, B and A channels or None """
+    try:
+        channels = get_texture_channels(read_exr(texture.path))
+    except (OSError, ValueError, KeyError, struct.error, zlib.error) as e:
+        return (None, "couldn't read texture: " + str(e))
+
+    if not channels:
+        return (None, "no RGBA channel")
+
+    return (channels, "")
+
+def write_unorm16_texture(texture, output_dir, values, width, height):
+    """ Writes the (texels, channels) [0, 1] values as a 16-bit PNG in output_dir, returns its path """
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    # same file name so the imported asset keeps its name
+    output_path = os.path.join(output_dir, os.path.splitext(os.path.basename(texture.path))[0] + ".png")
+
+    # PNGs hold 1, 3 or 4 channels, a missing blue channel is left empty
+    if values.shape[1] == 2:
+        values = np.concatenate((values, np.zeros((values.shape[0], 1), dtype=values.dtype)), axis=1)
+
+    stored = np.round(np.clip(values, 0.0, 1.0) * np.float32(65535.0)).astype(np.uint16)
+    write_png_16(output_path, stored.reshape(height, width, -1) if stored.shape[1] > 1 else stored.reshape(height, width))
+    return output_path
+
+def analyze_texture(texture, tolerance, output_dir = None):
+    """ Returns the cheapest TextureFormat whose max reconstruction error is within tolerance
+
+    UNORM16 is only picked with an output_dir, the texture is then converted to a 16-bit PNG written there.
+    """
+    if not is_numpy_available():
+        return TextureFormat(TEXTURE_FORMAT_LOSSLESS, msg="numpy isn't available", path=texture.path)
+
+    if is_texture_packed(texture):
+        return TextureFormat(TEXTURE_FORMAT_LOSSLESS, texture.width, texture.height, msg="packed data", path=texture.path)
+
+    channels, msg = read_texture_channels(texture)
+    if channels is None:
+        return TextureFormat(TEXTURE_FORMAT_LOSSLESS, texture.width, texture.height, msg=msg, path=texture.path)
+
+    height, width = channels[0][1].shape
+
+    # errors of remapped values can't be measured in the descriptor's units without their range
+    remaps = get_channel_remaps(texture, [channel_name for channel_name, _ in channels])
+    if remaps is None:
+        return TextureFormat(TEXTURE_FORMAT_LOSSLESS, width, height, msg="remapped without a valid range", path=texture.path)
+
+    values = np.stack([channel_values.reshape(-1) for _, channel_values in channels], axis=1)
+    errors = {name: float(np.max(error)) for name, error in get_format_errors(values, remaps).items()}
+
+    selected = TEXTURE_FORMAT_LOSSLESS
+    for texture_format in TEXTURE_FORMATS:
+        name, compression, bytes_per_texel = texture_format
+        if errors[name] > tolerance or (name == "UNORM16" and not output_dir):
+            continue
+        if bytes_per_texel < selected[2]:
+            selected = texture_format
+
+    path = texture.path
+    if selected[0] == "UNORM16":
+        path = write_unorm16_texture(texture, output_dir, values, width, height)
+
+    return TextureFormat(selected, width, height, errors, path=path)
+
+def encode_normal_texture(texture, output_dir, bits, tolerance):
+    """ Converts a normal texture to octahedral coordinates written in output_dir, returns its TextureFormat
+
+    Falls back to analyze_texture() if the texture can't be converted.
+    """
+    if not is_numpy_available() or bits not in NORMAL_ENCODINGS:
+        return analyze_texture(texture, tolerance)
+
+    channels, msg = read_texture_channels(texture)
+    if channels is None or len(channels) < 3:
+        return analyze_texture(texture, tolerance)
+
+    height, width = channels[0][1].shape
+    normals = np.stack([channel_values for _, channel_values in channels[:3]], axis=-1)
+    if texture.remapped:
+        normals = normals * np.float32(2.0) - np.float32(1.0)
+
+    # 16-bit mode only has 15 bits left for the second component
+    bits_x, bits_y = (16, 15) if bits == 16 else (8, 8)
+    encoded = baked_data_codecs.encode_octahedral(normals, bits_x, bits_y)
+
+    # padding texels are left empty by the baker, they don't count in the error
+    valid = np.any(normals != 0.0, axis=-1)
+    angular_errors = baked_data_codecs.get_angular_errors(normals[valid], baked_data_codecs.decode_octahedral(encoded[valid], bits_x, bits_y))
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    # same file name so the imported asset keeps its name
+    stem = os.path.splitext(os.path.basename(texture.path))[0]
+    if bits == 16:
+        output_path = os.path.join(output_dir, stem + ".exr")
+        write_exr(output_path, {"R": baked_data_codecs.pack_uint_16_15(encoded[..., 0], encoded[..., 1])})
+    else:
+        output_path = os.path.join(output_dir, stem + ".png")
+        write_png_16(output_path, ((encoded[..., 0] << np.uint32(8)) | encoded[..., 1]).astype(np.uint16))
+
+    texture_format = TextureFormat(NORMAL_ENCODINGS[bits], width, height, path=output_path)
+    if angular_errors.size:
+        texture_format.angular_error = (float(np.max(angular_errors)), float(np.mean(angular_errors)))
+    else:
+        texture_format.angular_error = (0.0, 0.0)
+
+    return texture_format
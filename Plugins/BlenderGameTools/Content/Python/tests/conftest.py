@@ -0,0 +1,68 @@
+""" Tests run outside of Unreal against BlenderDataBakerMockUnreal, installed before anything imports BlenderDataBaker """
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
+
+import BlenderDataBakerMockUnreal as mock_unreal
+
+SAVED_DIR = tempfile.mkdtemp(prefix="BlenderDataBakerTests")
+MOCK = mock_unreal.install(SAVED_DIR)
+
+# sample bakes shipped with the repository
+SOURCE_DIR = os.path.normpath(os.path.join(PYTHON_DIR, "..", "..", "..", "..", "Source"))
+
+def pytest_unconfigure(config):
+    shutil.rmtree(SAVED_DIR, ignore_errors=True)
+
+@pytest.fixture
+def unreal():
+    """ The unreal stand-in, without assets nor recorded calls """
+    MOCK.reset()
+    return MOCK
+
+@pytest.fixture
+def importer(unreal):
+    """ BlenderDataBaker with an empty import manifest and no cached material """
+    import BlenderDataBaker as importer
+
+    importer.clear_import_manifest()
+    importer.parent_materials_vat.clear()
+    return importer
+
+@pytest.fixture
+def source_dir():
+    """ """
+    if not os.path.isdir(SOURCE_DIR):
+        pytest.skip("sample bakes aren't available")
+
+    return SOURCE_DIR
+
+def copy_bake(source_dir, bake_dir, output_dir):
+    """ Copies a sample bake (e.g. VAT/Sequence) to output_dir, returns its descriptor """
+    output_dir = os.path.join(output_dir, *bake_dir.split("/"))
+    shutil.copytree(os.path.join(source_dir, *bake_dir.split("/")), output_dir)
+    return next(os.path.join(dir_path, file_name) for dir_path, _, file_names in os.walk(output_dir) for file_name in file_names if file_name.endswith(".xml"))
+
+def copy_vat_bake(source_dir, output_dir, ID = None, bake_dir = "VAT/Sequence"):
+    """ Copies a VAT sample, its descriptor pointing at the copied files and using ID if given """
+    descriptor = copy_bake(source_dir, bake_dir, output_dir)
+    copied_dir = os.path.dirname(os.path.dirname(descriptor))
+
+    with open(descriptor, "r") as file:
+        data = file.read()
+    source_path = re.escape("\\".join(bake_dir.split("/")))
+    data = re.sub(r'path="[^"]*\\' + source_path + r'\\([^"]*)"', lambda match: 'path="{}"'.format(os.path.join(copied_dir, *match.group(1).split("\\"))), data)
+    if ID is not None:
+        data = re.sub(r'ID="[^"]*"', 'ID="{}"'.format(ID), data, count=1)
+    with open(descriptor, "w") as file:
+        file.write(data)
+
+    return descriptor
@@ -0,0 +1,109 @@
+import types
+
+import numpy as np
+
+import BlenderDataBakerAtlas as atlas
+import BlenderDataBakerTextures as textures
+
+from conftest import copy_vat_bake
+
+def get_bake(tmp_path, name, width, height, frames = 4, sampling = "STACK_SINGLE"):
+    """ Stands in for a VAT BakedData whose Offset/Normal textures are filled with distinct values """
+    rng = np.random.default_rng(len(name) * 1000 + width * 10 + height)
+
+    texture_list = []
+    for texture_type in atlas.ATLAS_TEXTURE_TYPES:
+        file_path = str(tmp_path / "T_{}_{}.exr".format(name, texture_type))
+        textures.write_exr(file_path, {channel_name: rng.random((height, width)).astype(np.float32) for channel_name in ("R", "G", "B", "A")})
+        texture_list.append(types.SimpleNamespace(type=texture_type, path=file_path))
+
+    baked_data = types.SimpleNamespace(textures=texture_list, frames=types.SimpleNamespace(count=frames, padded=0, sampling=sampling))
+    baked_data.get_texture = lambda texture_type: next((texture for texture in texture_list if texture.type == texture_type), None)
+    return baked_data
+
+def test_pack_rectangles_doesnt_overlap():
+    sizes = [(30, 8), (12, 20), (40, 4), (7, 7), (12, 20), (25, 16)]
+    positions, atlas_sizes = atlas.pack_rectangles(sizes, 64)
+
+    assert len(atlas_sizes) == 1
+    occupied = np.zeros((atlas_sizes[0][1], atlas_sizes[0][0]), dtype=int)
+    for (atlas_index, x, y), (width, height) in zip(positions, sizes):
+        occupied[y:y + height, x:x + width] += 1
+
+    assert np.max(occupied) == 1
+
+def test_pack_rectangles_skips_rectangles_larger_than_max_size():
+    positions, atlas_sizes = atlas.pack_rectangles([(16, 16), (80, 8)], 64)
+
+    assert positions[0] is not None and positions[1] is None
+    assert atlas_sizes == [(16, 16)]
+
+def test_build_vat_atlases_regions(tmp_path):
+    baked_datas = [get_bake(tmp_path, "A", 16, 8), get_bake(tmp_path, "B", 8, 12, frames=3), get_bake(tmp_path, "C", 8, 8, sampling="CONTINUOUS")]
+    atlases, regions, msgs = atlas.build_vat_atlases(baked_datas, str(tmp_path / "Atlas"), "Test")
+
+    assert len(atlases) == 1 and atlases[0].count == 2
+    assert regions[2] is None and msgs[2] == "frames don't map to whole rows"
+
+    for baked_data, region in zip(baked_datas[:2], regions[:2]):
+        assert (region.atlas_width, region.atlas_height) == (atlases[0].width, atlases[0].height)
+
+        for texture_type, file_path in atlases[0].paths.items():
+            source = textures.read_exr(baked_data.get_texture(texture_type).path)
+            packed = textures.read_exr(file_path)
+            for channel_name, values in source.items():
+                assert np.array_equal(packed[channel_name][region.y:region.y + region.height, region.x:region.x + region.width], values)
+
+def test_atlas_region_uv_scale_and_offset(tmp_path):
+    baked_datas = [get_bake(tmp_path, "A", 16, 8), get_bake(tmp_path, "B", 8, 12, frames=3)]
+    atlases, regions, _ = atlas.build_vat_atlases(baked_datas, str(tmp_path / "Atlas"), "Test")
+
+    # the bake's own 0-1 UVs land on its texels
+    for region in regions:
+        scale_u, scale_v = region.get_uv_scale()
+        offset_u, offset_v = region.get_uv_offset()
+
+        assert (offset_u * atlases[0].width, offset_v * atlases[0].height) == (region.x, region.y)
+        assert np.isclose((offset_u + scale_u) * atlases[0].width, region.x + region.width)
+        assert np.isclose((offset_v + scale_v) * atlases[0].height, region.y + region.height)
+
+def test_atlas_import_skips_up_to_date_bakes(importer, unreal, source_dir, tmp_path):
+    copy_vat_bake(source_dir, str(tmp_path / "A"), ID="A")
+    descriptor = copy_vat_bake(source_dir, str(tmp_path / "B"), ID="B", bake_dir="VAT/MultiObjects")
+
+    report = importer.import_baked_atlas(str(tmp_path), "/Game/Tests/")
+    assert [(success, msg) for _, success, msg in report] == [(True, ""), (True, "")]
+
+    # a material per bake, unless asked for parent materials
+    assert isinstance(unreal.get_asset("/Game/Tests/A/VAT/Sequence/Materials/M_BakedMesh_VAT"), unreal.Material)
+
+    assert {msg for _, _, msg in importer.import_baked_atlas(str(tmp_path), "/Game/Tests/")} == {"Up to date, skipped"}
+    assert {msg for _, _, msg in importer.import_baked_atlas(str(tmp_path), "/Game/Tests/", force=True)} == {""}
+
+    # changing one bake repacks them all
+    with open(descriptor, "a") as descriptor_file:
+        descriptor_file.write("\n")
+    assert {msg for _, _, msg in importer.import_baked_atlas(str(tmp_path), "/Game/Tests/")} == {""}
+
+    # so does deleting an atlas
+    atlas_paths = [asset_path for asset_path in unreal.assets if "T_{}_".format(tmp_path.name) in asset_path]
+    assert atlas_paths and unreal.remove_asset(atlas_paths[0])
+    assert {msg for _, _, msg in importer.import_baked_atlas(str(tmp_path), "/Game/Tests/")} == {""}
+
+def test_bakes_left_out_of_atlases_get_the_import_options(importer, source_dir, tmp_path, monkeypatch):
+    copy_vat_bake(source_dir, str(tmp_path / "A"), ID="A")
+
+    tolerances = []
+    get_texture_formats = importer.get_texture_formats
+    def record_tolerance(baked_data, compression_tolerance, *args, **kwargs):
+        tolerances.append(compression_tolerance)
+        return get_texture_formats(baked_data, compression_tolerance, *args, **kwargs)
+
+    monkeypatch.setattr(importer, "get_texture_formats", record_tolerance)
+
+    # no bake fits a 1 texel atlas
+    report = importer.import_baked_atlas(str(tmp_path), "/Game/Tests/", max_atlas_size=1, compression_tolerance=0.5)
+    assert [(success, msg) for _, success, msg in report] == [(True, "")]
+    assert tolerances == [0.5]
+
+    assert {msg for _, _, msg in importer.import_baked_atlas(str(tmp_path), "/Game/Tests/", max_atlas_size=1, compression_tolerance=0.5)} == {"Up to date, skipped"}
@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+import BlenderDataBakerCache as cache
+
+VERSION = "test"
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    """ """
+    return str(tmp_path / "BlenderGameTools" / "ImportManifest.json")
+
+def write_file(file_path, data):
+    """ """
+    with open(file_path, "wb") as file:
+        file.write(data)
+    return str(file_path)
+
+def test_manifest_round_trip(manifest_path):
+    entries = {"A": {"files": {}, "destination": "/Game/A/", "options": "1", "assets": []}}
+    cache.save_import_manifest(manifest_path, VERSION, entries)
+
+    assert cache.load_import_manifest(manifest_path, VERSION) == entries
+
+    # entries of other importer versions are dropped
+    assert cache.load_import_manifest(manifest_path, "other") == {}
+
+def test_load_import_manifest_of_missing_or_corrupt_files(manifest_path):
+    assert cache.load_import_manifest(manifest_path, VERSION) == {}
+
+    os.makedirs(os.path.dirname(manifest_path))
+    write_file(manifest_path, b"{ not json")
+    assert cache.load_import_manifest(manifest_path, VERSION) == {}
+
+def test_fingerprints_reuse_hashes_of_unchanged_files(tmp_path):
+    file_path = write_file(tmp_path / "T_Offset.exr", b"offsets")
+    fingerprint = cache.get_file_fingerprint(file_path)
+
+    assert fingerprint["hash"] == cache.get_file_hash(file_path)
+    assert fingerprint["size"] == len(b"offsets")
+
+    # size and mtime didn't change, the previous hash is trusted
+    previous = dict(fingerprint, hash="previous")
+    assert cache.get_file_fingerprint(file_path, previous)["hash"] == "previous"
+
+    assert cache.get_file_fingerprint(str(tmp_path / "missing.exr")) is None
+
+def test_is_baked_data_up_to_date(tmp_path):
+    file_path = write_file(tmp_path / "T_Offset.exr", b"offsets")
+    fingerprints = cache.get_baked_data_fingerprints([file_path])
+    entry = cache.create_manifest_entry(fingerprints, "/Game/A/", "1", ["/Game/A/T_Offset.T_Offset", "/Game/A/T_Offset.T_Offset"])
+
+    assert entry["assets"] == ["/Game/A/T_Offset.T_Offset"]
+    assert cache.is_baked_data_up_to_date(entry, fingerprints, "/Game/A/", "1")
+
+    assert not cache.is_baked_data_up_to_date(None, fingerprints, "/Game/A/", "1")
+    assert not cache.is_baked_data_up_to_date(entry, fingerprints, "/Game/B/", "1")
+    assert not cache.is_baked_data_up_to_date(entry, fingerprints, "/Game/A/", "2")
+
+    # content changed, mtime and size alone aren't trusted
+    write_file(file_path, b"OFFSETS")
+    assert not cache.is_baked_data_up_to_date(entry, cache.get_baked_data_fingerprints([file_path]), "/Game/A/", "1")
+
+    # a file went missing
+    os.remove(file_path)
+    assert not cache.is_baked_data_up_to_date(entry, cache.get_baked_data_fingerprints([file_path]), "/Game/A/", "1")
+
+def test_merge_import_manifest_keeps_the_entries_of_every_worker(manifest_path):
+    cache.save_import_manifest(manifest_path, VERSION, {"A": {"options": "old"}, "B": {"options": "1"}})
+
+    # workers merge their own entries one after the other
+    assert cache.merge_import_manifest(manifest_path, VERSION, {"A": {"options": "new"}})
+    assert cache.merge_import_manifest(manifest_path, VERSION, {"C": {"options": "1"}})
+
+    assert cache.load_import_manifest(manifest_path, VERSION) == {"A": {"options": "new"}, "B": {"options": "1"}, "C": {"options": "1"}}
+    assert not os.path.exists(manifest_path + ".lock")
+
+def test_merge_import_manifest_waits_for_the_lock(manifest_path):
+    cache.save_import_manifest(manifest_path, VERSION, {"A": {}})
+    write_file(manifest_path + ".lock", b"")
+
+    assert not cache.merge_import_manifest(manifest_path, VERSION, {"B": {}}, timeout=0.1)
+
+    # the manifest wasn't touched, the lock is left to its owner
+    assert cache.load_import_manifest(manifest_path, VERSION) == {"A": {}}
+    assert os.path.exists(manifest_path + ".lock")
+
+def test_merge_import_manifest_into_a_new_manifest(manifest_path):
+    assert cache.merge_import_manifest(manifest_path, VERSION, {"A": {"options": "1"}})
+
+    with open(manifest_path, "r") as file:
+        assert json.load(file) == {"version": VERSION, "entries": {"A": {"options": "1"}}}
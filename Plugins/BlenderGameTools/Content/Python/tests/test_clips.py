@@ -0,0 +1,197 @@
+import os
+import types
+
+import numpy as np
+import pytest
+
+import BlenderDataBakerClips as clips
+import BlenderDataBakerTextures as textures
+
+from conftest import copy_vat_bake
+
+def get_offsets(positions):
+    """ (frames, vertices, 3) offsets of vertices moving along x to positions[frame] """
+    offsets = np.zeros((len(positions), 4, 3), dtype=np.float32)
+    offsets[:, :, 0] = np.array(positions, dtype=np.float32)[:, None]
+    return offsets
+
+##############
+# DECIMATION #
+
+def test_decimate_clip_keeps_the_ends_of_linear_motion():
+    offsets = get_offsets(np.linspace(0.0, 10.0, 11))
+
+    assert clips.decimate_clip(offsets, None, 0, 10, 0.001, 1.0) == [0, 10]
+
+def test_decimate_clip_keeps_turning_points():
+    # out and back, the far point can't be interpolated
+    offsets = get_offsets([0.0, 1.0, 2.0, 3.0, 4.0, 3.0, 2.0, 1.0, 0.0])
+
+    assert clips.decimate_clip(offsets, None, 0, 8, 0.001, 1.0) == [0, 4, 8]
+
+def test_decimate_clip_stays_within_tolerance():
+    offsets = get_offsets(np.sin(np.linspace(0.0, np.pi, 40)) * 10.0)
+    tolerance = 0.05
+
+    kept = clips.decimate_clip(offsets, None, 0, 39, tolerance, 1.0)
+
+    assert kept[0] == 0 and kept[-1] == 39 and len(kept) < 40
+    for frame, next_frame in zip(kept[:-1], kept[1:]):
+        if next_frame - frame >= 2:
+            assert np.max(clips.get_interpolation_errors(offsets, frame, next_frame)) <= tolerance
+
+def test_decimate_clip_checks_normals():
+    offsets = get_offsets(np.zeros(5))
+
+    # still vertices whose normals turn a quarter around z, unevenly
+    angles = np.radians([0.0, 5.0, 60.0, 65.0, 90.0])
+    normals = np.zeros((5, 4, 3), dtype=np.float32)
+    normals[:, :, 0] = np.cos(angles)[:, None]
+    normals[:, :, 1] = np.sin(angles)[:, None]
+
+    assert clips.decimate_clip(offsets, None, 0, 4, 0.001, 1.0) == [0, 4]
+
+    kept = clips.decimate_clip(offsets, normals, 0, 4, 0.001, 1.0)
+    assert kept[0] == 0 and kept[-1] == 4 and len(kept) > 2
+    for frame, next_frame in zip(kept[:-1], kept[1:]):
+        if next_frame - frame >= 2:
+            assert np.max(clips.get_normal_interpolation_errors(normals, frame, next_frame)) <= 1.0
+
+def test_get_frame_remap():
+    remap = clips.get_frame_remap(6, [0, 3, 5])
+
+    assert remap.dtype == np.float32
+    assert remap.tolist() == [
+        [0, 0, 0.0],
+        [0, 1, pytest.approx(1.0 / 3.0)],
+        [0, 1, pytest.approx(2.0 / 3.0)],
+        [1, 1, 0.0],
+        [1, 2, 0.5],
+        [2, 2, 0.0],
+    ]
+
+def test_get_frame_remap_interpolates_the_original_frames():
+    offsets = get_offsets(np.linspace(0.0, 10.0, 9))
+    kept_frames = clips.decimate_clip(offsets, None, 0, 8, 0.001, 1.0)
+    remap = clips.get_frame_remap(9, kept_frames)
+
+    kept_offsets = offsets[kept_frames]
+    rows_a, rows_b, alpha = remap[:, 0].astype(int), remap[:, 1].astype(int), remap[:, 2]
+    interpolated = kept_offsets[rows_a] + (kept_offsets[rows_b] - kept_offsets[rows_a]) * alpha[:, None, None]
+
+    assert np.allclose(interpolated, offsets, atol=1e-5)
+
+def test_decimation_keeps_the_frames_of_overlapping_clips(multi_objects, tmp_path):
+    offset_channels, _ = textures.read_texture_channels(multi_objects.get_texture("Offset"))
+    frames = np.stack([values for _, values in offset_channels[:3]], axis=-1).reshape(clips.get_num_frames(multi_objects), -1, 3)
+    tolerance = 100.0
+
+    # Cube_Idle spans the frames of the other clips
+    clip_ranges = clips.get_clip_frame_ranges(multi_objects)
+    assert (0, 108) in clip_ranges and len(clip_ranges) > 1
+
+    decimation = clips.decimate_vat_textures(multi_objects, str(tmp_path / "Decimated"), tolerance, 180.0)
+    assert decimation.msg == "" and len(decimation.kept_frames) < decimation.num_frames
+
+    for start_frame, end_frame in clip_ranges:
+        assert set(clips.decimate_clip(frames, None, start_frame, end_frame, tolerance, 180.0)) <= set(decimation.kept_frames)
+
+    max_error = 0.0
+    for frame, next_frame in zip(decimation.kept_frames[:-1], decimation.kept_frames[1:]):
+        if next_frame - frame >= 2:
+            max_error = max(max_error, float(np.max(clips.get_interpolation_errors(frames, frame, next_frame))))
+    assert max_error <= tolerance
+    assert decimation.max_error == pytest.approx(max_error)
+
+##########
+# BOUNDS #
+
+@pytest.fixture
+def multi_objects(importer, source_dir, tmp_path):
+    """ Sample bake with several clips """
+    baked_data, msg = importer.load_baked_data(copy_vat_bake(source_dir, str(tmp_path / "Source"), bake_dir="VAT/MultiObjects"))
+    assert baked_data is not None, msg
+    return baked_data
+
+def test_get_clip_bounds(multi_objects):
+    offset_channels, _ = textures.read_texture_channels(multi_objects.get_texture("Offset"))
+    offsets = np.stack([values for _, values in offset_channels[:3]], axis=-1)
+    num_frames = clips.get_num_frames(multi_objects)
+    frames = offsets.reshape(num_frames, -1, 3)
+
+    bounds, clip_bounds, msg = clips.get_clip_bounds(multi_objects)
+
+    assert msg == ""
+    assert np.allclose(bounds.negative, np.maximum(-np.min(frames.reshape(-1, 3), axis=0), 0.0))
+    assert np.allclose(bounds.positive, np.maximum(np.max(frames.reshape(-1, 3), axis=0), 0.0))
+
+    # a clip per animation, indexed like the clip table
+    assert [clip.name for clip in clip_bounds] == [animation.name for animation in multi_objects.animations]
+    for clip, animation in zip(clip_bounds, multi_objects.animations):
+        clip_offsets = frames[animation.start_frame:animation.end_frame + 1].reshape(-1, 3)
+        assert (clip.start_frame, clip.end_frame) == (animation.start_frame, animation.end_frame)
+        assert np.allclose(clip.positive, np.maximum(np.max(clip_offsets, axis=0), 0.0))
+        assert clip.max_displacement == pytest.approx(float(np.max(np.abs(clip_offsets))))
+        assert clip.max_displacement <= bounds.max_displacement
+
+def test_get_clip_bounds_clamps_to_limit(multi_objects):
+    limit = ((0.01, 0.01, 0.01), (0.02, 0.02, 0.02))
+    bounds, clip_bounds, _ = clips.get_clip_bounds(multi_objects, limit=limit)
+
+    for clip in [bounds] + clip_bounds:
+        assert all(value <= 0.01 for value in clip.negative)
+        assert all(value <= 0.02 for value in clip.positive)
+
+def test_clip_bounds_round_trip(multi_objects, tmp_path):
+    bounds, clip_bounds, _ = clips.get_clip_bounds(multi_objects)
+
+    file_path = clips.get_generated_texture_path(multi_objects.get_texture("Offset"), str(tmp_path), "ClipBounds")
+    clips.write_clip_bounds(file_path, bounds, clip_bounds)
+
+    loaded_bounds, loaded_clip_bounds = clips.load_clip_bounds(file_path)
+    assert loaded_bounds.to_dict() == bounds.to_dict()
+    assert [clip.to_dict() for clip in loaded_clip_bounds] == [clip.to_dict() for clip in clip_bounds]
+
+    # texel (clip, 0) is the negative extension, (clip, 1) the positive one
+    channels = textures.read_exr(file_path)
+    assert channels["R"].shape == (2, len(clip_bounds))
+    for index, clip in enumerate(clip_bounds):
+        assert channels["R"][0, index] == pytest.approx(clip.negative[0])
+        assert channels["B"][1, index] == pytest.approx(clip.positive[2])
+        assert channels["A"][1, index] == pytest.approx(clip.max_displacement)
+
+def test_load_clip_bounds_without_file(tmp_path):
+    assert clips.load_clip_bounds(str(tmp_path / "T_Missing_ClipBounds.exr")) == (None, [])
+
+##############
+# CLIP TABLE #
+
+def test_clip_table_round_trip(multi_objects, tmp_path):
+    file_path = str(tmp_path / "T_BakedMesh.VAT_ClipTable.exr")
+    names = clips.write_clip_table(file_path, multi_objects)
+
+    assert names == [animation.name for animation in multi_objects.animations]
+
+    channels = textures.read_exr(file_path)
+    assert channels["R"].shape == (1, len(names))
+    for index, animation in enumerate(multi_objects.animations):
+        start_frame, end_frame = clips.get_animation_frame_range(multi_objects, animation)
+        assert channels["R"][0, index] == start_frame
+        assert channels["G"][0, index] == end_frame
+        assert channels["B"][0, index] == end_frame - start_frame + 1
+        assert channels["A"][0, index] == pytest.approx(multi_objects.frames.rate)
+
+def test_clip_table_of_clips_outside_of_the_textures(multi_objects):
+    multi_objects.animations[0].start_frame = 1000
+    multi_objects.animations[0].end_frame = 1010
+
+    names, values = clips.get_clip_table(multi_objects)
+
+    # the clip keeps its index, without frames
+    assert names[0] == multi_objects.animations[0].name
+    assert values[0, 0].tolist() == [0.0, 0.0, 0.0, 0.0]
+
+def test_get_generated_texture_path_of_windows_paths(tmp_path):
+    offset_texture = types.SimpleNamespace(path="G:\\Unreal Projects\\Source\\VAT\\Textures\\T_BakedMesh.VAT_Offset.exr")
+
+    assert clips.get_generated_texture_path(offset_texture, str(tmp_path), "ClipTable") == os.path.join(str(tmp_path), "T_BakedMesh.VAT_ClipTable.exr")
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+import BlenderDataBakerBenchmark as benchmark
+import BlenderDataBakerCodecs as codecs
+import BlenderDataBakerHierarchy as hierarchy
+
+@pytest.fixture(scope="module")
+def data():
+    """ """
+    return benchmark.get_test_data(5000, seed=1)
+
+def test_codecs_match_references(data):
+    # the scalar references are straight ports of Doc/*.hlsl
+    assert benchmark.check_codecs(data, 2000) == []
+
+def test_float_11_10_10_round_trip(data):
+    min_xyz, max_xyz = data["min"], data["max"]
+    x, y, z = codecs.unpack_float_11_10_10(codecs.pack_float_11_10_10(data["x"], data["y"], data["z"], min_xyz, max_xyz), min_xyz, max_xyz)
+
+    # values are floored to their level, at most a level off
+    for values, decoded, bits, axis in ((data["x"], x, 11, 0), (data["y"], y, 10, 1), (data["z"], z, 10, 2)):
+        level = (max_xyz[axis] - min_xyz[axis]) / ((1 << bits) - 1)
+        assert np.max(np.abs(decoded - values)) <= level * 1.001
+
+def test_float_16_15_round_trip(data):
+    min_xy, max_xy = data["min"][:2], data["max"][:2]
+    x, y = codecs.unpack_float_16_15(codecs.pack_float_16_15(data["x"], data["y"], min_xy, max_xy), min_xy, max_xy)
+
+    assert np.max(np.abs(x - data["x"])) <= (max_xy[0] - min_xy[0]) / ((1 << 16) - 1) * 1.001
+    assert np.max(np.abs(y - data["y"])) <= (max_xy[1] - min_xy[1]) / ((1 << 15) - 1) * 1.001
+
+def test_float_frac_round_trip(data):
+    x, z = codecs.unpack_float_frac(codecs.pack_float_frac(data["x"], data["z"], 0.0, 1.0, 0.99), 0.0, 1.0, 0.99)
+
+    assert np.array_equal(x, np.floor(data["x"]))
+    assert np.max(np.abs(z - data["z"])) < 1e-3
+
+def test_pivot_painter_index_round_trip():
+    # indices survive the half float texels they're stored in
+    indices = np.arange(0, 1024)
+    packed = codecs.pack_pivot_painter_index(indices).astype(np.float16)
+
+    assert np.array_equal(codecs.unpack_pivot_painter_index(packed), indices)
+
+def test_pivot_painter_index_round_trip():
+    # every index the ancestor lookup packs survives the half float texels it's stored in
+    indices = np.arange(0, hierarchy.MAX_PACKED_INDEX + 1)
+    packed = codecs.pack_pivot_painter_index(indices).astype(np.float16)
+
+    assert np.array_equal(codecs.unpack_pivot_painter_index(packed), indices)
+
+    # the next one decodes as infinity
+    with np.errstate(over="ignore"):
+        packed = codecs.pack_pivot_painter_index([hierarchy.MAX_PACKED_INDEX + 1]).astype(np.float16)
+    assert np.isinf(packed[0])
+
+def test_three_smallest_round_trip(data):
+    quats = data["quats"]
+    decoded = codecs.decode_three_smallest(codecs.encode_three_smallest(quats))
+
+    # q and -q are the same rotation
+    dot = np.abs(np.sum(decoded * quats, axis=-1))
+    assert np.min(dot) > 0.999
+
+@pytest.mark.parametrize("bits_x, bits_y, max_error", [(16, 15, 0.05), (8, 8, 1.0)])
+def test_octahedral_round_trip(bits_x, bits_y, max_error):
+    rng = np.random.default_rng(2)
+    normals = codecs.normalize(rng.normal(size=(4000, 3)).astype(np.float32))
+
+    # poles and the octahedron's edges fold differently, cover them too
+    axes = np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1], [1, 1, 0], [-1, -1, 0]], dtype=np.float32)
+    normals = np.concatenate((normals, codecs.normalize(axes)))
+
+    encoded = codecs.encode_octahedral(normals, bits_x, bits_y)
+    assert np.max(encoded[..., 0]) < (1 << bits_x) and np.max(encoded[..., 1]) < (1 << bits_y)
+
+    decoded = codecs.decode_octahedral(encoded, bits_x, bits_y)
+    assert np.allclose(np.linalg.norm(decoded, axis=-1), 1.0, atol=1e-5)
+
+    angular_errors = codecs.get_angular_errors(normals, decoded)
+    assert np.max(angular_errors) < max_error
@@ -0,0 +1,80 @@
+import os
+
+import BlenderDataBakerDescriptor as baked_data_descriptor
+
+from conftest import copy_bake, copy_vat_bake
+
+def test_parse_baked_data(source_dir, tmp_path):
+    descriptor = copy_vat_bake(source_dir, str(tmp_path))
+    baked_data = baked_data_descriptor.parse_baked_data(descriptor)
+
+    assert baked_data.ID == "2e54ada86d7245bc8280afede66825ad"
+    assert (baked_data.type, baked_data.type_name) == ("VAT", "VertexAnimationTextures")
+    assert baked_data.file_path == descriptor
+
+    assert baked_data.unit.scale == 100.0 and baked_data.unit.invert_y and not baked_data.unit.invert_x
+    assert (baked_data.frames.count, baked_data.frames.rate) == (14, 24.0)
+    assert baked_data.mesh.uv_index == 1
+    assert baked_data.mesh.bounds_offset_max == (417.6148986816406, 0.0, 57.90278625488281)
+
+    offset = baked_data.get_texture("Offset")
+    assert (offset.mode, offset.width, offset.height, offset.remapped) == ("OFFSET", 24, 14, False)
+    assert baked_data.get_texture("Normal").remapped
+    assert baked_data.get_texture("Missing") is None
+
+    # ranges the baker failed to format fall back to the default
+    assert offset.range is None and offset.range_offset is None
+
+    assert baked_data.get_files() == [baked_data.mesh.path, offset.path, baked_data.get_texture("Normal").path]
+    assert all(os.path.exists(file_path) for file_path in baked_data.get_files())
+
+def test_get_bake_type():
+    assert baked_data_descriptor.get_bake_type("VertexAnimationTextures") == "VAT"
+    assert baked_data_descriptor.get_bake_type("ObjectAttributes") == "OA"
+    assert baked_data_descriptor.get_bake_type("VAT") == "VAT"
+    assert baked_data_descriptor.get_bake_type("Unknown") is None
+    assert baked_data_descriptor.get_bake_type(None) is None
+
+def test_index_update_only_parses_changed_descriptors(source_dir, tmp_path):
+    root_dir = tmp_path / "Source"
+    descriptor = copy_vat_bake(source_dir, str(root_dir))
+    copy_bake(source_dir, "VAT/MultiObjects", str(root_dir))
+    index_path = str(tmp_path / "Index.json")
+
+    index = baked_data_descriptor.build_baked_data_index(str(root_dir), index_path)
+    assert len(index.entries) == 2
+
+    # a new index reads the saved one, nothing changed
+    index = baked_data_descriptor.BakedDataIndex(index_path)
+    assert len(index.entries) == 2
+    assert index.update(str(root_dir)) == 0
+
+    with open(descriptor, "a") as file:
+        file.write("\n")
+    assert index.update(str(root_dir)) == 1
+
+    # removed descriptors leave the index
+    os.remove(descriptor)
+    assert index.update(str(root_dir)) == 0
+    assert index.get("2e54ada86d7245bc8280afede66825ad") is None
+    assert len(index.entries) == 1
+
+def test_index_find(source_dir, tmp_path):
+    copy_vat_bake(source_dir, str(tmp_path))
+    copy_bake(source_dir, "SDF/Suzanne", str(tmp_path))
+    index = baked_data_descriptor.build_baked_data_index(str(tmp_path))
+
+    vat_IDs = index.find(type="VAT")
+    assert vat_IDs == ["2e54ada86d7245bc8280afede66825ad"]
+    assert index.find(type="VertexAnimationTextures") == vat_IDs
+    assert len(index.find(type="SDF")) == 1
+    assert len(index.find()) == 2
+
+    # by file name or full path, whatever the separators and case
+    assert index.find(texture="t_bakedmesh.vat_offset.exr") == vat_IDs
+    mesh_path = index.get(vat_IDs[0])["mesh"]
+    assert index.find(mesh=mesh_path.replace("/", "\\")) == vat_IDs
+    assert index.find(type="SDF", mesh=mesh_path) == []
+
+    assert index.load(vat_IDs[0]).ID == vat_IDs[0]
+    assert index.load("missing") is None
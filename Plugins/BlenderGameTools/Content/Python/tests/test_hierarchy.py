@@ -0,0 +1,46 @@
+import numpy as np
+
+import BlenderDataBakerCodecs as codecs
+import BlenderDataBakerHierarchy as hierarchy
+import BlenderDataBakerTextures as textures
+
+# 0 and 5 are roots: 0 < 1 < 2 < 3 < 4 and 5 < 6, 7 has an invalid parent
+PARENTS = hierarchy.get_parents(np.array([0, 0, 1, 2, 3, 5, 5, 99], dtype=np.int32), 8)
+
+def test_invalid_parents_are_roots():
+    assert np.array_equal(PARENTS, [0, 0, 1, 2, 3, 5, 5, 7])
+
+def test_ancestors_stop_at_the_root():
+    ancestors = hierarchy.get_ancestors(PARENTS, 8)
+
+    assert ancestors.shape == (4, 8)
+    assert np.array_equal(ancestors[:, 4], [3, 2, 1, 0])
+    assert np.array_equal(ancestors[:, 2], [1, 0, 0, 0])
+    assert np.array_equal(ancestors[:, 6], [5, 5, 5, 5])
+
+def test_ancestors_follow_the_depth_limit():
+    ancestors = hierarchy.get_ancestors(PARENTS, 2)
+
+    assert np.array_equal(ancestors, hierarchy.get_ancestors(PARENTS, 8)[:2])
+
+def test_flat_hierarchy_has_no_ancestors():
+    assert hierarchy.get_ancestors(np.arange(5, dtype=np.int32), 5).shape == (0, 5)
+
+def test_ancestor_rows_are_written_in_blocks_of_four(tmp_path):
+    # 5 levels, 2 blocks of a 4x3 texture for 10 elements
+    parents = np.concatenate(([0], np.arange(9, dtype=np.int32)))
+    ancestors = hierarchy.get_ancestors(parents, 5)
+    file_path = str(tmp_path / "T_Ancestors.exr")
+
+    hierarchy.write_ancestor_rows(file_path, ancestors, 4, 3)
+
+    channels = textures.read_exr(file_path)
+    for level in range(5):
+        block, channel_index = divmod(level, hierarchy.ANCESTORS_PER_FETCH)
+        # the texels stored as half floats, like the imported texture
+        values = channels["RGBA"[channel_index]][block * 3:(block + 1) * 3].astype(np.float16)
+        assert np.array_equal(codecs.unpack_pivot_painter_index(values).reshape(-1)[:10], ancestors[level])
+
+    # padding texels and unused channels are left empty
+    assert not np.any(channels["R"][:3].reshape(-1)[10:])
+    assert not np.any(channels["B"][3:])
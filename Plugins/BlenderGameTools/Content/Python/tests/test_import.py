@@ -0,0 +1,167 @@
+from conftest import copy_bake, copy_vat_bake
+
+def get_results(report):
+    """ """
+    return {msg for _, success, msg in report if success}, [(file_path, msg) for file_path, success, msg in report if not success]
+
+def test_import_baked_directory_skips_up_to_date_bakes(importer, unreal, source_dir, tmp_path):
+    copy_vat_bake(source_dir, str(tmp_path))
+
+    msgs, failures = get_results(importer.import_baked_directory(str(tmp_path), "/Game/Tests/"))
+    assert failures == [] and "Up to date, skipped" not in msgs
+    num_assets = len(unreal.assets)
+
+    msgs, failures = get_results(importer.import_baked_directory(str(tmp_path), "/Game/Tests/"))
+    assert failures == [] and msgs == {"Up to date, skipped"}
+    assert len(unreal.assets) == num_assets
+
+    # forced imports ignore the manifest
+    msgs, _ = get_results(importer.import_baked_directory(str(tmp_path), "/Game/Tests/", force=True))
+    assert "Up to date, skipped" not in msgs
+
+def test_deleted_assets_are_imported_again(importer, unreal, source_dir, tmp_path):
+    copy_vat_bake(source_dir, str(tmp_path))
+    importer.import_baked_directory(str(tmp_path), "/Game/Tests/")
+
+    texture_paths = [asset_path for asset_path in unreal.assets if "T_BakedMesh_VAT_Offset" in asset_path]
+    assert len(texture_paths) == 1
+    assert unreal.remove_asset(texture_paths[0])
+
+    msgs, failures = get_results(importer.import_baked_directory(str(tmp_path), "/Game/Tests/"))
+    assert failures == [] and "Up to date, skipped" not in msgs
+    assert unreal.get_asset(texture_paths[0]) is not None
+
+def test_changed_options_are_imported_again(importer, source_dir, tmp_path):
+    copy_vat_bake(source_dir, str(tmp_path))
+    importer.import_baked_directory(str(tmp_path), "/Game/Tests/")
+
+    msgs, failures = get_results(importer.import_baked_directory(str(tmp_path), "/Game/Tests/", create_material=False))
+    assert failures == [] and "Up to date, skipped" not in msgs
+
+def test_import_baked_data_skips_up_to_date_bakes(importer, unreal, source_dir, tmp_path):
+    descriptor = copy_vat_bake(source_dir, str(tmp_path))
+
+    assert importer.import_baked_data(descriptor, "/Game/Tests/", True, "Meshes", True, "Textures", True, "Materials", "M_Test")[1] != "Up to date, skipped"
+    assert importer.import_baked_data(descriptor, "/Game/Tests/", True, "Meshes", True, "Textures", True, "Materials", "M_Test") == (True, "Up to date, skipped")
+
+    assert unreal.remove_asset("/Game/Tests/Materials/M_Test")
+    assert importer.import_baked_data(descriptor, "/Game/Tests/", True, "Meshes", True, "Textures", True, "Materials", "M_Test")[1] != "Up to date, skipped"
+
+def test_meshes_are_built_once(importer, unreal, source_dir, tmp_path):
+    copy_vat_bake(source_dir, str(tmp_path / "A"))
+    copy_vat_bake(source_dir, str(tmp_path / "B"), bake_dir="VAT/MultiObjects")
+
+    _, failures = get_results(importer.import_baked_directory(str(tmp_path), "/Game/Tests/"))
+    assert failures == []
+
+    # set_lod_build_settings() is the one rebuild of every mesh
+    meshes = [asset for asset in unreal.assets.values() if isinstance(asset, unreal.StaticMesh)]
+    assert len(meshes) == 2
+    assert unreal.recorder.get_calls().get("StaticMeshEditorSubsystem.set_lod_build_settings") == len(meshes)
+
+def run_import_job(unreal, root_dir):
+    """ Ticks a job until it's done """
+    import BlenderDataBakerJob as import_job
+
+    job, msg = import_job.start_import_job(root_dir, "/Game/Tests/")
+    assert job is not None, msg
+    while job.state == "running":
+        unreal.tick()
+    return job
+
+def test_import_job_records_the_manifest(importer, unreal, source_dir, tmp_path):
+    copy_vat_bake(source_dir, str(tmp_path))
+    job = run_import_job(unreal, str(tmp_path))
+
+    assert job.state == "finished" and job.get_progress() == 1.0
+    assert [success for _, success, _ in job.report] == [True]
+    assert not unreal.tick_callbacks
+
+    # progress is logged, no modal dialog blocks the editor
+    assert "ScopedSlowTask" not in unreal.recorder.get_calls()
+
+    msgs, failures = get_results(importer.import_baked_directory(str(tmp_path), "/Game/Tests/"))
+    assert failures == [] and msgs == {"Up to date, skipped"}
+
+def test_cancelled_job_deletes_the_assets_in_flight(importer, unreal, source_dir, tmp_path):
+    import BlenderDataBakerJob as import_job
+
+    copy_vat_bake(source_dir, str(tmp_path))
+
+    # a step per tick
+    job, _ = import_job.start_import_job(str(tmp_path), "/Game/Tests/", tick_budget=1e-6)
+    while job.state == "running" and not job.in_flight_assets:
+        unreal.tick()
+
+    in_flight_assets = list(job.in_flight_assets)
+    assert any(unreal.get_asset(asset_path) is not None for asset_path in in_flight_assets)
+
+    job.cancel()
+
+    assert job.state == "cancelled"
+    assert [msg for _, _, msg in job.report] == ["Import cancelled"]
+    assert all(unreal.get_asset(asset_path) is None for asset_path in in_flight_assets)
+
+def test_textures_shared_across_bakes_bind_in_every_material(importer, unreal, source_dir, tmp_path, monkeypatch):
+    # the same bake exported twice at different paths, only its ID differs
+    copy_vat_bake(source_dir, str(tmp_path / "A"), ID="A")
+    copy_vat_bake(source_dir, str(tmp_path / "B"), ID="B")
+
+    materials = {}
+    create_material_vat = importer.create_material_vat
+    def record_material_vat(asset_tools, settings, textures, material_name, material_path):
+        materials[material_path] = sorted(textures)
+        return create_material_vat(asset_tools, settings, textures, material_name, material_path)
+
+    monkeypatch.setattr(importer, "create_material_vat", record_material_vat)
+    report = importer.import_baked_directory(str(tmp_path), "/Game/Tests/")
+
+    assert [success for _, success, _ in report] == [True, True]
+    assert materials == {"/Game/Tests/A/VAT/Sequence/Materials": ["ClipBounds", "Normal", "Offset"], "/Game/Tests/B/VAT/Sequence/Materials": ["ClipBounds", "Normal", "Offset"]}
+
+    # textures were imported once, by the first bake
+    assert len([asset_path for asset_path in unreal.assets if "T_BakedMesh_VAT_Offset" in asset_path]) == 1
+
+def test_sdf_bakes_fail_without_their_texture(importer, unreal, source_dir, tmp_path):
+    descriptor = copy_bake(source_dir, "SDF/Blob", str(tmp_path))
+
+    success, msg = importer.import_baked_data(descriptor, "/Game/Tests/", True, "Meshes", True, "Textures", True, "Materials", "")
+
+    assert not success
+    assert msg.startswith("Couldn't re-tile SDF texture: missing texture ") and msg.endswith("T_BakedMesh.SDF.exr")
+    assert not unreal.assets
+
+    report = importer.import_baked_directory(str(tmp_path), "/Game/Tests/")
+    assert [(success, msg.split(": ")[0]) for _, success, msg in report] == [(False, "Couldn't re-tile SDF texture")]
+def test_parsing_fingerprints_the_files(importer, source_dir, tmp_path):
+    descriptor = copy_bake(source_dir, "VAT/Sequence", str(tmp_path))
+
+    baked_data, msg, fingerprints = importer.load_baked_data_fingerprints(descriptor, None, {})
+
+    assert sorted(fingerprints) == sorted([descriptor] + baked_data.get_files())
+    assert all(fingerprint is not None for fingerprint in fingerprints.values())
+    assert importer.load_baked_data_fingerprints(str(tmp_path / "missing.xml"), None, {}) == (None, "File does not exist", None)
+
+def test_failing_post_processing_deletes_the_assets_in_flight(importer, unreal, source_dir, tmp_path, monkeypatch):
+    # B shares the textures A imported
+    copy_vat_bake(source_dir, str(tmp_path / "A"), ID="A")
+    copy_vat_bake(source_dir, str(tmp_path / "B"), ID="B")
+
+    process_imported_assets_vat_steps = importer.process_imported_assets_vat_steps
+    def fail_first_bake(baked_data, *args, **kwargs):
+        if baked_data.ID == "A":
+            raise RuntimeError("post processing")
+        return (yield from process_imported_assets_vat_steps(baked_data, *args, **kwargs))
+
+    monkeypatch.setattr(importer, "process_imported_assets_vat_steps", fail_first_bake)
+    job = run_import_job(unreal, str(tmp_path))
+
+    # the job goes on with the next descriptor, which imports the files A deleted again
+    assert job.state == "finished"
+    assert [(success, msg) for _, success, msg in job.report] == [(False, "Post processing failed: post processing"), (True, "")]
+    assert not [asset_path for asset_path in unreal.assets if asset_path.startswith("/Game/Tests/A/")]
+    assert [asset_path for asset_path in unreal.assets if "T_BakedMesh_VAT_Offset" in asset_path]
+
+    # blocking imports report it and keep going too
+    report = importer.import_baked_directory(str(tmp_path), "/Game/Tests/", force=True)
+    assert [msg for _, success, msg in report] == ["Post processing failed: post processing", ""]
@@ -0,0 +1,69 @@
+import BlenderDataBakerDescriptor as baked_data_descriptor
+
+from conftest import copy_vat_bake
+
+def get_settings(importer, descriptor):
+    """ """
+    return importer.get_material_settings_vat(baked_data_descriptor.parse_baked_data(descriptor))
+
+def test_material_signature_ignores_parameter_values(importer, source_dir, tmp_path):
+    settings = get_settings(importer, copy_vat_bake(source_dir, str(tmp_path)))
+    signature = importer.get_material_signature_vat(settings)
+
+    # parameters of the instances
+    assert importer.get_material_signature_vat(dict(settings, frames_width=0.5, offset_remapping=(1.0, 2.0, 3.0), max_displacement=1000.0)) == signature
+
+    # static switches of the parent
+    assert importer.get_material_signature_vat(dict(settings, uv_index=0)) != signature
+    assert importer.get_material_signature_vat(dict(settings, offset_remapped=not settings["offset_remapped"])) != signature
+    assert importer.get_material_signature_vat(dict(settings, offset_scale=None if settings["offset_scale"] else (1.0, 1.0, 1.0))) != signature
+
+def test_bakes_sharing_a_signature_share_their_parent(importer, unreal, source_dir, tmp_path, monkeypatch):
+    copy_vat_bake(source_dir, str(tmp_path / "A"), ID="A")
+    copy_vat_bake(source_dir, str(tmp_path / "B"), ID="B")
+
+    parameters = {}
+    def record_parameter(material_instance, parameter_name, value):
+        parameters.setdefault(material_instance, {})[parameter_name] = value
+
+    for function_name in ("set_material_instance_scalar_parameter_value", "set_material_instance_vector_parameter_value", "set_material_instance_texture_parameter_value"):
+        monkeypatch.setattr(unreal.MaterialEditingLibrary, function_name, record_parameter)
+
+    report = importer.import_baked_directory(str(tmp_path), "/Game/Tests/", use_parent_material=True)
+    assert [success for _, success, _ in report] == [True, True]
+
+    parent_paths = [asset_path for asset_path in unreal.assets if asset_path.startswith(importer.PARENT_MATERIAL_PATH + "/M_VAT_")]
+    assert len(parent_paths) == 1
+    assert unreal.recorder.get_calls()["MaterialEditingLibrary.recompile_material"] == 1
+
+    # every instance gets its own parameters, textures included
+    material_instances = [unreal.get_asset("/Game/Tests/{0}/VAT/Sequence/Materials/M_BakedMesh_VAT".format(name)) for name in ("A", "B")]
+    assert all(isinstance(material_instance, unreal.MaterialInstanceConstant) for material_instance in material_instances)
+    for material_instance in material_instances:
+        assert parameters[material_instance]["FrameWidth"] == 1.0 and parameters[material_instance]["FrameHeight"] == 1.0
+        assert "OffsetRemapping" in parameters[material_instance] and "NormalRemapping" in parameters[material_instance]
+
+        # both bakes hold the same files, they're imported once with the first one
+        assert parameters[material_instance]["OffsetTexture"] is unreal.get_asset("/Game/Tests/A/VAT/Sequence/Textures/T_BakedMesh_VAT_Offset")
+        assert parameters[material_instance]["NormalTexture"] is unreal.get_asset("/Game/Tests/A/VAT/Sequence/Textures/T_BakedMesh_VAT_Normal")
+
+def test_parent_is_compiled_with_the_displacement_of_the_whole_batch(importer, unreal, source_dir, tmp_path, monkeypatch):
+    copy_vat_bake(source_dir, str(tmp_path / "A"), ID="A")
+    copy_vat_bake(source_dir, str(tmp_path / "B"), ID="B")
+
+    # B moves further than A, the first bake the parent is created for
+    get_material_settings_vat = importer.get_material_settings_vat
+    def get_displaced_settings(baked_data, *args, **kwargs):
+        return dict(get_material_settings_vat(baked_data, *args, **kwargs), max_displacement={"A": 10.0, "B": 50.0}[baked_data.ID])
+
+    compiled = []
+    def record_recompile(material):
+        compiled.append(material.get_editor_property("max_world_position_offset_displacement"))
+
+    monkeypatch.setattr(importer, "get_material_settings_vat", get_displaced_settings)
+    monkeypatch.setattr(unreal.MaterialEditingLibrary, "recompile_material", record_recompile)
+
+    report = importer.import_baked_directory(str(tmp_path), "/Game/Tests/", use_parent_material=True)
+
+    assert [success for _, success, _ in report] == [True, True]
+    assert compiled == [50.0]
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+import BlenderDataBakerResolver as resolver
+
+def touch(root_dir, *parts):
+    """ """
+    file_path = os.path.join(str(root_dir), *parts)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "wb"):
+        pass
+    return file_path
+
+@pytest.fixture
+def tree(tmp_path):
+    """ Two SDF bakes each referencing a texture of the same name, and a VAT one """
+    return {
+        "blob": touch(tmp_path, "SDF", "Blob", "Textures", "T_SDF.exr"),
+        "suzanne": touch(tmp_path, "SDF", "Suzanne", "Textures", "T_SDF.exr"),
+        "suzanne_mesh": touch(tmp_path, "SDF", "Suzanne", "Meshes", "SM_SDF.fbx"),
+        "vat": touch(tmp_path, "VAT", "Sequence", "Textures", "T_BakedMesh.VAT_Offset.exr"),
+        "root": str(tmp_path),
+    }
+
+def get_descriptor(tree, *parts):
+    """ Descriptors are exported next to the mesh, they don't need to exist """
+    return os.path.join(tree["root"], *parts)
+
+def test_resolves_windows_paths_to_the_descriptors_bake(tree):
+    file_resolver = resolver.FileResolver(tree["root"])
+    descriptor = get_descriptor(tree, "SDF", "Suzanne", "Meshes", "SDF.xml")
+
+    assert file_resolver.resolve("G:\\Unreal Projects\\Doc\\Source\\SDF\\Suzanne\\Textures\\T_SDF.exr", descriptor) == tree["suzanne"]
+    assert file_resolver.resolve("G:\\Unreal Projects\\Doc\\Source\\SDF\\Suzanne\\Meshes\\SM_SDF.fbx", descriptor) == tree["suzanne_mesh"]
+
+def test_resolves_files_of_a_bake_moved_to_another_folder(tree):
+    file_resolver = resolver.FileResolver(tree["root"])
+
+    # the bake was exported as SDF/Monkey before being renamed, its files are still the closest ones
+    descriptor = get_descriptor(tree, "SDF", "Suzanne", "Meshes", "SDF.xml")
+    assert file_resolver.resolve("D:\\Export\\SDF\\Monkey\\Textures\\T_SDF.exr", descriptor) == tree["suzanne"]
+
+def test_file_names_are_matched_whatever_their_case(tree):
+    file_resolver = resolver.FileResolver(tree["root"])
+    descriptor = get_descriptor(tree, "VAT", "Sequence", "Meshes", "BakedMesh.VAT.xml")
+
+    assert file_resolver.resolve("C:\\Bakes\\VAT\\SEQUENCE\\Textures\\t_bakedmesh.vat_offset.EXR", descriptor) == tree["vat"]
+
+def test_doesnt_resolve_to_same_named_files_of_other_bakes(tree):
+    os.remove(tree["suzanne"])
+    file_resolver = resolver.FileResolver(tree["root"])
+    descriptor = get_descriptor(tree, "SDF", "Suzanne", "Meshes", "SDF.xml")
+
+    # SDF/Blob's texture isn't the one Suzanne was baked with
+    assert file_resolver.resolve("G:\\Unreal Projects\\Doc\\Source\\SDF\\Suzanne\\Textures\\T_SDF.exr", descriptor) is None
+
+def test_resolves_to_other_bakes_the_referenced_folders_name(tree):
+    file_resolver = resolver.FileResolver(tree["root"])
+    descriptor = get_descriptor(tree, "SDF", "Suzanne", "Meshes", "SDF.xml")
+
+    # a reference to another bake's file is kept if the folders setting it apart are the referenced ones
+    assert file_resolver.resolve("G:\\Unreal Projects\\Doc\\Source\\SDF\\Blob\\Textures\\T_SDF.exr", descriptor) == tree["blob"]
+
+def test_unindexed_files_are_only_found_at_their_path(tree, tmp_path_factory):
+    outside = touch(tmp_path_factory.mktemp("outside"), "T_Outside.exr")
+    file_resolver = resolver.FileResolver(tree["root"])
+    descriptor = get_descriptor(tree, "VAT", "Sequence", "Meshes", "BakedMesh.VAT.xml")
+
+    assert file_resolver.resolve(outside, descriptor) == outside
+    assert file_resolver.resolve("G:\\Missing\\T_Outside.exr", descriptor) is None
+    assert file_resolver.resolve("", descriptor) is None
+
+def test_file_index_only_holds_referenced_files(tree):
+    touch(tree["root"], "SDF", "Suzanne", "Blender", "SDF.blend")
+
+    assert resolver.FileIndex(tree["root"]).get_file_count() == 4
+
+def test_get_file_resolver_reuses_indexed_trees(tree):
+    file_resolver = resolver.get_file_resolver(tree["root"])
+
+    assert resolver.get_file_resolver(tree["root"]) is file_resolver
+    assert resolver.get_file_resolver(tree["root"], refresh=True) is not file_resolver
@@ -0,0 +1,39 @@
+import json
+import os
+
+import BlenderDataBakerRunner as runner
+
+from conftest import copy_vat_bake
+
+def test_split_shards_keeps_destination_folders_together(tmp_path):
+    root_dir = str(tmp_path)
+    file_paths = [os.path.join(root_dir, *parts) for parts in (("A", "Meshes", "A.xml"), ("A", "Meshes", "A2.xml"), ("B", "Meshes", "B.xml"), ("C", "C.xml"))]
+    costs = dict(zip(file_paths, (5, 5, 8, 1)))
+
+    shards = runner.split_shards(file_paths, root_dir, 2, costs)
+
+    assert shards == [file_paths[:2], file_paths[2:]]
+    assert runner.split_shards(file_paths, root_dir, 8, costs) == [file_paths[:2], file_paths[2:3], file_paths[3:]]
+
+def test_parent_material_clamps_only_grow():
+    parent_materials = {"/Game/M_VAT_A": 10.0, "/Game/M_VAT_B": 10.0}
+    worker_results = [{"parent_material_displacements": {"/Game/M_VAT_A": 5.0, "/Game/M_VAT_B": 12.0}},
+                      {"parent_material_displacements": {"/Game/M_VAT_B": 15.0}},
+                      {"results": []}]
+
+    assert runner.get_parent_material_clamps(parent_materials, worker_results) == {"/Game/M_VAT_B": 15.0}
+
+def test_finalize_worker_grows_the_clamps_after_the_shards(source_dir, tmp_path):
+    # the prelude creates the parent with ClothSim's clamp, Sequence shares it and needs a larger one
+    root_dir = tmp_path / "Source"
+    file_paths = [copy_vat_bake(source_dir, str(root_dir / "A"), bake_dir="VAT/ClothSim"), copy_vat_bake(source_dir, str(root_dir / "B"))]
+    options = {"import_mesh_subfolder": "Meshes", "import_textures_subfolder": "Textures", "create_material_subfolder": "Materials", "force": False,
+               "use_parent_material": True, "compression_tolerance": 0.001, "normal_encoding": 0, "decimation_tolerance": 0.0}
+
+    run = runner.run_shards(str(root_dir), "/Game/Tests", file_paths, 2, options, work_dir=str(tmp_path / "Work"))
+
+    assert [success for _, success, _ in run["results"]] == [True, True]
+    assert len(run["clamps"]) == 1 and run["finalize_exit_code"] == 0
+
+    with open(os.path.join(run["work_dir"], "finalize.result.json"), "r") as file:
+        assert json.load(file)["grown"] == list(run["clamps"])
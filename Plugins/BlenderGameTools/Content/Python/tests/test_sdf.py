@@ -0,0 +1,109 @@
+import types
+
+import numpy as np
+import pytest
+
+import BlenderDataBakerSDF as sdf
+import BlenderDataBakerTextures as textures
+
+def get_texture(tmp_path, volume, columns, tiles = "TB_LR", distance = "", max_dist = 0.0):
+    """ Stands in for an SDF texture of the descriptor, its slices laid out in tiles order """
+    size_z, size_y, size_x = volume.shape
+    rows = (size_z + columns - 1) // columns
+
+    # slot of each slice, counted from the top-left tile
+    slots = np.zeros((rows * columns, size_y, size_x), dtype=np.float32)
+    for index in range(size_z):
+        row, column = divmod(index, columns)
+        if tiles.startswith("BT"):
+            row = rows - 1 - row
+        if tiles.endswith("RL"):
+            column = columns - 1 - column
+        slots[row * columns + column] = volume[index]
+
+    values = slots.reshape(rows, columns, size_y, size_x).transpose(0, 2, 1, 3).reshape(rows * size_y, columns * size_x)
+
+    file_path = str(tmp_path / "T_SDF.exr")
+    textures.write_exr(file_path, {"R": values})
+    return types.SimpleNamespace(path=file_path, width=columns * size_x, height=rows * size_y, x=size_x, y=size_y, z=size_z, slices=columns, tiles=tiles, distance=distance, max_dist=max_dist)
+
+def get_sphere(size_x, size_y, size_z, radius):
+    """ (z, y, x) distances to a sphere centered in the volume """
+    z, y, x = np.meshgrid(np.arange(size_z), np.arange(size_y), np.arange(size_x), indexing="ij")
+    center = (np.array((size_z, size_y, size_x), dtype=np.float32) - 1.0) * 0.5
+    return (np.sqrt((z - center[0]) ** 2 + (y - center[1]) ** 2 + (x - center[2]) ** 2) - radius).astype(np.float32)
+
+##########
+# TILING #
+
+@pytest.mark.parametrize("tiles", ["TB_LR", "TB_RL", "BT_LR", "BT_RL"])
+def test_slices_are_retiled_from_the_top_left(tmp_path, tiles):
+    # thirds aren't exact halfs, the slices stay lossless
+    volume = np.arange(5 * 4 * 6, dtype=np.float32).reshape(5, 4, 6) / np.float32(3.0)
+    texture = get_texture(tmp_path, volume, 3, tiles)
+
+    texture_format = sdf.convert_sdf_texture(texture, str(tmp_path / "Converted"), tolerance=0.0)
+
+    assert texture_format.name == "R32F"
+    assert texture_format.tile_size == (6, 4, 5)
+    tiled = textures.read_exr(texture_format.path)["R"]
+    assert tiled.shape == (2 * 4, 3 * 6)
+
+    for index in range(5):
+        row, column = divmod(index, 3)
+        assert np.array_equal(tiled[row * 4:(row + 1) * 4, column * 6:(column + 1) * 6], volume[index])
+
+    # the tile left after the last slice is empty
+    assert not np.any(tiled[4:, 12:])
+
+def test_tile_layout_rejects_textures_the_slices_dont_fit():
+    texture = types.SimpleNamespace(x=8, y=8, z=5, slices=2, tiles="TB_LR")
+
+    assert sdf.get_tile_layout(texture, 16, 24) == (2, 3, "")
+    assert sdf.get_tile_layout(texture, 16, 16)[0] == 0
+    assert sdf.get_tile_layout(texture, 20, 24)[0] == 0
+    assert sdf.get_tile_layout(types.SimpleNamespace(x=8, y=8, z=5, slices=0, tiles="LR_TB"), 16, 24)[0] == 0
+
+def test_unconverted_texture_has_no_path(tmp_path):
+    texture = get_texture(tmp_path, np.zeros((4, 4, 4), dtype=np.float32), 2)
+    texture.z = 5
+
+    texture_format = sdf.convert_sdf_texture(texture, str(tmp_path / "Converted"))
+
+    assert not texture_format.path
+    assert texture_format.msg
+
+##########
+# FORMAT #
+
+def test_remapped_distances_pick_grayscale(tmp_path):
+    # 8-bit distances decode exactly to a G8 texel
+    max_dist = 2.0
+    stored = np.round(np.random.default_rng(0).random((4, 8, 8)) * 255.0).astype(np.float32) / np.float32(255.0)
+    texture = get_texture(tmp_path, stored, 2, distance="REMAPPED", max_dist=max_dist)
+
+    texture_format = sdf.convert_sdf_texture(texture, str(tmp_path / "Converted"))
+
+    assert texture_format.name == "G8"
+    scale, bias = texture_format.distance_remap
+    decoded = textures.read_exr(texture_format.path)["R"][:8, :8] * scale + bias
+    assert np.allclose(decoded, (stored[0] * 2.0 - 1.0) * max_dist, atol=1e-5)
+
+def test_smooth_distances_pick_half_float(tmp_path):
+    distances = get_sphere(16, 16, 16, 4.0) / np.float32(64.0)
+    texture = get_texture(tmp_path, distances, 4)
+
+    texture_format = sdf.convert_sdf_texture(texture, str(tmp_path / "Converted"))
+
+    assert texture_format.name == "R16F"
+    assert texture_format.distance_remap == (1.0, 0.0)
+    assert texture_format.errors["R16F"] <= sdf.SDF_TOLERANCE * float(np.max(np.abs(distances)))
+
+def test_noisy_distances_stay_lossless(tmp_path):
+    volume = (np.random.default_rng(1).random((4, 8, 8)) * 1000.0 + 1000.0).astype(np.float32)
+    texture = get_texture(tmp_path, volume, 2)
+
+    texture_format = sdf.convert_sdf_texture(texture, str(tmp_path / "Converted"), tolerance=1e-6)
+
+    assert texture_format.name == "R32F"
+    assert np.array_equal(textures.read_exr(texture_format.path)["R"][:8, :8], volume[0])
@@ -0,0 +1,138 @@
+import os
+import struct
+import types
+import zlib
+
+import numpy as np
+import pytest
+
+import BlenderDataBakerTextures as textures
+
+def read_png_16(file_path):
+    """ Reads the unfiltered 16-bit PNGs write_png_16() writes, returns a (height, width) or (height, width, channels) uint16 array """
+    with open(file_path, "rb") as file:
+        data = file.read()
+
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+
+    offset = 8
+    chunks = {}
+    while offset < len(data):
+        length, = struct.unpack_from(">I", data, offset)
+        chunk_type = data[offset + 4:offset + 8]
+        chunk_data = data[offset + 8:offset + 8 + length]
+        assert struct.unpack_from(">I", data, offset + 8 + length)[0] == zlib.crc32(chunk_type + chunk_data) & 0xffffffff
+        chunks[chunk_type] = chunks.get(chunk_type, b"") + chunk_data
+        offset += 12 + length
+
+    width, height, bit_depth, color_type = struct.unpack_from(">IIBB", chunks[b"IHDR"])
+    assert bit_depth == 16
+    num_channels = {0: 1, 2: 3, 6: 4}[color_type]
+
+    rows = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(height, 1 + 2 * width * num_channels)
+    assert not np.any(rows[:, 0])
+
+    values = rows[:, 1:].copy().view(">u2").astype(np.uint16)
+    return values.reshape(height, width, num_channels) if num_channels > 1 else values
+
+def get_texture(path, remapped = False, range = None, range_offset = None, channels = None):
+    """ Stands in for a descriptor's BakedDataTexture """
+    return types.SimpleNamespace(path=path, width=0, height=0, remapped=remapped, range=range, range_offset=range_offset, channels=channels if channels else {}, row_channels=[])
+
+def test_exr_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    channels = {channel_name: rng.normal(size=(37, 23)).astype(np.float32) for channel_name in ("R", "G", "B", "A")}
+
+    file_path = str(tmp_path / "round_trip.exr")
+    textures.write_exr(file_path, channels)
+    read_channels = textures.read_exr(file_path)
+
+    assert sorted(read_channels) == ["A", "B", "G", "R"]
+    for channel_name, values in channels.items():
+        assert read_channels[channel_name].dtype == np.float32
+        assert np.array_equal(read_channels[channel_name], values)
+
+def test_read_exr_rejects_other_files(tmp_path):
+    file_path = tmp_path / "not_an.exr"
+    file_path.write_bytes(b"\0" * 64)
+
+    with pytest.raises(ValueError):
+        textures.read_exr(str(file_path))
+
+@pytest.mark.parametrize("shape", [(5, 7), (5, 7, 3), (5, 7, 4)])
+def test_png_16_round_trip(tmp_path, shape):
+    values = np.random.default_rng(1).integers(0, 65536, size=shape).astype(np.uint16)
+
+    file_path = str(tmp_path / "round_trip.png")
+    textures.write_png_16(file_path, values)
+
+    assert np.array_equal(read_png_16(file_path), values)
+
+def test_format_errors_are_measured_in_descriptor_units():
+    values = np.random.default_rng(2).random((1000, 3)).astype(np.float32)
+    remaps = (np.array([100.0, 10.0, 1.0]), np.array([-50.0, 0.0, 3.0]))
+
+    errors = textures.get_format_errors(values, remaps)
+    unit_errors = textures.get_format_errors(values)
+
+    # range offsets cancel out, ranges scale the stored errors
+    assert np.allclose(errors["UNORM16"], unit_errors["UNORM16"] * remaps[0], rtol=1e-3)
+    assert np.all(errors["UNORM16"] <= remaps[0] / 65535.0 / 2.0 * 1.001)
+    assert np.all(errors["HDR_F32"] == 0.0)
+
+def test_analyze_texture_picks_half_floats(tmp_path):
+    rng = np.random.default_rng(3)
+    file_path = str(tmp_path / "T_Bake_Offset.exr")
+    textures.write_exr(file_path, {channel_name: (rng.random((8, 16)) * 4.0).astype(np.float16).astype(np.float32) for channel_name in ("R", "G", "B")})
+
+    texture_format = textures.analyze_texture(get_texture(file_path), 0.001)
+
+    assert texture_format.name == "HDR"
+    assert texture_format.path == file_path
+    assert texture_format.get_memory_saved() == 16 * 8 * 8
+
+def test_analyze_texture_keeps_remapped_textures_without_range_lossless(tmp_path):
+    file_path = str(tmp_path / "T_Bake_Offset.exr")
+    textures.write_exr(file_path, {channel_name: np.full((4, 4), 0.5, dtype=np.float32) for channel_name in ("R", "G", "B")})
+
+    # the baker writes unformatted ranges, e.g. '<bpy_float[3], ...>', which parse as None
+    texture_format = textures.analyze_texture(get_texture(file_path, remapped=True), 1.0, str(tmp_path / "Converted"))
+
+    assert texture_format.name == textures.TEXTURE_FORMAT_LOSSLESS[0]
+    assert texture_format.msg == "remapped without a valid range"
+
+    channel = types.SimpleNamespace(mode="POSITION", remapped=True, range=None, range_offset=None, range_valid=False)
+    texture_format = textures.analyze_texture(get_texture(file_path, channels={"R": channel}), 1.0, str(tmp_path / "Converted"))
+
+    assert texture_format.name == textures.TEXTURE_FORMAT_LOSSLESS[0]
+
+def test_analyze_texture_converts_unorm16_textures(tmp_path):
+    rng = np.random.default_rng(4)
+    values = {channel_name: rng.random((8, 16)).astype(np.float32) for channel_name in ("R", "G", "B")}
+    file_path = str(tmp_path / "T_Bake_Offset.exr")
+    textures.write_exr(file_path, values)
+
+    # half floats are off by up to 100 / 4096, 16-bit levels by 100 / 131070
+    texture = get_texture(file_path, remapped=True, range=(100.0, 100.0, 100.0), range_offset=(-50.0, -50.0, -50.0))
+    output_dir = str(tmp_path / "Converted")
+
+    assert textures.analyze_texture(texture, 0.01).name == textures.TEXTURE_FORMAT_LOSSLESS[0]
+
+    texture_format = textures.analyze_texture(texture, 0.01, output_dir)
+
+    assert texture_format.name == "UNORM16"
+    assert texture_format.is_uncompressed()
+    assert texture_format.path == os.path.join(output_dir, "T_Bake_Offset.png")
+    assert texture_format.max_error <= 100.0 / 65535.0 / 2.0 * 1.001
+
+    stored = read_png_16(texture_format.path).astype(np.float64) / 65535.0
+    for index, channel_name in enumerate(("R", "G", "B")):
+        assert np.max(np.abs(stored[..., index] - values[channel_name])) <= 0.5 / 65535.0 + 1e-7
+
+def test_analyze_texture_keeps_packed_textures_lossless(tmp_path):
+    # a single rotation channel holds three_smallest quaternions
+    channel = types.SimpleNamespace(mode="ROTATION", remapped=False)
+    texture_format = textures.analyze_texture(get_texture(str(tmp_path / "missing.exr"), channels={"R": channel}), 1.0)
+
+    assert texture_format.name == textures.TEXTURE_FORMAT_LOSSLESS[0]
+    assert texture_format.msg == "packed data"